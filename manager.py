@@ -18,7 +18,7 @@ from langchain_core.load import dumps
 from langgraph.graph import StateGraph
 from src.tools.tools_project_manager import add_task, modify_task, finish_project_planning, reorder_tasks
 from src.tools.tools_coder_pipeline import (
-    prepare_list_dir_tool, prepare_see_file_tool, see_image,
+    prepare_list_dir_tool, prepare_see_file_tool, prepare_see_file_outline_tool, see_image,
     ask_human_tool, retrieve_files_by_semantic_query
 )
 from src.tools.rag.index_file_descriptions import prompt_index_project_files
@@ -36,8 +36,10 @@ from src.utilities.langgraph_common_functions import (
 )
 from src.utilities.start_project_functions import set_up_dot_clean_coder_dir
 from src.utilities.llms import init_llms_medium_intelligence
+from src.utilities.context_compaction import ContextCompactor
 from src.utilities.print_formatters import print_formatted
 from src.tools.rag.retrieval import vdb_available
+from src.utilities.workspace_watcher import start_workspace_watcher
 import json
 import os
 import uuid
@@ -53,17 +55,21 @@ class Manager:
         self.work_dir = os.getenv("WORK_DIR")
         # initial project setup
         set_up_dot_clean_coder_dir(self.work_dir)
+        start_workspace_watcher(self.work_dir)
         setup_todoist_project_if_needed()
         prompt_index_project_files()
 
         self.tools = self.prepare_tools()
         self.llms = init_llms_medium_intelligence(tools=self.tools, run_name="Manager")
+        self.context_compactor = ContextCompactor(
+            int(os.getenv("MANAGER_CONTEXT_TOKENS", 60000)), run_name="Manager Context Compactor"
+        )
         self.manager = self.setup_workflow()
         self.saved_messages_path = join_paths(self.work_dir, ".clean_coder/manager_messages.json")
 
     def call_model_manager(self, state):
         save_state_history_to_disk(state, self.saved_messages_path)
-        state = call_model(state, self.llms)
+        state = call_model(state, self.llms, tools=self.tools)
         state = self.cut_off_context(state)
 
         ai_messages = [msg for msg in state["messages"] if msg.type == "ai"]
@@ -103,27 +109,10 @@ class Manager:
     # just functions
     def cut_off_context(self, state):
         """
-        Trims the message history in the state to keep only the most recent context for the agent.
-        Keeps the last ~30 messages, starting from the most recent 'ai' message, and always includes the system message at the beginning.
+        Keeps the message history under MANAGER_CONTEXT_TOKENS token ceiling. Oldest turns are summarized into
+        a digest placed after the system message; tool calls are never separated from their results.
         """
-        approx_nr_msgs_to_save = 30
-        if len(state["messages"]) > approx_nr_msgs_to_save:
-            last_messages = state["messages"][-approx_nr_msgs_to_save:]
-
-            # Find the index of the first 'ai' message from the end in the last 30 messages
-            ai_message_index_in_last_msgs = next(
-                (i for i, message in enumerate(last_messages) if message.type == "ai"), None
-            )
-            # Calculate the actual index of the 'ai' message in the original list
-            ai_message_index = len(state["messages"]) - approx_nr_msgs_to_save + ai_message_index_in_last_msgs
-            # Collect all messages starting from the 'ai' message
-            last_messages_excluding_system = [
-                msg for msg in state["messages"][ai_message_index:] if msg.type != "system"
-            ]
-
-            system_message = state["messages"][0]
-            state["messages"] = [system_message] + last_messages_excluding_system
-
+        state["messages"] = self.context_compactor.compact(state["messages"])
         return state
 
     def save_messages_to_disk(self, state):
@@ -136,6 +125,7 @@ class Manager:
     def prepare_tools(self):
         list_dir = prepare_list_dir_tool(self.work_dir)
         see_file = prepare_see_file_tool(self.work_dir)
+        see_file_outline = prepare_see_file_outline_tool(self.work_dir)
         tools = [
             add_task,
             modify_task,
@@ -144,6 +134,7 @@ class Manager:
             finish_project_planning,
             list_dir,
             see_file,
+            see_file_outline,
             see_image,
         ]
         if vdb_available():
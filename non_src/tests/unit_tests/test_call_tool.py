@@ -0,0 +1,100 @@
+import os
+import tempfile
+import threading
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+os.environ.setdefault("WORK_DIR", tempfile.gettempdir())
+from src.utilities.langgraph_common_functions import call_tool
+from src.utilities import edit_transaction
+from src.tools.tools_coder_pipeline import (
+    read_only,
+    prepare_see_file_tool,
+    prepare_replace_code_tool,
+    prepare_insert_code_tool,
+)
+
+executed = []
+# both read-only calls have to be running at the same time to pass the barrier
+barrier = threading.Barrier(2, timeout=5)
+
+
+@read_only
+@tool
+def look(name: str):
+    """Reads something."""
+    barrier.wait()
+    executed.append(("look", name))
+    return f"seen {name}"
+
+
+@tool
+def edit(start_line: int):
+    """Changes something."""
+    executed.append(("edit", start_line))
+    return f"edited {start_line}"
+
+
+def test_read_only_calls_run_concurrently_between_changes_in_call_order():
+    executed.clear()
+    calls = [
+        {"name": "look", "args": {"name": "a"}, "id": "1"},
+        {"name": "look", "args": {"name": "b"}, "id": "2"},
+        {"name": "edit", "args": {"start_line": 5}, "id": "3"},
+        {"name": "edit", "args": {"start_line": 20}, "id": "4"},
+        {"name": "look", "args": {"name": "c"}, "id": "5"},
+        {"name": "look", "args": {"name": "d"}, "id": "6"},
+    ]
+    state = {"messages": [AIMessage(content="", tool_calls=calls)]}
+    call_tool(state, [look, edit])
+
+    # consecutive read-only calls run together, line-based edits between them from the greatest line
+    assert sorted(executed[:2]) == [("look", "a"), ("look", "b")]
+    assert executed[2:4] == [("edit", 20), ("edit", 5)]
+    assert sorted(executed[4:]) == [("look", "c"), ("look", "d")]
+    tool_messages = state["messages"][1:]
+    assert [msg.tool_call_id for msg in tool_messages] == ["1", "2", "3", "4", "5", "6"]
+    assert tool_messages[0].content == "seen a"
+    assert tool_messages[3].content == "edited 20"
+
+
+def test_file_seen_before_edit_shows_its_previous_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(edit_transaction, "user_input", lambda message: "ok")
+    (tmp_path / "app.py").write_text("x = 1\n")
+    calls = [
+        {"name": "see_file", "args": {"filename": "app.py"}, "id": "1"},
+        {"name": "replace_code", "args": {"filename": "app.py", "start_line": 1, "end_line": 1, "code": "x = 2"},
+         "id": "2"},
+        {"name": "see_file", "args": {"filename": "app.py"}, "id": "3"},
+    ]
+    state = {"messages": [AIMessage(content="", tool_calls=calls)]}
+    call_tool(state, [prepare_see_file_tool(str(tmp_path)), prepare_replace_code_tool(str(tmp_path))])
+
+    outputs = [msg.content for msg in state["messages"][1:]]
+    assert "x = 1" in outputs[0] and "x = 2" not in outputs[0]
+    assert outputs[1] == "Code modified."
+    assert "x = 2" in outputs[2]
+
+
+def test_edits_separated_by_read_refer_to_lines_before_the_turn(tmp_path, monkeypatch):
+    monkeypatch.setattr(edit_transaction, "user_input", lambda message: "ok")
+    (tmp_path / "a.py").write_text("".join(f"x{i} = {i}\n" for i in range(1, 11)))
+    (tmp_path / "b.py").write_text("y = 1\n")
+    replacement = "x2 = 2\nz = 0\nw = 0"
+    calls = [
+        {"name": "replace_code", "args": {"filename": "a.py", "start_line": 2, "end_line": 2, "code": replacement},
+         "id": "1"},
+        {"name": "see_file", "args": {"filename": "b.py"}, "id": "2"},
+        {"name": "insert_code", "args": {"filename": "a.py", "start_line": 10, "code": "last = 11"}, "id": "3"},
+    ]
+    state = {"messages": [AIMessage(content="", tool_calls=calls)]}
+    tools = [prepare_see_file_tool(str(tmp_path)), prepare_replace_code_tool(str(tmp_path)),
+             prepare_insert_code_tool(str(tmp_path))]
+    call_tool(state, tools)
+
+    outputs = [msg.content for msg in state["messages"][1:]]
+    assert outputs == ["Code modified.", "b.py:\n\n1|y = 1|1\n", "Code inserted."]
+    lines = (tmp_path / "a.py").read_text().splitlines()
+    assert lines[1:4] == ["x2 = 2", "z = 0", "w = 0"]
+    # inserted after x10, not after the line that was 10th after the replacement
+    assert lines[-2:] == ["x10 = 10", "last = 11"]
@@ -0,0 +1,24 @@
+import os
+import tempfile
+
+# retrieval module reads WORK_DIR on import
+os.environ.setdefault("WORK_DIR", tempfile.gettempdir())
+from src.tools.rag.retrieval import ChromaRegistry, get_ranker  # noqa: E402
+
+
+def test_collection_handle_is_reused(tmp_path):
+    path = str(tmp_path / "chroma_base")
+    assert ChromaRegistry.get_collection(path, "descriptions") is None
+
+    collection = ChromaRegistry.get_collection(path, "descriptions", create=True)
+    assert ChromaRegistry.get_collection(path, "descriptions") is collection
+    assert ChromaRegistry.get_client(path) is ChromaRegistry.get_client(path)
+
+    ChromaRegistry.invalidate()
+    reopened = ChromaRegistry.get_collection(path, "descriptions")
+    assert reopened is not None and reopened is not collection
+    ChromaRegistry.invalidate()
+
+
+def test_ranker_is_created_once():
+    assert get_ranker() is get_ranker()
@@ -0,0 +1,62 @@
+from src.tools.rag.code_splitter import split_code
+
+python_code = '''import os
+
+
+def small_one():
+    return 1
+
+
+def small_two():
+    return 2
+
+
+class Big:
+    """Docstring."""
+
+    def first(self):
+''' + "        x = 'long line of code to make the class exceed token budget'\n" * 10 + '''
+    def second(self):
+''' + "        y = 'long line of code to make the class exceed token budget'\n" * 10
+
+js_code = """import x from 'y';
+
+function a() {
+  const s = `template ${ {a: 1}.a } with } brace`;
+  return s;
+}
+
+// comment with { brace
+const b = () => {
+  return '}';
+};
+"""
+
+
+def test_python_chunks_follow_definitions():
+    chunks = split_code(python_code, "py", max_tokens=200)
+    # small functions merged, class too big for one chunk split on its methods
+    assert [(chunk.start_line, chunk.end_line) for chunk in chunks] == [(1, 9), (10, 25), (26, 37)]
+    assert chunks[1].text.lstrip().startswith("class Big")
+    assert chunks[2].text.lstrip().startswith("def second")
+
+
+def test_small_definitions_are_merged():
+    chunks = split_code(python_code, "py", max_tokens=2000)
+    assert len(chunks) == 1
+    assert chunks[0].end_line == 37
+
+
+def test_js_chunks_skip_brackets_in_strings_and_comments():
+    chunks = split_code(js_code, "js", max_tokens=20)
+    assert [(chunk.start_line, chunk.end_line) for chunk in chunks] == [(1, 2), (3, 6), (7, 11)]
+    assert chunks[2].text.strip().startswith("// comment")
+
+
+def test_other_languages_fall_back_with_line_ranges():
+    code = "fn main() {\n    println!(\"hi\");\n}\n" * 30
+    chunks = split_code(code, "rs")
+    assert len(chunks) > 1
+    assert chunks[0].start_line == 1
+    assert chunks[1].text.startswith("fn main")
+    assert chunks[1].start_line > chunks[0].end_line
@@ -0,0 +1,72 @@
+import os
+import time
+import fnmatch
+import pytest
+from pathspec import PathSpec
+from pathspec.patterns import GitWildMatchPattern
+from src.utilities.start_work_functions import (
+    CoderIgnore,
+    Work,
+    IgnoreMatcher,
+    file_folder_ignored,
+    walk_not_ignored,
+)
+
+patterns = [".clean_coder/", "node_modules/", "*.pyc", "/build", "docs/**/tmp", ".git", "secret.env", "logs/*.log"]
+paths = [
+    ".clean_coder", "node_modules", "src/node_modules/lib.js", "app/main.py", "app/main.pyc", "build",
+    "build/out.js", "src/build/out.js", "docs/a/b/tmp", "docs/tmp/file.md", ".git", "src/.git/config",
+    "secret.env", "config/secret.env", "logs/app.log", "logs/old/app.log", "README.md",
+]
+
+
+def ignored_by_previous_implementation(path):
+    path = path.rstrip("/")
+    if PathSpec.from_lines(GitWildMatchPattern, patterns).match_file(path):
+        return True
+    return any(
+        fnmatch.fnmatch(path, pattern.rstrip("/")) or fnmatch.fnmatch(f"{path}/", f"{pattern.rstrip('/')}/")
+        for pattern in patterns
+    )
+
+
+@pytest.fixture
+def work_dir(tmp_path, monkeypatch):
+    (tmp_path / ".clean_coder").mkdir()
+    (tmp_path / ".clean_coder" / ".coderignore").write_text("\n".join(patterns))
+    monkeypatch.setattr(Work, "work_dir", str(tmp_path))
+    monkeypatch.setattr(CoderIgnore, "matcher", None)
+    return tmp_path
+
+
+def test_matcher_keeps_previous_results():
+    matcher = IgnoreMatcher(patterns)
+    for path in paths:
+        assert matcher.is_ignored(path) == ignored_by_previous_implementation(path), path
+
+
+def test_negated_patterns():
+    matcher = IgnoreMatcher(["logs/", "!logs/keep.txt"])
+    assert matcher.is_ignored("logs/app.log")
+    assert not matcher.is_ignored("logs/keep.txt")
+
+
+def test_recompiled_when_coderignore_changes(work_dir):
+    assert file_folder_ignored("README.md") is False
+    assert CoderIgnore.get_matcher() is CoderIgnore.get_matcher()
+    coderignore = work_dir / ".clean_coder" / ".coderignore"
+    coderignore.write_text("\n".join(patterns + ["*.md"]))
+    os.utime(coderignore, ns=(time.time_ns(), time.time_ns() + 10**9))
+    assert file_folder_ignored("README.md") is True
+
+
+def test_walk_does_not_descend_into_ignored_directories(work_dir):
+    for path in ["src/main.py", "src/main.pyc", "src/node_modules/lib/index.js", "node_modules/a.js", "docs/x.md"]:
+        (work_dir / path).parent.mkdir(parents=True, exist_ok=True)
+        (work_dir / path).write_text("")
+    walked = []
+    for root, dirs, files in walk_not_ignored(str(work_dir)):
+        rel_root = os.path.relpath(root, work_dir)
+        walked.append(rel_root)
+        walked += [os.path.join(rel_root, f) for f in files]
+    assert sorted(walked) == sorted([".", "src", "src/main.py", "docs", "docs/x.md"])
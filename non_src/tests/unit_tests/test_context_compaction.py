@@ -0,0 +1,108 @@
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
+from src.utilities.context_compaction import (
+    ContextCompactor,
+    split_to_turns,
+    compact_coding_agent_context,
+    APPLIED_CODE_PLACEHOLDER,
+    OUTDATED_SEE_FILE_OUTPUT,
+    OLD_TOOL_OUTPUT,
+    estimate_message_tokens,
+)
+from src.utilities.util_functions import WRONG_TOOL_CALL_WORD
+
+
+def conversation(turns_count):
+    messages = [SystemMessage(content="system"), HumanMessage(content="start")]
+    for i in range(turns_count):
+        messages.append(AIMessage(content="", tool_calls=[{"name": "see_file", "args": {"nr": i}, "id": f"call_{i}"}]))
+        messages.append(ToolMessage(content="x" * 400, tool_call_id=f"call_{i}"))
+    return messages
+
+
+def test_short_conversation_is_not_compacted():
+    messages = conversation(3)
+    assert ContextCompactor(max_tokens=10000).compact(messages) is messages
+
+
+def test_old_turns_are_summarized_into_digest():
+    compactor = ContextCompactor(max_tokens=1000)
+    compactor.llm = FakeListChatModel(responses=["first digest", "second digest"])
+    messages = compactor.compact(conversation(20))
+
+    assert messages[0].type == "system"
+    assert messages[1].content.endswith("first digest")
+    assert sum(len(msg.content) for msg in messages) < 4 * 1000
+    # every tool result kept together with its tool call
+    assert messages[2].type == "ai"
+    for turn in split_to_turns(messages[2:]):
+        assert [msg.type for msg in turn] == ["ai", "tool"]
+        assert turn[0].tool_calls[0]["id"] == turn[1].tool_call_id
+
+    messages = compactor.compact(messages + conversation(20)[2:])
+    assert len([msg for msg in messages if hasattr(msg, "contains_context_digest")]) == 1
+    assert messages[1].content.endswith("second digest")
+
+
+def test_failed_summary_keeps_previous_digest():
+    compactor = ContextCompactor(max_tokens=1000)
+    compactor.llm = FakeListChatModel(responses=["first digest"])
+    messages = compactor.compact(conversation(20))
+
+    # fake model without responses fails on every call
+    compactor.llm = FakeListChatModel(responses=[])
+    messages = compactor.compact(messages + conversation(20)[2:])
+    assert "first digest" in messages[1].content
+    assert "earlier messages were removed without summary" in messages[1].content
+
+
+def tool_turn(call_id, name, args, output):
+    return [
+        AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": call_id}]),
+        ToolMessage(content=output, tool_call_id=call_id),
+    ]
+
+
+def test_coding_agent_context_drops_obsolete_content():
+    messages = [SystemMessage(content="system"), HumanMessage(content="plan")]
+    messages += tool_turn("1", "see_file", {"filename": "a.py"}, "old view " * 100)
+    messages += tool_turn("2", "see_file", {"filename": "b.py"}, "b view")
+    messages += tool_turn("3", "replace_code", {"filename": "a.py", "code": "bad(", "start_line": 1, "end_line": 2},
+                          WRONG_TOOL_CALL_WORD + "Syntax error")
+    messages += tool_turn("4", "replace_code", {"filename": "a.py", "code": "good()", "start_line": 1, "end_line": 2},
+                          "Code modified.")
+    messages.append(HumanMessage(content="Logs:\nold", contains_logs=True))
+    messages.append(HumanMessage(content="Logs:\nnew", contains_logs=True))
+    messages += tool_turn("5", "insert_code", {"filename": "b.py", "code": "last()", "start_line": 1}, "Code inserted.")
+
+    compacted = compact_coding_agent_context(messages, max_tokens=10)
+    contents = [msg.content for msg in compacted]
+    assert contents[3] == OUTDATED_SEE_FILE_OUTPUT
+    # b.py view is outdated by edit in the latest turn, although that turn itself stays untouched
+    assert contents[5] == OUTDATED_SEE_FILE_OUTPUT
+    assert contents[7] == WRONG_TOOL_CALL_WORD + "Error resolved by a later change."
+    assert compacted[6].tool_calls[0]["args"]["code"] == APPLIED_CODE_PLACEHOLDER
+    assert compacted[8].tool_calls[0]["args"]["code"] == APPLIED_CODE_PLACEHOLDER
+    assert contents[10:12] == ["<outdated logs removed, see the latest ones>", "Logs:\nnew"]
+    assert compacted[12].tool_calls[0]["args"]["code"] == "last()"
+    # original messages are not modified
+    assert messages[6].tool_calls[0]["args"]["code"] == "bad("
+    assert compact_coding_agent_context(messages, max_tokens=100000) is messages
+
+
+def test_coding_agent_context_is_compacted_below_target():
+    messages = [SystemMessage(content="system"), HumanMessage(content="plan")]
+    for i in range(10):
+        messages += tool_turn(str(i), "see_file", {"filename": f"{i}.py"}, "x" * 400)
+    # just above the ceiling, no obsolete content to drop
+    compacted = compact_coding_agent_context(messages, max_tokens=1000)
+    tokens = sum(estimate_message_tokens(msg) for msg in compacted)
+    assert tokens <= 600
+    removed = [i for i, msg in enumerate(compacted) if msg.content == OLD_TOOL_OUTPUT]
+    # the oldest outputs are removed first, the latest turn is kept
+    assert removed == list(range(3, 3 + 2 * len(removed), 2))
+    assert compacted[-1].content == "x" * 400
+
+    # conversation grows again between target and ceiling without being compacted
+    grown = compacted + tool_turn("10", "see_file", {"filename": "10.py"}, "x" * 400)
+    assert compact_coding_agent_context(grown, max_tokens=1000) is grown
@@ -0,0 +1,70 @@
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.prompts import ChatPromptTemplate
+from src.tools.rag import description_engine
+from src.tools.rag.description_engine import DescriptionEngine, DescriptionJob
+
+
+class RateLimitedError(Exception):
+    status_code = 429
+
+
+class FlakyModel(FakeListChatModel):
+    """Fake provider rejecting first requests with rate limit error."""
+
+    failures_left: int = 0
+
+    def _call(self, *args, **kwargs):
+        if self.failures_left > 0:
+            self.failures_left -= 1
+            raise RateLimitedError("Too many requests")
+        return "description"
+
+
+class BrokenModel(FakeListChatModel):
+    def _call(self, *args, **kwargs):
+        raise ValueError("Provider is down")
+
+
+prompts = {"file": ChatPromptTemplate.from_template("{code}"), "chunk": ChatPromptTemplate.from_template("{code}")}
+
+
+def test_all_jobs_described(monkeypatch):
+    monkeypatch.setenv("INDEXING_MAX_IN_FLIGHT", "4")
+    jobs = [DescriptionJob("file", f"file_{i}.py", {"code": "x"}) for i in range(10)]
+    jobs.append(DescriptionJob("chunk", "file_0.py", {"code": "x"}, chunk_nr=0))
+    done = []
+    engine = DescriptionEngine([FlakyModel(responses=[""])], prompts)
+    failed = engine.run(jobs, lambda job, description: done.append((job.filename, job.chunk_nr, description)))
+    assert failed == []
+    assert len(done) == 11
+    assert ("file_0.py", 0, "description") in done
+
+
+def test_rate_limited_request_is_retried(monkeypatch):
+    monkeypatch.setattr(description_engine, "MAX_BACKOFF_SECONDS", 0)
+    monkeypatch.setattr(description_engine.random, "uniform", lambda a, b: 0)
+    done = []
+    engine = DescriptionEngine([FlakyModel(responses=[""], failures_left=2)], prompts)
+    failed = engine.run([DescriptionJob("file", "a.py", {"code": "x"})], lambda job, d: done.append(d))
+    assert failed == []
+    assert done == ["description"]
+
+
+def test_fallback_to_next_provider_and_failures():
+    done = []
+    engine = DescriptionEngine([BrokenModel(responses=[""]), FlakyModel(responses=[""])], prompts)
+    assert engine.run([DescriptionJob("file", "a.py", {"code": "x"})], lambda job, d: done.append(d)) == []
+    assert done == ["description"]
+
+    engine = DescriptionEngine([BrokenModel(responses=[""])], prompts)
+    job = DescriptionJob("file", "a.py", {"code": "x"})
+    assert engine.run([job], lambda job, d: None) == [job]
+
+
+def test_rate_limit_errors_are_recognized_by_status_only():
+    assert description_engine.is_rate_limit_error(RateLimitedError("Too many requests"))
+    assert description_engine.is_rate_limit_error(Exception("Error code: 429 - {'type': 'rate_limit'}"))
+    assert description_engine.is_rate_limit_error(Exception("Rate limit reached for requests"))
+    # numbers containing 429 are not statuses
+    assert not description_engine.is_rate_limit_error(ValueError("Prompt is too long: 14290 tokens"))
+    assert not description_engine.is_rate_limit_error(ConnectionError("Connection to localhost:8429 refused"))
@@ -0,0 +1,59 @@
+import pytest
+from src.utilities.start_work_functions import CoderIgnore, Work
+from src.utilities.directory_tree import DirectoryTreeSnapshot
+
+
+@pytest.fixture
+def work_dir(tmp_path, monkeypatch):
+    (tmp_path / ".clean_coder").mkdir()
+    (tmp_path / ".clean_coder" / ".coderignore").write_text(".clean_coder/\nnode_modules/\n/build\n")
+    for path in ["main.py", "src/app.py", "src/build/out.js", "build/out.js", "web/node_modules/lib/index.js"]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("")
+    (tmp_path / "empty").mkdir()
+    monkeypatch.setattr(Work, "work_dir", str(tmp_path))
+    monkeypatch.setattr(CoderIgnore, "matcher", None)
+    return tmp_path
+
+
+def test_tree_prunes_ignored_paths(work_dir):
+    tree = DirectoryTreeSnapshot(str(work_dir)).render()
+    assert tree == "\n".join(
+        [
+            "Content of directory tree:",
+            "📁 ",
+            "│ └── main.py",
+            "📁 empty",
+            "│ <Directory is empty>",
+            "📁 src",
+            "│ └── app.py",
+            # anchored pattern /build does not hide nested build directory
+            "│ └──📁 build",
+            "│ │ └── out.js",
+            "📁 web",
+            "│ <Directory is empty>",
+        ]
+    )
+
+
+def test_tree_rescans_changed_directories_only(work_dir, monkeypatch):
+    snapshot = DirectoryTreeSnapshot(str(work_dir))
+    first = snapshot.render()
+    scanned = []
+    original_scan = snapshot.scan
+    monkeypatch.setattr(snapshot, "scan", lambda rel_dir, mtime: scanned.append(rel_dir) or original_scan(rel_dir, mtime))
+
+    assert snapshot.render() is first
+    assert scanned == []
+
+    (work_dir / "src" / "utils.py").write_text("")
+    snapshot.mark_changed("src/utils.py")
+    assert "│ ├── app.py\n│ └── utils.py" in snapshot.render()
+    assert "src/build" not in scanned and "web" not in scanned
+
+
+def test_symlinked_directories_are_shown_but_not_followed(work_dir):
+    (work_dir / "src" / "loop").symlink_to(work_dir, target_is_directory=True)
+    tree = DirectoryTreeSnapshot(str(work_dir)).render()
+    assert "│ └──📁 loop (symlink, not expanded)" in tree.splitlines()
+    assert tree.count("main.py") == 1
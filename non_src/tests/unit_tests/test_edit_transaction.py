@@ -0,0 +1,94 @@
+import os
+import tempfile
+import pytest
+from langchain_core.messages import AIMessage
+
+os.environ.setdefault("WORK_DIR", tempfile.gettempdir())
+from src.utilities import edit_transaction
+from src.utilities.langgraph_common_functions import call_tool
+from src.tools.tools_coder_pipeline import prepare_insert_code_tool, prepare_replace_code_tool, prepare_see_file_tool
+
+CODE = "def first():\n    return 1\n\n\ndef second():\n    return 2\n"
+
+
+@pytest.fixture
+def syntax_checks(monkeypatch):
+    checked = []
+    validate_syntax = edit_transaction.validate_syntax
+    monkeypatch.setattr(edit_transaction, "user_input", lambda message: "ok")
+    monkeypatch.setattr(
+        edit_transaction,
+        "validate_syntax",
+        lambda code, filename: checked.append(filename) or validate_syntax(code, filename),
+    )
+    return checked
+
+
+def replacement(call_id, start_line, end_line, code):
+    args = {"filename": "app.py", "start_line": start_line, "end_line": end_line, "code": code}
+    return {"name": "replace_code", "args": args, "id": call_id}
+
+
+def insertion(call_id, start_line, code):
+    args = {"filename": "app.py", "start_line": start_line, "code": code}
+    return {"name": "insert_code", "args": args, "id": call_id}
+
+
+def edit_file(work_dir, calls):
+    tools = [
+        prepare_insert_code_tool(str(work_dir)),
+        prepare_replace_code_tool(str(work_dir)),
+        prepare_see_file_tool(str(work_dir)),
+    ]
+    state = {"messages": [AIMessage(content="", tool_calls=calls)]}
+    call_tool(state, tools)
+    return [msg.content for msg in state["messages"][1:]]
+
+
+def test_edits_of_file_are_applied_together(tmp_path, syntax_checks):
+    (tmp_path / "app.py").write_text(CODE)
+    outputs = edit_file(
+        tmp_path,
+        [
+            replacement("1", 2, 2, "    return 10"),
+            insertion("2", 6, "    # last"),
+            replacement("3", 5, 5, "def third():"),
+        ],
+    )
+    assert outputs == ["Code modified.", "Code inserted.", "Code modified."]
+    expected = "def first():\n    return 10\n\n\ndef third():\n    return 2\n    # last\n"
+    assert (tmp_path / "app.py").read_text() == expected
+    # syntax checked once for all edits, no temporary files left
+    assert syntax_checks == ["app.py"]
+    assert os.listdir(tmp_path) == ["app.py"]
+
+
+def test_failed_edit_rolls_back_edits_of_the_same_file(tmp_path, syntax_checks):
+    (tmp_path / "app.py").write_text(CODE)
+    outputs = edit_file(
+        tmp_path,
+        [
+            replacement("1", 2, 2, "    return 10"),
+            insertion("2", 4, "def broken("),
+        ],
+    )
+    assert all(output.startswith(edit_transaction.WRONG_TOOL_CALL_WORD) for output in outputs)
+    assert "None of 2 changes of app.py been applied." in outputs[0]
+    assert (tmp_path / "app.py").read_text() == CODE
+
+
+def test_edits_separated_by_read_only_call_roll_back_together(tmp_path, syntax_checks):
+    (tmp_path / "app.py").write_text(CODE)
+    outputs = edit_file(
+        tmp_path,
+        [
+            replacement("1", 2, 2, "    return 10"),
+            {"name": "see_file", "args": {"filename": "app.py"}, "id": "2"},
+            insertion("3", 4, "def broken("),
+        ],
+    )
+    assert outputs[0].startswith(edit_transaction.WRONG_TOOL_CALL_WORD)
+    assert "None of 2 changes of app.py been applied." in outputs[0]
+    assert outputs[2].startswith(edit_transaction.WRONG_TOOL_CALL_WORD)
+    assert (tmp_path / "app.py").read_text() == CODE
+    assert syntax_checks == ["app.py"]
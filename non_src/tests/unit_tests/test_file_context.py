@@ -0,0 +1,54 @@
+from langchain_core.messages import SystemMessage, HumanMessage
+from src.utilities import util_functions
+from src.utilities.util_functions import exchange_file_contents, read_file_snapshots
+from src.utilities.objects import CodeFile
+
+
+def initial_state(files, work_dir):
+    return {
+        "messages": [
+            SystemMessage(content="system"),
+            HumanMessage(content="plan"),
+            HumanMessage(
+                content="File contents",
+                contains_file_contents=True,
+                file_snapshots=read_file_snapshots(files, work_dir),
+            ),
+        ]
+    }
+
+
+def test_diff_mode_appends_changed_fragments(tmp_path, monkeypatch):
+    monkeypatch.setattr(util_functions, "file_context_mode", "diff")
+    monkeypatch.setattr(util_functions, "MAX_FILE_DIFFS_SHARE", 100)
+    lines = [f"line {i}" for i in range(1, 41)]
+    (tmp_path / "a.py").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("unchanged\n", encoding="utf-8")
+    files = [CodeFile("a.py"), CodeFile("b.py")]
+    state = initial_state(files, str(tmp_path))
+
+    state = exchange_file_contents(state, files, str(tmp_path))
+    assert len(state["messages"]) == 3
+
+    lines[19:20] = ["new line a", "new line b"]
+    (tmp_path / "a.py").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    state = exchange_file_contents(state, files, str(tmp_path))
+    assert state["messages"][2].content == "File contents"
+    changes = state["messages"][-1].content
+    assert "a.py" in changes and "b.py" not in changes
+    assert "Lines 18-22 before, now lines 18-23; lines below shifted by +1" in changes
+    assert "21|new line b |21" in changes
+    assert "line 30" not in changes
+
+
+def test_full_contents_rebuilt_when_diffs_grow(tmp_path, monkeypatch):
+    monkeypatch.setattr(util_functions, "file_context_mode", "diff")
+    (tmp_path / "a.py").write_text("x = 1\n", encoding="utf-8")
+    files = [CodeFile("a.py")]
+    state = initial_state(files, str(tmp_path))
+
+    (tmp_path / "a.py").write_text("x = 2\n", encoding="utf-8")
+    state = exchange_file_contents(state, files, str(tmp_path))
+    file_msgs = [msg for msg in state["messages"] if hasattr(msg, "file_snapshots")]
+    assert len(file_msgs) == 1
+    assert "1|x = 2 |1" in state["messages"][2].content
@@ -0,0 +1,80 @@
+import os
+import tempfile
+
+os.environ.setdefault("WORK_DIR", tempfile.gettempdir())
+from src.utilities.file_view import formatted_lines, file_outline, symbol_range
+from src.tools.tools_coder_pipeline import prepare_see_file_tool
+
+python_code = '''import os
+
+
+class Greeter:
+    """Says hello."""
+
+    @staticmethod
+    def greet(name):
+        return f"Hello {name}"
+
+
+def main():
+    print(Greeter.greet("world"))
+'''
+
+js_code = """import x from 'y';
+
+export function add(a, b) {
+  return a + b;
+}
+
+const multiply = (a, b) => {
+  return a * b;
+};
+
+class Calculator {
+  sum(values) {
+    return values.reduce(add, 0);
+  }
+}
+"""
+
+
+def test_formatted_lines_cached_per_version(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_text("x = 1\ny = 2\n", encoding="utf-8")
+    assert formatted_lines(str(path)) == ["1|x = 1|1\n", "2|y = 2|2\n"]
+    assert formatted_lines(str(path)) is formatted_lines(str(path))
+
+    path.write_text("x = 10\n", encoding="utf-8")
+    os.utime(path, ns=(1, 1))
+    assert formatted_lines(str(path)) == ["1|x = 10|1\n"]
+
+
+def test_python_outline_and_symbols(tmp_path):
+    path = tmp_path / "greeter.py"
+    path.write_text(python_code, encoding="utf-8")
+    outline = file_outline(str(path))
+    assert [(nr, level, name) for nr, level, name, _ in outline] == [(4, 0, "Greeter"), (8, 1, "greet"), (12, 0, "main")]
+    assert symbol_range(str(path), "Greeter.greet") == (7, 9)
+    assert symbol_range(str(path), "main") == (12, 13)
+    assert symbol_range(str(path), "missing") is None
+
+
+def test_js_outline_and_symbols(tmp_path):
+    path = tmp_path / "calc.js"
+    path.write_text(js_code, encoding="utf-8")
+    outline = file_outline(str(path))
+    assert [name for _, _, name, _ in outline] == ["add", "multiply", "Calculator", "sum"]
+    assert symbol_range(str(path), "multiply") == (7, 9)
+    assert symbol_range(str(path), "Calculator.sum") == (12, 14)
+
+
+def test_see_file_rejects_wrong_line_ranges(tmp_path):
+    (tmp_path / "greeter.py").write_text(python_code, encoding="utf-8")
+    see_file = prepare_see_file_tool(str(tmp_path))
+    assert see_file.invoke({"filename": "greeter.py", "start_line": 8, "end_line": 9}).startswith(
+        "greeter.py (lines 8-9 of 13)"
+    )
+    assert see_file.invoke({"filename": "greeter.py", "start_line": 9, "end_line": 8}) == (
+        "end_line 8 is before start_line 9."
+    )
+    assert see_file.invoke({"filename": "greeter.py", "start_line": 20}) == "greeter.py has only 13 lines."
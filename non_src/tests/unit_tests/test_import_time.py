@@ -0,0 +1,64 @@
+import os
+import re
+import sys
+import tempfile
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+# modules imported by manager.py and single_task_coder.py before the first prompt
+CLI_MODULES = [
+    "src.agents.researcher_agent",
+    "src.agents.planner_agent",
+    "src.agents.executor_agent",
+    "src.agents.debugger_agent",
+    "src.agents.frontend_feedback",
+    "src.utilities.user_input",
+    "src.utilities.manager_utils",
+    "src.tools.rag.rag_utils",
+    "src.tools.rag.index_file_descriptions",
+    "src.linters.static_analisys",
+]
+# heavy subsystems, loaded on first use only
+LAZY_MODULES = [
+    "chromadb",
+    "esprima",
+    "sass",
+    "lxml",
+    "langchain_anthropic",
+    "langchain_openai",
+    "langchain_ollama",
+    "openai",
+    "sounddevice",
+    "todoist_api_python",
+]
+IMPORT_TIME_BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", 4))
+import_time_line = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|( +)(\S+)")
+
+
+def measure_imports():
+    """Returns {module: cumulative import time in microseconds} of modules imported by CLI, from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(CLI_MODULES)],
+        cwd=REPO_ROOT,
+        env={**os.environ, "WORK_DIR": tempfile.gettempdir()},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-3000:]
+    times = {}
+    top_level_total = 0
+    for line in result.stderr.splitlines():
+        match = import_time_line.match(line)
+        if match:
+            times[match.group(3)] = int(match.group(1))
+            if len(match.group(2)) == 1:
+                top_level_total += int(match.group(1))
+    return times, top_level_total
+
+
+def test_cli_startup_imports():
+    times, total = measure_imports()
+    assert [module for module in LAZY_MODULES if module in times] == []
+    slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[:10]
+    assert total / 1e6 < IMPORT_TIME_BUDGET_SECONDS, f"Startup imports took {total / 1e6:.2f}s: {slowest}"
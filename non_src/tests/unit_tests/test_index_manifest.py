@@ -0,0 +1,100 @@
+import os
+import tempfile
+import pytest
+from pathlib import Path
+from src.tools.rag.index_manifest import IndexManifest, content_hash
+from src.utilities.objects import CodeFile
+
+os.environ.setdefault("WORK_DIR", tempfile.gettempdir())
+import src.tools.rag.index_file_descriptions as index_file_descriptions
+
+
+@pytest.fixture
+def work_dir(tmp_path):
+    (tmp_path / "a.py").write_text("print('a')\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("print('b')\n", encoding="utf-8")
+    return str(tmp_path)
+
+
+def test_new_files_are_changed(work_dir):
+    manifest = IndexManifest(work_dir)
+    changed, deleted = manifest.find_changes([CodeFile("a.py"), CodeFile("b.py")], full_scan=True)
+    assert [file.filename for file in changed] == ["a.py", "b.py"]
+    assert deleted == []
+
+
+def test_unchanged_files_are_skipped_after_save(work_dir):
+    manifest = IndexManifest(work_dir)
+    manifest.update("a.py", content_hash("print('a')\n"), [])
+    manifest.update("b.py", content_hash("old content"), [])
+    manifest.save()
+
+    reloaded = IndexManifest(work_dir)
+    changed, deleted = reloaded.find_changes([CodeFile("a.py"), CodeFile("b.py")])
+    assert [file.filename for file in changed] == ["b.py"]
+    assert deleted == []
+
+
+def test_deleted_files(work_dir):
+    manifest = IndexManifest(work_dir)
+    manifest.update("a.py", content_hash("print('a')\n"), [])
+    manifest.update("removed.py", "hash", ["chunk_hash"])
+
+    _, deleted = manifest.find_changes([CodeFile("removed.py")])
+    assert deleted == ["removed.py"]
+    _, deleted = manifest.find_changes([CodeFile("b.py")], full_scan=True)
+    assert sorted(deleted) == ["a.py", "removed.py"]
+
+
+def test_checkpoint_survives_reload(work_dir):
+    manifest = IndexManifest(work_dir)
+    manifest.update("a.py", "old_hash", ["chunk_0", "chunk_1"])
+    manifest.start_file("a.py", "new_hash")
+    manifest.checkpoint_description("a.py")
+    manifest.checkpoint_description("a.py", chunk_nr=1, chunk_hash="new_chunk_1")
+    manifest.save()
+
+    reloaded = IndexManifest(work_dir)
+    assert reloaded.pending["a.py"]["described"]
+    assert reloaded.described_chunks("a.py") == {0: "chunk_0", 1: "new_chunk_1"}
+    # whole file description is outdated when file changed again
+    assert not reloaded.start_file("a.py", "newest_hash")["described"]
+
+    reloaded.update("a.py", "newest_hash", ["chunk_0"])
+    assert reloaded.pending == {}
+
+
+class Answer:
+    def ask(self):
+        return "Skip"
+
+
+class StoredCollection:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def get(self, include):
+        return {"ids": self.ids}
+
+
+def test_index_without_manifest_is_adopted(work_dir, monkeypatch):
+    (Path(work_dir) / "c.py").write_text("print('c')\n", encoding="utf-8")
+    stored_ids = ["a.py", "b.py", "removed.py", "removed.py_chunk0", "removed.py_chunk1"]
+    monkeypatch.setattr(index_file_descriptions, "work_dir", work_dir)
+    monkeypatch.setattr(index_file_descriptions, "vdb_available", lambda: True)
+    monkeypatch.setattr(index_file_descriptions, "get_vdb_collection", lambda: StoredCollection(stored_ids))
+    monkeypatch.setattr(index_file_descriptions, "sync_lexical_index", lambda manifest: None)
+    asked = []
+    monkeypatch.setattr(
+        index_file_descriptions.questionary, "select", lambda question, **kwargs: asked.append(question) or Answer()
+    )
+
+    index_file_descriptions.prompt_index_project_files()
+    manifest = IndexManifest(work_dir)
+    assert manifest.file_hash("a.py") == content_hash("print('a')\n")
+    assert manifest.chunk_hashes("removed.py") == [None, None]
+    changed, deleted = manifest.find_changes([CodeFile("a.py"), CodeFile("b.py"), CodeFile("c.py")], full_scan=True)
+    # only file missing in vector storage is described
+    assert [file.filename for file in changed] == ["c.py"]
+    assert deleted == ["removed.py"]
+    assert len(asked) == 1 and asked[0].startswith("Found 1 new or modified and 1 deleted files")
@@ -0,0 +1,39 @@
+from src.tools.rag.lexical_index import LexicalIndex, reciprocal_rank_fusion, extract_terms
+
+
+def build_index(work_dir):
+    index = LexicalIndex(work_dir)
+    index.index_file("src/retrieval.py", "def get_collection(create=False):\n    return client\n", "hash_1")
+    index.index_file("src/indexing.py", "collection = get_collection(create=True)\ncollection.upsert()\n", "hash_2")
+    index.index_file("README.md", "Describes how to create collection of files.\n", "hash_3")
+    return index
+
+
+def test_compound_identifiers_are_kept_whole():
+    assert extract_terms("RERANK_STRATEGY getCollection") == [
+        "rerank", "strategy", "get", "collection", "rerank_strategy", "getcollection"
+    ]
+
+
+def test_defining_file_ranks_first(tmp_path):
+    index = build_index(str(tmp_path))
+    results = index.search("where is get_collection defined?")
+    assert [filename for filename, _ in results][:2] == ["src/retrieval.py", "src/indexing.py"]
+    assert index.search("unknown_symbol") == []
+
+
+def test_remove_and_reload(tmp_path):
+    index = build_index(str(tmp_path))
+    index.remove("src/retrieval.py")
+    index.save()
+
+    reloaded = LexicalIndex(str(tmp_path))
+    assert sorted(reloaded.filenames()) == ["README.md", "src/indexing.py"]
+    assert reloaded.file_hash("src/indexing.py") == "hash_2"
+    assert reloaded.search("get_collection")[0][0] == "src/indexing.py"
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d"]])
+    assert fused[0] == "c"
+    assert set(fused) == {"a", "b", "c", "d"}
@@ -0,0 +1,73 @@
+import time
+import pytest
+from src.utilities.llm_router import LLMRouter, AllLLMsFailed, MIN_SAMPLES
+
+
+class MockProvider:
+    """Stands in for a chat model of a real endpoint, answering after given latency or failing."""
+
+    def __init__(self, model, latency=0.0, fail=False):
+        self.model = model
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.fail:
+            raise ConnectionError(f"{self.model} unavailable")
+        return f"answer of {self.model}"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def request(llm):
+    return llm.invoke([])
+
+
+def test_failing_provider_skipped_during_cooldown():
+    clock = FakeClock()
+    router = LLMRouter(cooldown_seconds=60, clock=clock)
+    primary, backup = MockProvider("primary", fail=True), MockProvider("backup")
+    failures = []
+
+    def on_failure(llm, e):
+        failures.append(llm.model)
+
+    for _ in range(2):
+        assert router.invoke([primary, backup], request, on_failure=on_failure) == "answer of backup"
+    assert failures == ["primary", "primary"]
+    # cooled down after failures in a row, backup asked first
+    assert router.invoke([primary, backup], request) == "answer of backup"
+    assert primary.calls == 2
+
+    clock.now += 61
+    primary.fail = False
+    assert router.invoke([primary, backup], request) == "answer of primary"
+    assert primary.calls == 3
+
+
+def test_all_providers_failing():
+    router = LLMRouter(cooldown_seconds=60)
+    with pytest.raises(AllLLMsFailed):
+        router.invoke([MockProvider("a", fail=True), MockProvider("b", fail=True)], request)
+
+
+def test_hedged_request_after_latency_percentile():
+    router = LLMRouter(cooldown_seconds=60, hedge_percentile=95)
+    primary, backup = MockProvider("primary", latency=0.01), MockProvider("backup")
+    for _ in range(MIN_SAMPLES):
+        router.invoke([primary, backup], request)
+    assert backup.calls == 0
+
+    primary.latency = 2.0
+    start = time.monotonic()
+    assert router.invoke([primary, backup], request) == "answer of backup"
+    assert time.monotonic() - start < 1.0
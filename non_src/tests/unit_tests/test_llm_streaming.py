@@ -0,0 +1,92 @@
+import os
+import tempfile
+import threading
+from langchain_core.messages import AIMessageChunk, HumanMessage
+from langchain_core.tools import tool
+
+os.environ.setdefault("WORK_DIR", tempfile.gettempdir())
+from src.utilities import langgraph_common_functions
+from src.utilities.langgraph_common_functions import call_model, call_tool
+from src.utilities.llm_streaming import stream_response
+from src.tools.tools_coder_pipeline import read_only
+
+looked_at = []
+first_look_done = threading.Event()
+
+
+@read_only
+@tool
+def look(name: str):
+    """Reads something."""
+    looked_at.append(name)
+    first_look_done.set()
+    return f"seen {name}"
+
+
+def tool_chunk(index, args, call_id=None, name=None):
+    block = {"type": "tool_use", "index": index}
+    block.update({"id": call_id, "name": name, "input": {}} if call_id else {"partial_json": args})
+    return AIMessageChunk(
+        content=[block], tool_call_chunks=[{"index": index, "id": call_id, "name": name, "args": args}]
+    )
+
+
+class FakeStreamingLLM:
+    def __init__(self, wait_for_dispatch=False):
+        self.wait_for_dispatch = wait_for_dispatch
+        self.dispatched_before_end = None
+
+    def stream(self, messages):
+        yield AIMessageChunk(content=[{"type": "text", "text": "Let me ", "index": 0}])
+        yield AIMessageChunk(content=[{"type": "text", "text": "look.", "index": 0}])
+        yield tool_chunk(1, "", "call_1", "look")
+        yield tool_chunk(1, '{"name": ')
+        yield tool_chunk(1, '"a"}')
+        yield tool_chunk(2, "", "call_2", "look")
+        if self.wait_for_dispatch:
+            # first call is complete once the model started the next one
+            self.dispatched_before_end = first_look_done.wait(timeout=5)
+        yield tool_chunk(2, '{"name": "b"}')
+
+
+def test_stream_assembles_text_and_tool_calls():
+    reported = []
+    response = stream_response(FakeStreamingLLM(), [], printing=False, on_tool_call=reported.append)
+    assert response.type == "ai"
+    assert response.content == [{"type": "text", "text": "Let me look."}]
+    assert [(call["id"], call["args"]) for call in response.tool_calls] == [
+        ("call_1", {"name": "a"}),
+        ("call_2", {"name": "b"}),
+    ]
+    # the last call is complete only at the end of stream, when call_tool runs anyway
+    assert [call["id"] for call in reported] == ["call_1"]
+
+
+def test_read_only_call_dispatched_during_streaming(monkeypatch):
+    monkeypatch.setattr(langgraph_common_functions, "llm_streaming_enabled", True)
+    llm = FakeStreamingLLM(wait_for_dispatch=True)
+    state = {"messages": [HumanMessage(content="task")]}
+    call_model(state, [llm], printing=False, tools=[look])
+    assert llm.dispatched_before_end
+    call_tool(state, [look])
+    # prefetched result reused, not executed again
+    assert looked_at == ["a", "b"]
+    assert [msg.content for msg in state["messages"][2:]] == ["seen a", "seen b"]
+
+
+class FailingStreamingLLM:
+    def stream(self, messages):
+        yield tool_chunk(1, "", "failed_call", "look")
+        yield tool_chunk(1, '{"name": "x"}')
+        yield tool_chunk(2, "", "failed_call_2", "look")
+        raise ConnectionError("stream interrupted")
+
+
+def test_calls_dispatched_by_failed_attempt_are_dropped(monkeypatch):
+    monkeypatch.setattr(langgraph_common_functions, "llm_streaming_enabled", True)
+    state = {"messages": [HumanMessage(content="task")]}
+    call_model(state, [FailingStreamingLLM(), FakeStreamingLLM()], printing=False, tools=[look])
+    assert "failed_call" not in langgraph_common_functions.prefetched_tool_results
+    call_tool(state, [look])
+    assert langgraph_common_functions.prefetched_tool_results == {}
+    assert [msg.content for msg in state["messages"][2:]] == ["seen a", "seen b"]
@@ -0,0 +1,20 @@
+from src.utilities import llms
+from src.utilities.prompt_caching import unwrap_model
+
+
+def test_agents_share_model_clients(monkeypatch):
+    for name in ("OPENROUTER_API_KEY", "OLLAMA_MODEL", "LOCAL_MODEL_API_BASE"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "key")
+    monkeypatch.setenv("OPENAI_API_KEY", "key")
+
+    executor_llms = llms.init_llms_medium_intelligence(tools=[], run_name="Executor")
+    debugger_llms = llms.init_llms_medium_intelligence(tools=[], run_name="Debugger")
+    mini_llms = llms.init_llms_mini(run_name="File Describer")
+
+    assert len(executor_llms) == 2
+    assert all(unwrap_model(a) is unwrap_model(b) for a, b in zip(executor_llms, debugger_llms))
+    assert unwrap_model(executor_llms[0]) is not unwrap_model(mini_llms[0])
+    # different OpenAI models use one connection pool
+    assert unwrap_model(executor_llms[1]).model_name == "gpt-4.1"
+    assert unwrap_model(executor_llms[1]).root_client._client is unwrap_model(mini_llms[1]).root_client._client
@@ -0,0 +1,45 @@
+from langchain_anthropic import ChatAnthropic
+from langchain_openai import ChatOpenAI
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
+from src.utilities.prompt_caching import add_cache_breakpoints, PromptCacheStats
+
+messages = [
+    SystemMessage(content="system"),
+    HumanMessage(content="plan"),
+    HumanMessage(content="file contents", contains_file_contents=True),
+    AIMessage(content="", tool_calls=[{"name": "see_file", "args": {}, "id": "call_1"}]),
+    ToolMessage(content="tool output", tool_call_id="call_1"),
+]
+
+
+def cached_indexes(messages):
+    return [
+        i
+        for i, msg in enumerate(messages)
+        if isinstance(msg.content, list) and "cache_control" in msg.content[-1]
+    ]
+
+
+def test_breakpoints_for_anthropic_only():
+    anthropic = ChatAnthropic(model="claude-sonnet-4-20250514", api_key="key").bind_tools([]).with_config({})
+    marked = add_cache_breakpoints(messages, anthropic)
+    assert cached_indexes(marked) == [0, 2, 4]
+    assert marked[2].content[-1]["text"] == "file contents"
+    # messages in agent state are not modified
+    assert cached_indexes(messages) == []
+
+    openai = ChatOpenAI(model="gpt-4.1", api_key="key")
+    assert add_cache_breakpoints(messages, openai) is messages
+
+
+def test_cache_stats():
+    stats = PromptCacheStats()
+    stats.record(AIMessage(content="", usage_metadata={
+        "input_tokens": 1000, "output_tokens": 10, "total_tokens": 1010,
+        "input_token_details": {"cache_read": 900, "cache_creation": 100},
+    }))
+    stats.record(AIMessage(content="", usage_metadata={
+        "input_tokens": 1000, "output_tokens": 10, "total_tokens": 1010,
+    }))
+    assert stats.hit_rate() == 0.45
+    assert stats.cache_creation_tokens == 100
@@ -0,0 +1,51 @@
+from src.tools.rag.retrieval_cache import RetrievalCache, normalize_query
+
+
+def test_normalized_queries_share_entry(tmp_path):
+    cache = RetrievalCache(str(tmp_path))
+    cache.set_response("User profile endpoint", "binary", "profile.py")
+    assert cache.get_response("  user   profile endpoint?", "binary") == "profile.py"
+    assert cache.get_response("user profile endpoint", "listwise") is None
+    assert normalize_query("Styles of  Button.") == "styles of button"
+
+
+def test_invalidation_by_index_generation(tmp_path):
+    cache = RetrievalCache(str(tmp_path))
+    cache.set_response("query", "binary", "response")
+    cache.set_verdicts("query", [("a.py", True), ("b.py", False)])
+    cache.invalidate(["a.py"])
+
+    reloaded = RetrievalCache(str(tmp_path))
+    assert reloaded.get_response("query", "binary") is None
+    assert reloaded.get_verdict("query", "a.py") is None
+    assert reloaded.get_verdict("query", "b.py") is False
+
+
+def test_lru_eviction(tmp_path, monkeypatch):
+    monkeypatch.setenv("RETRIEVAL_CACHE_SIZE", "2")
+    cache = RetrievalCache(str(tmp_path))
+    cache.set_response("first", "binary", "1")
+    cache.set_response("second", "binary", "2")
+    cache.get_response("first", "binary")
+    cache.set_response("third", "binary", "3")
+    assert cache.get_response("first", "binary") == "1"
+    assert cache.get_response("second", "binary") is None
+
+
+def test_entries_are_saved_in_batches(tmp_path):
+    cache = RetrievalCache(str(tmp_path))
+    cache.set_response("query", "binary", "response")
+    assert RetrievalCache(str(tmp_path)).get_response("query", "binary") is None
+    cache.flush()
+    assert RetrievalCache(str(tmp_path)).get_response("query", "binary") == "response"
+
+
+def test_generations_of_documents_without_verdicts_are_dropped(tmp_path):
+    cache = RetrievalCache(str(tmp_path))
+    cache.set_verdicts("query", [("a.py", True)])
+    cache.invalidate(["a.py", "b.py"])
+    assert set(cache.doc_generations) == {"a.py"}
+    # verdict of b.py cached after invalidation is valid
+    cache.set_verdicts("query", [("b.py", True)])
+    assert cache.get_verdict("query", "b.py") is True
+    assert cache.get_verdict("query", "a.py") is None
@@ -0,0 +1,41 @@
+from src.linters import syntax_validation
+from src.linters.syntax_checker_functions import check_bracket_balance, check_syntax
+from src.linters.syntax_validation import SyntaxValidator, BlockLanguage, python_block_starts
+
+CODE = "import os\n\n\n@decorator\ndef first():\n    return 1\n\n\ndef second():\n    return 2\n"
+
+
+def test_bracket_balance_reports_first_unbalanced_pair():
+    assert check_bracket_balance("f(a[0], {'b': (1, 2)})") == "Valid syntax"
+    assert check_bracket_balance("{(}") == "Invalid syntax, mismatch of ( and )"
+    assert check_bracket_balance("a[0]] + [") == "Invalid syntax, mismatch of [ and ]"
+    assert check_bracket_balance("(}{)") == "Invalid syntax, mismatch of { and }"
+
+
+def test_only_changed_blocks_are_parsed(monkeypatch):
+    parsed = []
+    monkeypatch.setitem(
+        syntax_validation.BLOCK_LANGUAGES,
+        "py",
+        BlockLanguage(lambda code: parsed.append(code) or python_block_starts(code)),
+    )
+    validator = SyntaxValidator()
+    assert validator.validate(CODE, "app.py") == "Valid syntax"
+    assert parsed == [CODE]
+
+    edited = CODE.replace("return 1", "value = 1\n    return value")
+    assert validator.validate(edited, "app.py") == "Valid syntax"
+    assert parsed[-1] == "@decorator\ndef first():\n    value = 1\n    return value\n\n\n"
+    # same version is not checked again
+    assert validator.validate(edited, "app.py") == "Valid syntax"
+    assert len(parsed) == 2
+
+
+def test_errors_are_reported_as_by_full_check():
+    validator = SyntaxValidator()
+    validator.validate(CODE, "app.py")
+    broken = CODE.replace("return 2", "return (2")
+    assert validator.validate(broken, "app.py") == check_syntax(broken, "app.py")
+    # block split by edit does not parse on its own, but whole file does
+    split = CODE.replace("def second():\n    return 2\n", "if True:\n    pass\nelse:\n    pass\n")
+    assert validator.validate(split, "app.py") == "Valid syntax"
@@ -0,0 +1,98 @@
+import os
+import tempfile
+from collections import deque
+import pytest
+
+os.environ.setdefault("WORK_DIR", tempfile.gettempdir())
+from src.utilities.start_work_functions import CoderIgnore, Work
+from src.utilities.directory_tree import DirectoryTreeSnapshot
+from src.utilities.workspace_watcher import WorkspaceWatcher
+from src.tools.rag import rag_utils
+from src.tools.rag.index_manifest import IndexManifest, content_hash
+
+
+@pytest.fixture
+def work_dir(tmp_path, monkeypatch):
+    (tmp_path / ".clean_coder").mkdir()
+    (tmp_path / ".clean_coder" / ".coderignore").write_text(".clean_coder/\nnode_modules/\n")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("x = 1\n")
+    monkeypatch.setattr(Work, "work_dir", str(tmp_path))
+    monkeypatch.setattr(CoderIgnore, "matcher", None)
+    return tmp_path
+
+
+def test_polling_publishes_changes_with_generations(work_dir):
+    watcher = WorkspaceWatcher(str(work_dir))
+    watcher.states = watcher.scan()
+    published = []
+    watcher.subscribe(published.append)
+
+    (work_dir / "src" / "app.py").write_text("x = 10\n")
+    (work_dir / "src" / "new.py").write_text("")
+    (work_dir / "node_modules").mkdir()
+    (work_dir / "node_modules" / "lib.js").write_text("")
+    watcher.poll_once()
+    assert sorted((change.path, change.kind) for change in published[0]) == [
+        ("src/app.py", "modified"),
+        ("src/new.py", "created"),
+    ]
+    assert watcher.generation == 1
+
+    # nothing changed
+    watcher.poll_once()
+    assert watcher.generation == 1
+
+    os.remove(work_dir / "src" / "new.py")
+    watcher.poll_once()
+    assert [(change.path, change.kind) for change in published[1]] == [("src/new.py", "deleted")]
+    assert watcher.generation == 2
+    assert sorted(watcher.changes_since(0)) == ["src/app.py", "src/new.py"]
+    assert watcher.changes_since(1) == ["src/new.py"]
+    assert watcher.changes_since(2) == []
+
+
+def test_watched_tree_rescans_reported_directories_only(work_dir, monkeypatch):
+    watcher = WorkspaceWatcher(str(work_dir))
+    watcher.states = watcher.scan()
+    snapshot = DirectoryTreeSnapshot(str(work_dir))
+    snapshot.follow(watcher)
+    assert "app.py" in snapshot.render()
+
+    stats = []
+    original_stat = os.stat
+    monkeypatch.setattr(os, "stat", lambda path, *args, **kwargs: stats.append(path) or original_stat(path))
+    rendered = snapshot.render()
+    assert snapshot.render() is rendered
+    # only .coderignore is checked for changes, directories are not
+    assert all(str(path).endswith(".coderignore") for path in stats)
+
+    (work_dir / "src" / "new.py").write_text("")
+    watcher.poll_once()
+    assert "new.py" in snapshot.render()
+
+
+def test_changes_forgotten_by_watcher_are_found_in_manifest(work_dir, monkeypatch):
+    manifest = IndexManifest(str(work_dir))
+    manifest.update("src/app.py", content_hash("x = 1\n"), [None])
+    manifest.update("src/old.py", content_hash("y = 1\n"), [None])
+    manifest.save()
+    watcher = WorkspaceWatcher(str(work_dir))
+    watcher.history = deque(maxlen=2)
+    watcher.states = watcher.scan()
+    monkeypatch.setattr(rag_utils, "get_workspace_watcher", lambda: watcher)
+    monkeypatch.setattr(rag_utils, "indexed_generation", 0)
+
+    (work_dir / "src" / "app.py").write_text("x = 10\n")
+    (work_dir / "src" / "new.py").write_text("")
+    watcher.poll_once()
+    for name in ["first.txt", "second.txt"]:
+        (work_dir / name).write_text("")
+        watcher.poll_once()
+    assert watcher.changes_since(0) is None
+
+    changed = rag_utils.files_changed_outside([])
+    # modified and deleted indexed files, and new ones
+    assert sorted(file.filename for file in changed) == ["src/app.py", "src/new.py", "src/old.py"]
+    assert rag_utils.indexed_generation == 3
+    assert rag_utils.files_changed_outside([]) == []
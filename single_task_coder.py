@@ -22,6 +22,7 @@ from src.utilities.util_functions import create_frontend_feedback_story, join_pa
 from src.utilities.script_execution_utils import run_script_in_env, format_log_message
 from src.tools.rag.rag_utils import update_descriptions
 from src.tools.rag.index_file_descriptions import prompt_index_project_files
+from src.utilities.workspace_watcher import start_workspace_watcher
 from src.linters.static_analisys import python_static_analysis
 
 
@@ -90,6 +91,7 @@ if __name__ == "__main__":
     if not work_dir:
         raise Exception("WORK_DIR variable is not provided. Please add WORK_DIR to .env file")
     set_up_dot_clean_coder_dir(work_dir)
+    start_workspace_watcher(work_dir)
     prompt_index_project_files()
     task = user_input("Provide task to be executed. ")
     run_clean_coder_pipeline(task, work_dir)
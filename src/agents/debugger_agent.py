@@ -3,6 +3,7 @@ from src.tools.tools_coder_pipeline import (
     ask_human_tool,
     prepare_list_dir_tool,
     prepare_see_file_tool,
+    prepare_see_file_outline_tool,
     prepare_create_file_tool,
     prepare_replace_code_tool,
     prepare_insert_code_tool,
@@ -22,10 +23,13 @@ from src.utilities.util_functions import (
     convert_images,
     list_directory_tree,
     exchange_file_contents,
+    read_file_snapshots,
     TOOL_NOT_EXECUTED_WORD,
 )
 from src.utilities.script_execution_utils import logs_from_running_script, run_script_in_env, format_log_message
 from src.utilities.llms import init_llms_medium_intelligence
+from src.utilities.prompt_caching import prompt_cache_stats, show_prompt_cache_stats
+from src.utilities.context_compaction import compact_coding_agent_context, CODING_AGENT_CONTEXT_TOKENS
 from src.utilities.langgraph_common_functions import (
     call_model,
     call_tool,
@@ -91,7 +95,7 @@ class Debugger:
 
     # node functions
     def call_model_debugger(self, state: dict) -> dict:
-        state = call_model(state, self.llms)
+        state = call_model(state, self.llms, tools=self.tools)
         state = call_tool(state, self.tools)
         ai_messages = [msg for msg in state["messages"] if msg.type == "ai"]
         last_ai_message = ai_messages[-1]
@@ -125,18 +129,19 @@ class Debugger:
                     self.stdout, self.stderr = run_script_in_env(self.work_dir, execute_file_name, silent_setup=True)
                     script_execution_message = format_log_message(self.stdout, self.stderr)
                     print(script_execution_message)
-                    state["messages"].append(HumanMessage(content=script_execution_message))
+                    state["messages"].append(HumanMessage(content=script_execution_message, contains_logs=True))
                 if self.playwright_code:
                     state = self.frontend_screenshots(state)
 
         state = exchange_file_contents(state, self.files, self.work_dir)
+        state["messages"] = compact_coding_agent_context(state["messages"], CODING_AGENT_CONTEXT_TOKENS)
         return state
 
 
     def check_log(self, state: dict) -> dict:
         """Add server logs."""
         logs = check_application_logs()
-        log_message = HumanMessage(content="Logs:\n" + logs)
+        log_message = HumanMessage(content="Logs:\n" + logs, contains_logs=True)
         state["messages"].append(log_message)
         
         return state
@@ -197,7 +202,11 @@ class Debugger:
                 self.system_message,
                 HumanMessage(content=f"Task: {task}\n\n######\n\nPlan which developer implemented already:\n\n{plan}"),
                 HumanMessage(content=list_directory_tree(self.work_dir)),
-                HumanMessage(content=f"File contents: {file_contents}", contains_file_contents=True),
+                HumanMessage(
+                    content=f"File contents: {file_contents}",
+                    contains_file_contents=True,
+                    file_snapshots=read_file_snapshots(self.files, self.work_dir),
+                ),
                 HumanMessage(content=f"Human feedback: {self.human_feedback}"),
             ]
         }
@@ -209,6 +218,8 @@ class Debugger:
             screenshot_msg = execute_screenshot_codes(self.playwright_code)
             inputs["messages"].append(screenshot_msg)
         self.debugger.invoke(inputs, {"recursion_limit": 150})
+        if show_prompt_cache_stats:
+            print_formatted(prompt_cache_stats.summary(), color="dark_grey")
 
         return self.files
 
@@ -216,9 +227,19 @@ class Debugger:
 def prepare_tools(work_dir):
     list_dir = prepare_list_dir_tool(work_dir)
     see_file = prepare_see_file_tool(work_dir)
+    see_file_outline = prepare_see_file_outline_tool(work_dir)
     replace_code = prepare_replace_code_tool(work_dir)
     insert_code = prepare_insert_code_tool(work_dir)
     create_file = prepare_create_file_tool(work_dir)
-    tools = [list_dir, see_file, replace_code, insert_code, create_file, ask_human_tool, final_response_debugger]
+    tools = [
+        list_dir,
+        see_file,
+        see_file_outline,
+        replace_code,
+        insert_code,
+        create_file,
+        ask_human_tool,
+        final_response_debugger,
+    ]
 
     return tools
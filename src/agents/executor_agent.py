@@ -11,8 +11,17 @@ from langgraph.graph import StateGraph, END
 from dotenv import load_dotenv, find_dotenv
 from langchain.tools import tool
 from src.utilities.llms import init_llms_medium_intelligence
+from src.utilities.prompt_caching import prompt_cache_stats, show_prompt_cache_stats
+from src.utilities.context_compaction import compact_coding_agent_context, CODING_AGENT_CONTEXT_TOKENS
 from src.utilities.print_formatters import print_formatted
-from src.utilities.util_functions import check_file_contents, exchange_file_contents, bad_tool_call_looped, load_prompt, TOOL_NOT_EXECUTED_WORD
+from src.utilities.util_functions import (
+    check_file_contents,
+    exchange_file_contents,
+    read_file_snapshots,
+    bad_tool_call_looped,
+    load_prompt,
+    TOOL_NOT_EXECUTED_WORD,
+)
 from src.utilities.langgraph_common_functions import (
     call_model,
     call_tool,
@@ -67,7 +76,7 @@ class Executor:
         depending on last message from LLM. After it exchanges contents of files in agent's context to provide it with
         updated version after inserting changes into file.
         """
-        state = call_model(state, self.llms)
+        state = call_model(state, self.llms, tools=self.tools)
         state = call_tool(state, self.tools)
 
         # auxiliary actions depending on tools called
@@ -96,6 +105,7 @@ class Executor:
                         break
 
         state = exchange_file_contents(state, self.files, self.work_dir)
+        state["messages"] = compact_coding_agent_context(state["messages"], CODING_AGENT_CONTEXT_TOKENS)
 
         return state
 
@@ -125,10 +135,16 @@ class Executor:
             "messages": [
                 self.system_message,
                 HumanMessage(content=f"Task: {task}\n\n######\n\nPlan:\n\n{plan}"),
-                HumanMessage(content=f"File contents: {file_contents}", contains_file_contents=True),
+                HumanMessage(
+                    content=f"File contents: {file_contents}",
+                    contains_file_contents=True,
+                    file_snapshots=read_file_snapshots(self.files, self.work_dir),
+                ),
             ]
         }
         self.executor.invoke(inputs, {"recursion_limit": 150})
+        if show_prompt_cache_stats:
+            print_formatted(prompt_cache_stats.summary(), color="dark_grey")
 
         return self.files
 
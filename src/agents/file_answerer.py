@@ -5,6 +5,7 @@ from dotenv import load_dotenv, find_dotenv
 from langchain.tools import tool
 from src.tools.tools_coder_pipeline import (
     prepare_see_file_tool,
+    prepare_see_file_outline_tool,
     prepare_list_dir_tool,
     retrieve_files_by_semantic_query,
 )
@@ -53,8 +54,9 @@ def after_agent_condition(state):
 class ResearchFileAnswerer:
     def __init__(self, work_dir):
         see_file = prepare_see_file_tool(work_dir)
+        see_file_outline = prepare_see_file_outline_tool(work_dir)
         list_dir = prepare_list_dir_tool(work_dir)
-        self.tools = [see_file, list_dir, final_response_file_answerer]
+        self.tools = [see_file, see_file_outline, list_dir, final_response_file_answerer]
         if vdb_available():
             self.tools.append(retrieve_files_by_semantic_query)
         self.llms = init_llms_mini(self.tools, "File Answerer", temp=0.2)
@@ -77,7 +79,7 @@ class ResearchFileAnswerer:
         return call_tool(state, self.tools)
 
     def call_model_researcher(self, state):
-        state = call_model(state, self.llms, printing=False)
+        state = call_model(state, self.llms, printing=False, tools=self.tools)
         last_message = state["messages"][-1]
         if len(last_message.tool_calls) > 1:
             # Filter out the tool call with "final_response_researcher"
@@ -13,19 +13,17 @@ from src.utilities.util_functions import (
 from src.utilities.langgraph_common_functions import after_ask_human_condition
 from src.utilities.user_input import user_input
 from src.utilities.graphics import LoadingAnimation
-from src.utilities.llms import init_llms_high_intelligence, init_llms_mini, init_llms_medium_intelligence
+from src.utilities.llms import init_llms_high_intelligence, init_llms_mini, init_llms_medium_intelligence, init_llm_with_fallbacks
+from src.utilities.lazy_loading import LazyObject
 from src.utilities.util_functions import load_prompt
 import os
 
 
 load_dotenv(find_dotenv())
 
-llms_planners = init_llms_high_intelligence(run_name="Planner")
-llm_strong = llms_planners[0].with_fallbacks(llms_planners[1:])
-llms_middle_strength = init_llms_medium_intelligence(run_name="Plan finalizer")
-llm_middle_strength = llms_middle_strength[0].with_fallbacks(llms_middle_strength[1:])
-llms_controller = init_llms_mini(run_name="Plan Files Controller")
-llm_controller = llms_controller[0].with_fallbacks(llms_controller[1:])
+llm_strong = LazyObject(lambda: init_llm_with_fallbacks(init_llms_high_intelligence, run_name="Planner"))
+llm_middle_strength = LazyObject(lambda: init_llm_with_fallbacks(init_llms_medium_intelligence, run_name="Plan finalizer"))
+llm_controller = LazyObject(lambda: init_llm_with_fallbacks(init_llms_mini, run_name="Plan Files Controller"))
 
 
 class AgentState(TypedDict):
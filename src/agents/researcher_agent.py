@@ -7,6 +7,7 @@ from dotenv import load_dotenv, find_dotenv
 from langchain_core.tools import tool
 from src.tools.tools_coder_pipeline import (
     prepare_see_file_tool,
+    prepare_see_file_outline_tool,
     prepare_list_dir_tool,
     retrieve_files_by_semantic_query,
 )
@@ -65,8 +66,9 @@ class Researcher:
         self.task_id = task_id
         self.silent = silent
         see_file = prepare_see_file_tool(work_dir)
+        see_file_outline = prepare_see_file_outline_tool(work_dir)
         list_dir = prepare_list_dir_tool(work_dir)
-        self.tools = [see_file, list_dir, final_response_researcher]
+        self.tools = [see_file, see_file_outline, list_dir, final_response_researcher]
         if vdb_available():
             self.tools.append(retrieve_files_by_semantic_query)
         self.llms = init_llms_medium_intelligence(self.tools, "Researcher")
@@ -92,7 +94,7 @@ class Researcher:
 
     # node functions
     def call_model_researcher(self, state):
-        state = call_model(state, self.llms, printing=not self.silent)
+        state = call_model(state, self.llms, printing=not self.silent, tools=self.tools)
         last_message = state["messages"][-1]
         if len(last_message.tool_calls) == 0:
             state["messages"].append(HumanMessage(content=no_tools_msg))
@@ -1,9 +1,6 @@
 import ast
-import yaml
-import sass
-from lxml import etree
 import re
-import esprima
+# parsers of other languages are imported on first check of their files, as they take long to import
 
 
 def check_syntax(file_content, filename):
@@ -39,6 +36,8 @@ def parse_python(code):
 
 
 def parse_html(html_content):
+    from lxml import etree
+
     parser = etree.HTMLParser(recover=True)  # Enable recovery mode
     try:
         etree.fromstring(html_content, parser)
@@ -108,38 +107,36 @@ def check_template_tag_balance(code, open_tag, close_tag):
         return f"Invalid syntax, mismatch of {open_tag} and {close_tag}"
 
 
-def bracket_balance(code, beginnig_bracket="{", end_bracket="}"):
-    """Check whether the specified opening and closing brackets are balanced in the code string."""
-    opened_brackets_count = 0
-
-    for char in code:
-        if char == beginnig_bracket:
-            opened_brackets_count += 1
-        elif char == end_bracket:
-            opened_brackets_count -= 1
-            if opened_brackets_count < 0:
-                return f"Invalid syntax, mismatch of {beginnig_bracket} and {end_bracket}"
-
-    if opened_brackets_count == 0:
-        return "Valid syntax"
-    else:
-        return f"Invalid syntax, mismatch of {beginnig_bracket} and {end_bracket}"
+BRACKET_PAIRS = (("(", ")"), ("[", "]"), ("{", "}"))
+OPENING_BRACKETS = {closing: opening for opening, closing in BRACKET_PAIRS}
+not_brackets_pattern = re.compile(r"[^()\[\]{}]+")
 
 
 def check_bracket_balance(code):
-    bracket_response = bracket_balance(code, beginnig_bracket="(", end_bracket=")")
-    if bracket_response != "Valid syntax":
-        return bracket_response
-    bracket_response = bracket_balance(code, beginnig_bracket="[", end_bracket="]")
-    if bracket_response != "Valid syntax":
-        return bracket_response
-    bracket_response = bracket_balance(code, beginnig_bracket="{", end_bracket="}")
-    if bracket_response != "Valid syntax":
-        return bracket_response
+    """
+    Check whether (), [] and {} are balanced in the code string, in a single pass over its brackets only.
+    The first unbalanced pair, in order of BRACKET_PAIRS, is reported.
+    """
+    depths = {opening: 0 for opening, _ in BRACKET_PAIRS}
+    # pairs which closing bracket appeared without opening one
+    unbalanced = set()
+    for bracket in not_brackets_pattern.sub("", code):
+        opening = OPENING_BRACKETS.get(bracket)
+        if opening is None:
+            depths[bracket] += 1
+        else:
+            depths[opening] -= 1
+            if depths[opening] < 0:
+                unbalanced.add(opening)
+    for opening, closing in BRACKET_PAIRS:
+        if opening in unbalanced or depths[opening] != 0:
+            return f"Invalid syntax, mismatch of {opening} and {closing}"
     return "Valid syntax"
 
 
 def parse_scss(scss_code):
+    import sass
+
     # removing import statements as they cousing error, because function has no access to filesystem
     scss_code = re.sub(r'@import\s+[\'"].*?[\'"];', "", scss_code)
     try:
@@ -178,6 +175,8 @@ def parse_vue_basic(content):
 
 
 def parse_javascript(js_content):
+    import esprima
+
     try:
         esprima.parseModule(js_content)
         return "Valid syntax"
@@ -223,6 +222,8 @@ def parse_tsx(tsx_code):
 
 
 def parse_yaml(yaml_string):
+    import yaml
+
     try:
         yaml.safe_load(yaml_string)
         return "Valid syntax"
@@ -0,0 +1,168 @@
+"""
+Syntax validation of edited files, incremental where language allows it.
+
+Result of the last check of every file is cached together with line numbers top-level blocks (Python statements,
+JS module items) of its last valid version start at. When file changes, only the blocks enclosing changed lines are
+parsed, as unchanged blocks around them are known to be valid. If changed blocks do not parse on their own (e.g.
+edit moved block boundaries), whole file is checked, so errors are always reported as by full check. Files of other
+languages, including SCSS where validity of a block depends on variables and mixins of the rest of the file, are
+checked as a whole, once per file version.
+"""
+
+import ast
+import bisect
+import threading
+from collections import OrderedDict
+from src.linters.syntax_checker_functions import check_syntax
+
+# number of files which last check is remembered
+VALIDATION_CACHE_SIZE = 64
+VALID_SYNTAX = "Valid syntax"
+
+
+def block_starts(spans):
+    """0-based indexes of lines top-level blocks start at, from 1-based (start line, end line) of statements."""
+    starts = [0]
+    previous_end = 0
+    for start, end in spans:
+        # statements sharing line with the previous one belong to its block
+        if start > previous_end and start - 1 > starts[-1]:
+            starts.append(start - 1)
+        previous_end = max(previous_end, end)
+    return starts
+
+
+def python_block_starts(code):
+    """Block starts of Python code, or None if code is not valid."""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+    return block_starts(
+        (min([node.lineno] + [decorator.lineno for decorator in getattr(node, "decorator_list", [])]), node.end_lineno)
+        for node in tree.body
+    )
+
+
+def javascript_block_starts(code):
+    """Block starts of JS module, or None if code is not valid."""
+    import esprima
+
+    try:
+        program = esprima.parseModule(code, {"loc": True})
+    except esprima.Error:
+        return None
+    return block_starts((node.loc.start.line, node.loc.end.line) for node in program.body)
+
+
+def ends_statement(lines):
+    """
+    True if the last non-empty line ends with ';' or '}'. Otherwise JS automatic semicolon insertion could join it
+    with the following block, so blocks valid on their own do not have to be valid together.
+    """
+    for line in reversed(lines):
+        if line.strip():
+            return line.rstrip().endswith((";", "}"))
+    return True
+
+
+class BlockLanguage:
+    def __init__(self, parse_block_starts, needs_statement_ends=False):
+        self.parse_block_starts = parse_block_starts
+        self.needs_statement_ends = needs_statement_ends
+
+
+BLOCK_LANGUAGES = {
+    "py": BlockLanguage(python_block_starts),
+    "js": BlockLanguage(javascript_block_starts, needs_statement_ends=True),
+}
+
+
+class CheckedVersion:
+    def __init__(self, code, result, valid_lines=None, valid_block_starts=None):
+        self.code = code
+        self.result = result
+        # lines and block starts of the last valid version, kept also after invalid one got checked
+        self.valid_lines = valid_lines
+        self.valid_block_starts = valid_block_starts
+
+
+class SyntaxValidator:
+    def __init__(self, cache_size=VALIDATION_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+        self.checked = OrderedDict()
+
+    def validate(self, code, filename):
+        """Returns "Valid syntax" or description of the syntax error, as check_syntax does."""
+        with self.lock:
+            previous = self.checked.get(filename)
+        if previous and previous.code == code:
+            return previous.result
+        language = BLOCK_LANGUAGES.get(filename.rsplit(".", 1)[-1] if "." in filename else "")
+        if language is None:
+            checked = CheckedVersion(code, check_syntax(code, filename))
+        else:
+            checked = self.validate_blocks(code, filename, language, previous)
+        with self.lock:
+            self.checked[filename] = checked
+            self.checked.move_to_end(filename)
+            while len(self.checked) > self.cache_size:
+                self.checked.popitem(last=False)
+        return checked.result
+
+    def validate_blocks(self, code, filename, language, previous):
+        lines = code.splitlines(keepends=True)
+        starts = None
+        if previous and previous.valid_lines is not None:
+            starts = self.changed_block_starts(lines, previous, language)
+        if starts is None:
+            starts = language.parse_block_starts(code)
+        if starts is None:
+            valid_lines = previous.valid_lines if previous else None
+            valid_block_starts = previous.valid_block_starts if previous else None
+            return CheckedVersion(code, check_syntax(code, filename), valid_lines, valid_block_starts)
+        return CheckedVersion(code, VALID_SYNTAX, lines, starts)
+
+    @staticmethod
+    def changed_block_starts(lines, previous, language):
+        """
+        Parses blocks of the last valid version enclosing lines changed since it. Returns block starts of lines
+        if changed blocks are valid on their own, None if whole file has to be checked.
+        """
+        old_lines = previous.valid_lines
+        old_starts = previous.valid_block_starts
+        common_length = min(len(old_lines), len(lines))
+        prefix = 0
+        while prefix < common_length and old_lines[prefix] == lines[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < common_length - prefix and old_lines[-1 - suffix] == lines[-1 - suffix]:
+            suffix += 1
+
+        first_block = bisect.bisect_right(old_starts, prefix) - 1
+        region_start = old_starts[first_block]
+        next_block = bisect.bisect_left(old_starts, len(old_lines) - suffix)
+        region_end = old_starts[next_block] if next_block < len(old_starts) else len(old_lines)
+        shift = len(lines) - len(old_lines)
+        region = lines[region_start : region_end + shift]
+        if language.needs_statement_ends and not (ends_statement(lines[:region_start]) and ends_statement(region)):
+            return None
+        region_starts = language.parse_block_starts("".join(region))
+        if region_starts is None:
+            return None
+        starts = (
+            set(old_starts[:first_block])
+            | {region_start + start for start in region_starts}
+            | {start + shift for start in old_starts[next_block:]}
+        )
+        # blocks emptied at the end of file
+        return sorted(start for start in starts if start == 0 or start < len(lines))
+
+
+syntax_validator = SyntaxValidator()
+
+
+def validate_syntax(code, filename):
+    """Checks syntax of new version of file, parsing only blocks changed since its last valid version if possible."""
+    return syntax_validator.validate(code, filename)
@@ -1,3 +1,5 @@
+import ast
+import re
 from langchain_text_splitters import (
     Language,
     RecursiveCharacterTextSplitter,
@@ -45,21 +47,217 @@ extension_to_language = {
     "sh": "powershell",
     "dockerfile": "proto",
 }
+brace_languages = {"js", "jsx", "ts", "tsx", "mjs", "cjs"}
 
+# budget of a single chunk; small neighbouring functions are merged up to it
+MAX_CHUNK_TOKENS = 500
+# chunk size of languages split by characters, as before splitting on definitions
+FALLBACK_CHUNK_CHARACTERS = 1000
 
-def split_code(code: str, extension: str, chunk_size: int = 1000):
-    """Splits code for smaller elements as functions. That allows to describe functions for semantic retrieval tool."""
+
+class CodeChunk:
+    def __init__(self, text, start_line, end_line):
+        self.text = text
+        # 1-based, inclusive line range of the chunk in its file
+        self.start_line = start_line
+        self.end_line = end_line
+
+    def __str__(self):
+        return self.text
+
+
+def split_code(code: str, extension: str, max_tokens: int = MAX_CHUNK_TOKENS) -> [CodeChunk]:
+    """
+    Splits code for smaller elements as functions. That allows to describe functions for semantic retrieval tool.
+    Python, JS/TS and Vue files are split on top-level definitions (and on their members, if a definition exceeds
+    max_tokens), merging small neighbours; other languages fall back to splitting by FALLBACK_CHUNK_CHARACTERS
+    characters.
+    """
     language = extension_to_language.get(extension)
     if not language:
         return []
+    boundaries = None
+    if extension == "py":
+        boundaries = python_boundaries(code)
+    elif extension in brace_languages:
+        boundaries = brace_boundaries(code.splitlines())
+    elif extension == "vue":
+        boundaries = vue_boundaries(code.splitlines())
+    if boundaries is None:
+        return split_by_characters(code, language, chunk_size=FALLBACK_CHUNK_CHARACTERS)
+
+    lines = code.splitlines()
+    # offsets[n] is length of first n lines joined, plus one, for estimating chunk sizes without joining lines
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line) + 1)
+    ranges = split_range(offsets, boundaries, 1, len(lines), max_tokens, depth=0)
+    chunks = [CodeChunk("\n".join(lines[start - 1 : end]), start, end) for start, end in ranges]
+    return [chunk for chunk in chunks if chunk.text.strip()]
+
+
+def python_boundaries(code: str):
+    """
+    Returns dict of line numbers after which code may be split, with nesting depth of the statement ending there.
+    None if code is not valid Python.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+    boundaries = {}
+
+    def visit(body, depth):
+        for node in body:
+            boundaries[node.end_lineno] = min(depth, boundaries.get(node.end_lineno, depth))
+            if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                visit(node.body, depth + 1)
+
+    visit(tree.body, 0)
+    return boundaries
+
+
+def brace_boundaries(lines: [str], depth_offset: int = 0, line_offset: int = 0) -> dict:
+    """
+    Tokenizes JS/TS code, skipping strings, template literals and comments, and returns dict of line numbers
+    ending a statement or a block, with bracket depth at the end of the line.
+    """
+    boundaries = {}
+    depth = 0
+    # stack of open template literals, storing bracket depth of their ${} expression
+    templates = []
+    in_block_comment = False
+    for nr, line in enumerate(lines, start=1):
+        last_significant = ""
+        i = 0
+        while i < len(line):
+            char = line[i]
+            if in_block_comment:
+                if line.startswith("*/", i):
+                    in_block_comment = False
+                    i += 1
+            elif templates and templates[-1] is None:
+                # inside template literal text
+                if char == "\\":
+                    i += 1
+                elif char == "`":
+                    templates.pop()
+                    last_significant = char
+                elif line.startswith("${", i):
+                    templates[-1] = depth
+                    depth += 1
+                    i += 1
+            elif line.startswith("//", i):
+                break
+            elif line.startswith("/*", i):
+                in_block_comment = True
+                i += 1
+            elif char in "\"'":
+                end = i + 1
+                while end < len(line) and line[end] != char:
+                    end += 2 if line[end] == "\\" else 1
+                i = end
+                last_significant = char
+            elif char == "`":
+                templates.append(None)
+            elif char in "{([":
+                depth += 1
+                last_significant = char
+            elif char in "})]":
+                depth = max(depth - 1, 0)
+                if char == "}" and templates and templates[-1] == depth:
+                    # end of ${} expression, back to template literal text
+                    templates[-1] = None
+                last_significant = char
+            elif not char.isspace():
+                last_significant = char
+            i += 1
+        if in_block_comment or templates:
+            continue
+        if last_significant in ("", "}", ";", ")", "]"):
+            boundaries[nr + line_offset] = depth + depth_offset
+    return boundaries
+
+
+def vue_boundaries(lines: [str]) -> dict:
+    """Splits Vue single file components on their sections, and the script section also on its statements."""
+    boundaries = {}
+    script_start = None
+    for nr, line in enumerate(lines, start=1):
+        stripped = line.strip()
+        if re.match(r"<script\b", stripped) and script_start is None:
+            script_start = nr
+        elif stripped.startswith("</script>") and script_start is not None:
+            boundaries.update(brace_boundaries(lines[script_start : nr - 1], depth_offset=1, line_offset=script_start))
+            script_start = None
+        if re.match(r"</(template|script|style)>\s*$", stripped) and not line.startswith((" ", "\t")):
+            boundaries[nr] = 0
+    return boundaries
+
+
+def split_range(offsets, boundaries, start, end, max_tokens, depth):
+    """
+    Splits lines start..end on boundaries of given depth, greedily merging neighbours up to max_tokens.
+    Parts above max_tokens are split further on deeper boundaries, or by lines if there are none.
+    """
+    cut_lines = [line for line in range(start, end) if boundaries.get(line, depth + 1) <= depth]
+    units = []
+    unit_start = start
+    for line in cut_lines + [end]:
+        units.append((unit_start, line))
+        unit_start = line + 1
+
+    ranges = []
+    for unit_start, unit_end in units:
+        if range_tokens(offsets, unit_start, unit_end) <= max_tokens:
+            parts = [(unit_start, unit_end)]
+        elif any(unit_start <= line < unit_end for line, line_depth in boundaries.items() if line_depth > depth):
+            parts = split_range(offsets, boundaries, unit_start, unit_end, max_tokens, depth + 1)
+        else:
+            parts = split_by_lines(offsets, unit_start, unit_end, max_tokens)
+        for part in parts:
+            if ranges and range_tokens(offsets, ranges[-1][0], part[1]) <= max_tokens:
+                ranges[-1] = (ranges[-1][0], part[1])
+            else:
+                ranges.append(part)
+    return ranges
+
+
+def split_by_lines(offsets, start, end, max_tokens):
+    ranges = []
+    part_start = start
+    for line in range(start, end + 1):
+        if line > part_start and range_tokens(offsets, part_start, line) > max_tokens:
+            ranges.append((part_start, line - 1))
+            part_start = line
+    ranges.append((part_start, end))
+    return ranges
+
+
+def range_tokens(offsets, start, end):
+    """Same estimation as estimate_tokens() of lines start..end joined."""
+    return (offsets[end] - offsets[start - 1] - 1) // 4 + 1
+
+
+def split_by_characters(code: str, language: str, chunk_size: int) -> [CodeChunk]:
     splitter = RecursiveCharacterTextSplitter.from_language(
         language=Language(language), chunk_size=chunk_size, chunk_overlap=0
     )
-    return splitter.split_text(code)
+    chunks = []
+    position = 0
+    for text in splitter.split_text(code):
+        start = code.find(text, position)
+        if start == -1:
+            start = position
+        position = start + len(text)
+        start_line = code.count("\n", 0, start) + 1
+        chunks.append(CodeChunk(text, start_line, start_line + text.count("\n")))
+    return chunks
 
 
 if __name__ == "__main__":
     splitted = split_code(code, "py")
     for doc in splitted:
-        print(doc)
+        print(f"lines {doc.start_line}-{doc.end_line}:")
+        print(doc.text)
         print("###")
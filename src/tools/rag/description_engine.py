@@ -0,0 +1,165 @@
+"""
+Asyncio engine describing files and file chunks for the RAG index.
+
+All description requests (whole files and chunks) go through one shared work queue, so a single large file
+never blocks the whole indexing. Number of requests in flight is bounded and every LLM provider has its own
+request and token per minute limit. Requests rejected with rate limit errors are retried with exponential
+backoff before falling back to the next provider.
+"""
+
+import os
+import re
+import time
+import random
+import asyncio
+from collections import deque
+from langchain_core.output_parsers import StrOutputParser
+from src.utilities.print_formatters import print_formatted
+
+
+DEFAULT_MAX_IN_FLIGHT = 32
+MAX_RATE_LIMIT_RETRIES = 5
+MAX_BACKOFF_SECONDS = 60
+# HTTP 429 mentioned as status of response, e.g. "Error code: 429" or "status_code=429"
+status_429_pattern = re.compile(r"\b(?:status|error)[ _]?(?:code)?\W{0,3}429\b")
+
+
+def _int_env(name, default=None):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count estimation, good enough for staying under token per minute limits."""
+    return len(text) // 4 + 1
+
+
+def is_rate_limit_error(e: Exception) -> bool:
+    """Check if exception means provider rejected request because of rate limit (HTTP 429)."""
+    if getattr(e, "status_code", None) == 429:
+        return True
+    error_text = f"{type(e).__name__} {e}".lower()
+    return "ratelimit" in error_text or "rate limit" in error_text or bool(status_429_pattern.search(error_text))
+
+
+class RateLimiter:
+    """
+    Sliding one-minute window limiter of requests and tokens for a single provider.
+    None limit means no limit.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window = deque()  # (timestamp, tokens) of requests sent in the last minute
+        self.lock = asyncio.Lock()
+
+    def _purge(self, now):
+        while self.window and now - self.window[0][0] >= 60:
+            self.window.popleft()
+
+    def _has_capacity(self, tokens):
+        if self.requests_per_minute and len(self.window) >= self.requests_per_minute:
+            return False
+        # always let a request through when window is empty, even if it alone exceeds the token budget
+        if self.tokens_per_minute and self.window:
+            return sum(used for _, used in self.window) + tokens <= self.tokens_per_minute
+        return True
+
+    async def acquire(self, tokens=0):
+        """Wait until request of provided size fits into the limits and register it."""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self._purge(now)
+                if self._has_capacity(tokens):
+                    self.window.append((now, tokens))
+                    return
+                await asyncio.sleep(60 - (now - self.window[0][0]))
+
+
+class DescriptionJob:
+    """Single description request: describe a whole file or one chunk of it."""
+
+    def __init__(self, kind, filename, inputs, chunk_nr=None):
+        # kind is "file" or "chunk"
+        self.kind = kind
+        self.filename = filename
+        self.inputs = inputs
+        self.chunk_nr = chunk_nr
+        self.tokens = estimate_tokens("".join(str(value) for value in inputs.values()))
+
+
+class DescriptionEngine:
+    """
+    Describes provided jobs concurrently.
+
+    llms: list of LLMs in order of preference; every one is treated as separate provider.
+    prompts: dict mapping job kind to prompt template for it.
+    Limits are configured with INDEXING_MAX_IN_FLIGHT, INDEXING_REQUESTS_PER_MINUTE and
+    INDEXING_TOKENS_PER_MINUTE env variables (both per minute limits are applied to every provider separately).
+    """
+
+    def __init__(self, llms, prompts):
+        self.chains = {kind: [prompt | llm | StrOutputParser() for llm in llms] for kind, prompt in prompts.items()}
+        self.provider_names = [getattr(llm, "bound", llm).__class__.__name__ for llm in llms]
+        self.max_in_flight = _int_env("INDEXING_MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT)
+        self.requests_per_minute = _int_env("INDEXING_REQUESTS_PER_MINUTE")
+        self.tokens_per_minute = _int_env("INDEXING_TOKENS_PER_MINUTE")
+        self.limiters = None
+
+    def run(self, jobs, on_done):
+        """
+        Describes all jobs, calling on_done(job, description) as soon as each job is finished.
+        Returns list of jobs which could not be described by any provider.
+        """
+        if not jobs:
+            return []
+        return asyncio.run(self._run(jobs, on_done))
+
+    async def _run(self, jobs, on_done):
+        # limiters are created inside event loop, as their locks belong to it
+        self.limiters = [RateLimiter(self.requests_per_minute, self.tokens_per_minute) for _ in self.provider_names]
+        queue = asyncio.Queue()
+        for job in jobs:
+            queue.put_nowait(job)
+        failed_jobs = []
+        workers = [
+            asyncio.create_task(self._worker(queue, on_done, failed_jobs))
+            for _ in range(min(self.max_in_flight, len(jobs)))
+        ]
+        await queue.join()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if failed_jobs:
+            print_formatted(f"Could not describe {len(failed_jobs)} files/chunks.", color="yellow")
+        return failed_jobs
+
+    async def _worker(self, queue, on_done, failed_jobs):
+        while True:
+            job = await queue.get()
+            try:
+                description = await self._describe(job)
+                on_done(job, description)
+            except Exception as e:
+                print_formatted(f"\nFailed to describe {job.filename}: {e}", color="yellow")
+                failed_jobs.append(job)
+            finally:
+                queue.task_done()
+
+    async def _describe(self, job):
+        """Describe job with first provider able to answer, retrying rate limited requests with backoff."""
+        last_exception = None
+        for chain, limiter in zip(self.chains[job.kind], self.limiters):
+            for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+                await limiter.acquire(job.tokens)
+                try:
+                    return await chain.ainvoke(job.inputs)
+                except Exception as e:
+                    last_exception = e
+                    if not is_rate_limit_error(e) or attempt == MAX_RATE_LIMIT_RETRIES:
+                        break
+                    backoff = min(MAX_BACKOFF_SECONDS, 2**attempt) + random.uniform(0, 1)
+                    await asyncio.sleep(backoff)
+        raise last_exception
@@ -1,19 +1,22 @@
 import os
 from pathlib import Path
 from langchain.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
 from dotenv import load_dotenv, find_dotenv
-import chromadb
 import sys
 import questionary
+import time
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
 from src.utilities.util_functions import join_paths, read_coderrules
-from src.utilities.start_work_functions import file_folder_ignored
+from src.utilities.start_work_functions import walk_not_ignored
 from src.utilities.llms import init_llms_mini
 from src.tools.rag.code_splitter import split_code
+from src.tools.rag.index_manifest import IndexManifest, content_hash
+from src.tools.rag.description_engine import DescriptionEngine, DescriptionJob
 from src.utilities.print_formatters import print_formatted
-from src.tools.rag.retrieval import vdb_available
+from src.tools.rag.retrieval import vdb_available, get_collection
+from src.tools.rag.retrieval_cache import get_retrieval_cache
+from src.tools.rag.lexical_index import get_lexical_index
 from src.utilities.manager_utils import QUESTIONARY_STYLE
 from src.utilities.objects import CodeFile
 from tqdm import tqdm
@@ -34,6 +37,11 @@ bar_format = (
     f"{{bar}}| {MAGENTA}{{n_fmt}}/{{total_fmt}} files "
     f"{GOLDEN}[{{elapsed}}<{{remaining}}, {{rate_fmt}}{{postfix}}]{RESET}"
 )
+chunks_bar_format = bar_format.replace(" files ", " chunks ")
+
+# number of completely described files uploaded to vector storage at once
+UPLOAD_BATCH_SIZE = 20
+CHECKPOINT_INTERVAL_SECONDS = 5
 
 
 # embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
@@ -88,152 +96,341 @@ def collect_files_to_describe(work_dir):
     under the work_dir according to is_code_file criteria and .coderignore patterns.
     """
     allowed_files = []
-    for root, _, files in os.walk(work_dir):
+    for root, _, files in walk_not_ignored(work_dir):
         for file in files:
             file_path = Path(root) / file
             if not is_code_file(file_path):
                 continue
-            relative_path_str = file_path.relative_to(work_dir).as_posix()
-            if file_folder_ignored(relative_path_str):
-                continue
-            allowed_files.append(CodeFile(filename=relative_path_str))
+            allowed_files.append(CodeFile(filename=file_path.relative_to(work_dir).as_posix()))
     return allowed_files
 
 
-def write_file_descriptions(files: [CodeFile]):
-    """Writes descriptions of whole files in codebase. Gets list of files to describe and describes files in batches."""
-    coderrules = read_coderrules()
-
+def load_describe_prompt(prompt_name):
     grandparent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
-    with open(f"{grandparent_dir}/prompts/describe_files.prompt", "r") as f:
-        files_describe_template = f.read()
-    prompt = ChatPromptTemplate.from_template(files_describe_template)
-
-    llms = init_llms_mini(tools=[], run_name="File Describer")
-    llm = llms[0].with_fallbacks(llms[1:])
-    chain = prompt | llm | StrOutputParser()
-
-    description_folder = join_paths(work_dir, ".clean_coder/files_and_folders_descriptions")
-    Path(description_folder).mkdir(parents=True, exist_ok=True)
-    batch_size = 8
-    pbar = tqdm(total=len(files), desc="[1/2]Describing files", bar_format=bar_format)
-
-    for i in range(0, len(files), batch_size):
-        files_iteration = files[i: i + batch_size]
-        # write descriptions
-        descriptions = chain.batch(
-            [{"coderrules": coderrules, "code": get_content(file)} for file in files_iteration]
-        )
-
-        # save descriptions as files
-        for file, description in zip(files_iteration, descriptions):
-            file_name = file.filename.replace("/", "=")
-            output_path = join_paths(description_folder, f"{file_name}.txt")
+    with open(f"{grandparent_dir}/prompts/{prompt_name}.prompt", "r") as f:
+        return ChatPromptTemplate.from_template(f.read())
 
-            with open(output_path, "w", encoding="utf-8") as out_file:
-                out_file.write(description)
-
-        # Update by actual number of files processed in this batch
-        pbar.update(len(files_iteration))
-
-    pbar.close()
 
+def write_descriptions(files: [CodeFile], manifest: IndexManifest):
+    """
+    Writes descriptions of whole files and of their chunks and uploads them to vector storage. Files are divided
+    into chunks and each chunk is described separately. Chunks with unchanged content (according to the manifest)
+    reuse their previous descriptions. All description requests are processed concurrently by DescriptionEngine.
 
-def write_file_chunks_descriptions(files: [CodeFile]):
-    """Writes descriptions of file chunks in codebase. Gets list of whole files to describe, divides files
-    into chunks and describes each chunk separately."""
+    Every written description is checkpointed in the manifest and every completely described file is uploaded
+    to vector storage in small batches, so interrupted indexing resumes where it stopped.
+    """
     coderrules = read_coderrules()
-
-    grandparent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
-    with open(f"{grandparent_dir}/prompts/describe_file_chunks.prompt", "r") as f:
-        chunks_describe_template = f.read()
-
-    prompt = ChatPromptTemplate.from_template(chunks_describe_template)
-    llms = init_llms_mini(tools=[], run_name="File Describer")
-    llm = llms[0]
-    chain = prompt | llm | StrOutputParser()
-
     description_folder = join_paths(work_dir, ".clean_coder/files_and_folders_descriptions")
     Path(description_folder).mkdir(parents=True, exist_ok=True)
 
-    # iterate chunks inside the file
-    for file in tqdm(files, desc="[2/2]Describing file chunks", bar_format=bar_format):
+    jobs = []
+    file_hashes = {}
+    chunk_hashes_per_file = {}
+    # line ranges of files and their chunks, stored with descriptions in vector storage
+    line_ranges = {}
+    jobs_left = {}
+    for file in files:
         file_content = get_content(file)
+        file_hash = content_hash(file_content)
         # get file extenstion
         extension = Path(file.filename).suffix.lstrip(".")
         file_chunks = split_code(file_content, extension)
         # do not describe chunk of 1-chunk files
-        if len(file_chunks) <= 1:
-            continue
-        descriptions = chain.batch(
-            [{"coderrules": coderrules, "file_code": file_content, "chunk_code": chunk} for chunk in file_chunks]
-        )
+        chunk_hashes = [content_hash(chunk.text) for chunk in file_chunks] if len(file_chunks) > 1 else []
+        file_hashes[file.filename] = file_hash
+        chunk_hashes_per_file[file.filename] = chunk_hashes
+        line_ranges[description_id(file.filename)] = (1, max(len(file_content.splitlines()), 1))
+        if chunk_hashes:
+            for nr, chunk in enumerate(file_chunks):
+                line_ranges[description_id(file.filename, nr)] = (chunk.start_line, chunk.end_line)
+
+        file_jobs = []
+        checkpoint = manifest.start_file(file.filename, file_hash)
+        if not (checkpoint["described"] and os.path.exists(description_path(file.filename))):
+            file_jobs.append(DescriptionJob("file", file.filename, {"coderrules": coderrules, "code": file_content}))
+
+        # descriptions of chunks which did not change since last indexing or been written before interruption
+        old_descriptions = {}
+        for nr, old_hash in manifest.described_chunks(file.filename).items():
+            old_path = description_path(file.filename, chunk_nr=nr)
+            if old_hash in chunk_hashes and os.path.exists(old_path):
+                with open(old_path, "r", encoding="utf-8") as old_file:
+                    old_descriptions[old_hash] = old_file.read()
+
+        for nr, chunk_hash in enumerate(chunk_hashes):
+            if chunk_hash in old_descriptions:
+                write_description(file.filename, old_descriptions[chunk_hash], chunk_nr=nr)
+                manifest.checkpoint_description(file.filename, chunk_nr=nr, chunk_hash=chunk_hash)
+                continue
+            inputs = {"coderrules": coderrules, "file_code": file_content, "chunk_code": file_chunks[nr].text}
+            file_jobs.append(DescriptionJob("chunk", file.filename, inputs, chunk_nr=nr))
+        jobs_left[file.filename] = len(file_jobs)
+        jobs += file_jobs
+
+    files_done_to_upload = []
+
+    def upload_files_done():
+        upload_described_files(files_done_to_upload, file_hashes, chunk_hashes_per_file, line_ranges, manifest)
+        files_done_to_upload.clear()
+        manifest.save()
+
+    def file_done(filename):
+        files_done_to_upload.append(filename)
+        if len(files_done_to_upload) >= UPLOAD_BATCH_SIZE:
+            upload_files_done()
+
+    last_checkpoint_time = time.monotonic()
+
+    def on_description_done(job, description):
+        nonlocal last_checkpoint_time
+        write_description(job.filename, description, chunk_nr=job.chunk_nr)
+        chunk_hash = chunk_hashes_per_file[job.filename][job.chunk_nr] if job.kind == "chunk" else None
+        manifest.checkpoint_description(job.filename, chunk_nr=job.chunk_nr, chunk_hash=chunk_hash)
+        (files_pbar if job.kind == "file" else chunks_pbar).update(1)
+        jobs_left[job.filename] -= 1
+        if jobs_left[job.filename] == 0:
+            file_done(job.filename)
+        elif time.monotonic() - last_checkpoint_time > CHECKPOINT_INTERVAL_SECONDS:
+            manifest.save()
+            last_checkpoint_time = time.monotonic()
+
+    files_count = sum(1 for job in jobs if job.kind == "file")
+    files_pbar = tqdm(total=files_count, desc="[1/2]Describing files", bar_format=bar_format, position=0)
+    chunks_pbar = tqdm(
+        total=len(jobs) - files_count, desc="[2/2]Describing file chunks", bar_format=chunks_bar_format, position=1
+    )
+    try:
+        # files described completely before interruption
+        for filename, left in jobs_left.items():
+            if left == 0:
+                file_done(filename)
+        llms = init_llms_mini(tools=[], run_name="File Describer")
+        prompts = {
+            "file": load_describe_prompt("describe_files"),
+            "chunk": load_describe_prompt("describe_file_chunks"),
+        }
+        DescriptionEngine(llms, prompts).run(jobs, on_description_done)
+    finally:
+        files_pbar.close()
+        chunks_pbar.close()
+        # save progress also when indexing been interrupted
+        upload_files_done()
+
+
+def upload_described_files(filenames, file_hashes, chunk_hashes_per_file, line_ranges, manifest: IndexManifest):
+    """
+    Uploads descriptions of completely described files to vector storage, removes descriptions of their stale
+    chunks and marks files as indexed in the manifest.
+    """
+    if not filenames:
+        return
+    stale_ids = []
+    for filename in filenames:
+        stale_ids += remove_stale_chunk_descriptions(filename, len(chunk_hashes_per_file[filename]), manifest)
+    upsert_file_list([CodeFile(filename) for filename in filenames], line_ranges=line_ranges)
+    if stale_ids:
+        delete_descriptions(stale_ids)
+    for filename in filenames:
+        manifest.update(filename, file_hashes[filename], chunk_hashes_per_file[filename])
 
-        for nr, description in enumerate(descriptions):
-            file_name = f"{file.filename.replace('/', '=')}_chunk{nr}"
-            output_path = join_paths(description_folder, f"{file_name}.txt")
 
-            with open(output_path, "w", encoding="utf-8") as out_file:
-                out_file.write(description)
+def write_description(filename, description, chunk_nr=None):
+    with open(description_path(filename, chunk_nr=chunk_nr), "w", encoding="utf-8") as out_file:
+        out_file.write(description)
 
 
-def upload_descriptions_to_vdb():
-    """Uploads descriptions, created by write_file_chunks_descriptions, into vector database."""
-    print_formatted("Uploading file descriptions to vector storage...", color="magenta")
-    chroma_client = chromadb.PersistentClient(path=join_paths(work_dir, ".clean_coder/chroma_base"))
-    collection_name = f"clean_coder_{Path(work_dir).name}_file_descriptions"
+def description_path(filename, chunk_nr=None):
+    """Path of the description file of a whole file or of its chunk."""
+    description_folder = join_paths(work_dir, ".clean_coder/files_and_folders_descriptions")
+    file_name = filename.replace("/", "=")
+    if chunk_nr is not None:
+        file_name = f"{file_name}_chunk{chunk_nr}"
+    return join_paths(description_folder, f"{file_name}.txt")
 
-    collection = chroma_client.get_or_create_collection(
-        name=collection_name,
-        # embedding_function=embedding_function
-    )
 
-    # read files and upload to base
-    description_folder = join_paths(work_dir, ".clean_coder/files_and_folders_descriptions")
+def get_vdb_collection():
+    return get_collection(create=True)
 
-    docs = []
-    ids = []
 
-    for root, _, files in os.walk(description_folder):
-        for file in files:
-            file_path = Path(root) / file
-            with open(file_path, "r", encoding="utf-8") as file:
-                content = file.read()
-            docs.append(content)
-            ids.append(file_path.name.replace("=", "/").removesuffix(".txt"))
-            # upsert to vector storage by batches of 100
-            if len(docs) >= 100:
-                collection.upsert(documents=docs, ids=ids)
-                # Clear the batch lists
-                docs = []
-                ids = []
-    # upsert remaining docs
-    collection.upsert(documents=docs, ids=ids)
-
-
-def upsert_file_list(file_list):
-    chroma_client = chromadb.PersistentClient(path=join_paths(work_dir, ".clean_coder/chroma_base"))
-    collection_name = f"clean_coder_{Path(work_dir).name}_file_descriptions"
-    collection = chroma_client.get_or_create_collection(
-        name=collection_name,
-        # embedding_function=embedding_function
-    )
+def upsert_descriptions(docs, ids, metadatas=None):
+    """Upserts descriptions to vector storage, invalidating cached retrieval results for them."""
+    get_vdb_collection().upsert(documents=docs, ids=ids, metadatas=metadatas)
+    get_retrieval_cache().invalidate(ids)
+
+
+def delete_descriptions(ids):
+    """Deletes descriptions from vector storage, invalidating cached retrieval results for them."""
+    if not ids:
+        return
+    get_vdb_collection().delete(ids=ids)
+    get_retrieval_cache().invalidate(ids)
+
+
+def find_chunk_descriptions(filename):
+    """Returns dict of chunk numbers and paths of chunk descriptions of the file existing in descriptions folder."""
+    pattern = glob.escape(description_path(filename).removesuffix(".txt")) + "_chunk*.txt"
+    chunk_descriptions = {}
+    for path in glob.glob(pattern):
+        chunk_nr = path.removesuffix(".txt").rsplit("_chunk", 1)[1]
+        if chunk_nr.isdigit():
+            chunk_descriptions[int(chunk_nr)] = path
+    return chunk_descriptions
+
 
-    descriptions_folder = join_paths(work_dir, ".clean_coder/files_and_folders_descriptions")
+def description_id(filename, chunk_nr=None):
+    """Id of description of a whole file or of its chunk in vector storage."""
+    return filename if chunk_nr is None else f"{filename}_chunk{chunk_nr}"
 
+
+def upsert_file_list(file_list, line_ranges=None):
+    """
+    Upserts descriptions of provided files and of their chunks. line_ranges dict of description ids and
+    (start_line, end_line) tuples, if provided, is stored as metadata of the descriptions.
+    """
+    line_ranges = line_ranges or {}
     docs = []
     ids = []
-    # open every file starting with descriptions_folder/file and add content to list
+    metadatas = []
+    # open description of every file and of its chunks and add content to list
     for file in file_list:
-        pattern = os.path.join(descriptions_folder, f"{file.filename.replace('/', '=').removesuffix('.txt')}*")
-        for file_path in glob.glob(pattern):
+        paths = {None: description_path(file.filename)} | find_chunk_descriptions(file.filename)
+        for chunk_nr, file_path in paths.items():
+            if not os.path.exists(file_path):
+                continue
             with open(file_path, "r", encoding="utf-8") as file_content:
                 content = file_content.read()
-            file_path = Path(file_path)
+            doc_id = description_id(file.filename, chunk_nr)
             docs.append(content)
-            ids.append(file_path.name.replace("=", "/").removesuffix(".txt"))
-    collection.upsert(documents=docs, ids=ids)
-    print_formatted("Re-indexing of modified files completed.", color="green")
+            ids.append(doc_id)
+            metadata = {"filename": file.filename}
+            if doc_id in line_ranges:
+                metadata["start_line"], metadata["end_line"] = line_ranges[doc_id]
+            metadatas.append(metadata)
+    if docs:
+        upsert_descriptions(docs, ids, metadatas)
+
+
+def remove_file_descriptions(filenames, manifest: IndexManifest):
+    """Removes descriptions of deleted files from descriptions folder and vector storage."""
+    if not filenames:
+        return
+    ids = []
+    for filename in filenames:
+        ids.append(description_id(filename))
+        if os.path.exists(description_path(filename)):
+            os.remove(description_path(filename))
+        ids += remove_stale_chunk_descriptions(filename, chunks_count=0, manifest=manifest)
+        manifest.remove(filename)
+    delete_descriptions(ids)
+
+
+def remove_stale_chunk_descriptions(filename, chunks_count, manifest: IndexManifest):
+    """
+    Removes description files of chunks numbered chunks_count and above, left after an earlier, longer version
+    of the file. Returns ids of removed chunks, including ones recorded in manifest, but missing on disk.
+    """
+    stale_chunk_nrs = {nr for nr in range(chunks_count, len(manifest.chunk_hashes(filename)))}
+    for chunk_nr, path in find_chunk_descriptions(filename).items():
+        if chunk_nr >= chunks_count:
+            os.remove(path)
+            stale_chunk_nrs.add(chunk_nr)
+    return [description_id(filename, chunk_nr) for chunk_nr in sorted(stale_chunk_nrs)]
+
+
+def reconcile_index(manifest: IndexManifest):
+    """
+    Reconciliation pass. Removes descriptions which do not belong to any file or chunk recorded in the manifest
+    (left by removed, renamed or shrunk files) from descriptions folder and from vector storage.
+    Call it only when the manifest covers all indexed files.
+    """
+    expected_ids = set()
+    for filename in manifest.files:
+        expected_ids.add(description_id(filename))
+        expected_ids.update(description_id(filename, nr) for nr in range(len(manifest.chunk_hashes(filename))))
+    # descriptions written by interrupted indexing are kept to resume from them
+    for filename in manifest.pending:
+        expected_ids.add(description_id(filename))
+        expected_ids.update(description_id(filename, nr) for nr in manifest.described_chunks(filename))
+
+    description_folder = join_paths(work_dir, ".clean_coder/files_and_folders_descriptions")
+    removed_files = 0
+    if os.path.exists(description_folder):
+        for file in os.listdir(description_folder):
+            if file.replace("=", "/").removesuffix(".txt") not in expected_ids:
+                os.remove(join_paths(description_folder, file))
+                removed_files += 1
+
+    stored_ids = get_vdb_collection().get(include=[])["ids"]
+    orphaned_ids = [stored_id for stored_id in stored_ids if stored_id not in expected_ids]
+    # delete by batches to not exceed vector storage limits
+    for i in range(0, len(orphaned_ids), 100):
+        delete_descriptions(orphaned_ids[i : i + 100])
+    if removed_files or orphaned_ids:
+        print_formatted(
+            f"Removed {removed_files} orphaned description files and {len(orphaned_ids)} vector storage entries.",
+            color="magenta",
+        )
+
+
+def adopt_existing_index(manifest: IndexManifest, all_files: [CodeFile]):
+    """
+    Fills manifest of project indexed before manifest was introduced from ids of descriptions in vector storage,
+    instead of treating all files as new. Files which description and descriptions of all their current chunks are
+    stored are recorded in their current version; others count as new. Stored files not existing anymore are
+    recorded too, so they count as deleted.
+    """
+    stored_ids = set(get_vdb_collection().get(include=[])["ids"])
+    filenames = set()
+    for file in all_files:
+        filenames.add(file.filename)
+        if description_id(file.filename) not in stored_ids:
+            continue
+        try:
+            file_content = get_content(file)
+        except (OSError, UnicodeDecodeError):
+            continue
+        file_chunks = split_code(file_content, Path(file.filename).suffix.lstrip("."))
+        chunk_hashes = [content_hash(chunk.text) for chunk in file_chunks] if len(file_chunks) > 1 else []
+        if all(description_id(file.filename, nr) in stored_ids for nr in range(len(chunk_hashes))):
+            manifest.update(file.filename, content_hash(file_content), chunk_hashes)
+    stored_files = set()
+    stored_chunks_count = {}
+    for stored_id in stored_ids:
+        filename, _, chunk_nr = stored_id.rpartition("_chunk")
+        if filename and chunk_nr.isdigit():
+            stored_chunks_count[filename] = max(stored_chunks_count.get(filename, 0), int(chunk_nr) + 1)
+        else:
+            stored_files.add(stored_id)
+    for filename in stored_files - filenames:
+        # hashes are unknown; number of chunks lets removal find their descriptions
+        manifest.update(filename, None, [None] * stored_chunks_count.get(filename, 0))
+
+
+def sync_lexical_index(manifest: IndexManifest):
+    """
+    Brings lexical index in line with files indexed in vector storage: indexes files which changed since they were
+    indexed lexically and removes ones no longer in the manifest. Unchanged files are not read.
+    """
+    lexical_index = get_lexical_index()
+    changed = False
+    for filename in lexical_index.filenames():
+        if filename not in manifest.files:
+            lexical_index.remove(filename)
+            changed = True
+    for filename in manifest.files:
+        if lexical_index.file_hash(filename) == manifest.file_hash(filename):
+            continue
+        try:
+            content = get_content(CodeFile(filename))
+        except (OSError, UnicodeDecodeError):
+            continue
+        lexical_index.index_file(filename, content, manifest.file_hash(filename))
+        changed = True
+    if changed:
+        lexical_index.save()
+        # new lexical hits could change retrieval results
+        get_retrieval_cache().invalidate([])
 
 
 def prompt_index_project_files():
@@ -241,8 +438,39 @@ def prompt_index_project_files():
     Checks if the vector database (VDB) is available.
     If not, prompts the user via questionary to index project files for better search.
     Then asks if yous sure he want to do indexing. Then triggers write_and_index_descriptions().
+    If VDB is available or previous indexing was interrupted, checks which files changed since last indexing
+    and offers to (re-)index only them.
     """
-    if vdb_available():
+    manifest = IndexManifest(work_dir)
+    if vdb_available() or manifest.pending:
+        all_files: [CodeFile] = collect_files_to_describe(work_dir)
+        if not os.path.exists(manifest.path):
+            # project indexed before manifest was introduced
+            adopt_existing_index(manifest, all_files)
+            manifest.save()
+        changed_files, deleted_files = manifest.find_changes(all_files, full_scan=True)
+        if not changed_files and not deleted_files:
+            # builds lexical index of projects indexed before it was introduced
+            sync_lexical_index(manifest)
+            return
+        if manifest.pending:
+            question = (
+                f"Previous indexing was interrupted. {len(changed_files)} files are left to describe "
+                f"and {len(deleted_files)} to remove. Do you want to resume it?"
+            )
+        else:
+            question = (
+                f"Found {len(changed_files)} new or modified and {len(deleted_files)} deleted files since last "
+                "indexing. Do you want to update the index?"
+            )
+        answer = questionary.select(
+            question,
+            choices=["Update", "Skip"],
+            style=QUESTIONARY_STYLE,
+            instruction="\nHint: Only changed files and chunks will be described again.",
+        ).ask()
+        if answer == "Update":
+            write_and_index_descriptions(all_files)
         return
     answer = questionary.select(
         "Do you want to index your project files for improving file search?",
@@ -263,14 +491,37 @@ def prompt_index_project_files():
 
 
 def write_and_index_descriptions(file_list: [CodeFile]):
-    # provide optionally which subfolders needs to be checked, if you don't want to describe all project folder
-    write_file_descriptions(file_list)
-    write_file_chunks_descriptions(file_list)
-    upload_descriptions_to_vdb()
+    """
+    Describes and indexes provided files. Provided list is treated as complete list of files to index: files
+    unchanged since last indexing are skipped and descriptions of files not present on the list are removed.
+    """
+    manifest = IndexManifest(work_dir)
+    changed_files, deleted_files = manifest.find_changes(file_list, full_scan=True)
+    index_changes(changed_files, deleted_files, manifest)
+    reconcile_index(manifest)
+
+
+def reindex_files(file_list: [CodeFile]):
+    """Re-describes and re-indexes provided files, if their content changed since last indexing."""
+    manifest = IndexManifest(work_dir)
+    changed_files, deleted_files = manifest.find_changes(file_list)
+    index_changes(changed_files, deleted_files, manifest)
+
+
+def index_changes(changed_files: [CodeFile], deleted_files: [str], manifest: IndexManifest):
+    """
+    Describes changed files and uploads their descriptions, removes deleted ones together with stale chunk
+    descriptions of files which got shorter and saves the manifest. Lexical index follows the manifest.
+    """
+    remove_file_descriptions(deleted_files, manifest)
+    if changed_files:
+        write_descriptions(changed_files, manifest)
+        print_formatted("Re-indexing of modified files completed.", color="green")
+    manifest.save()
+    sync_lexical_index(manifest)
 
 
 if __name__ == "__main__":
-    # upload_descriptions_to_vdb()
     upsert_file_list(
         [
             "src/agents/debugger_agent.py",
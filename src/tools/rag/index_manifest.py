@@ -0,0 +1,117 @@
+"""
+Manifest of indexed files. Keeps content hash of every described file and of each of its chunks,
+so re-indexing describes only new or changed files and chunks. Also works as a checkpoint of indexing in progress,
+so interrupted indexing resumes where it stopped.
+"""
+
+import os
+import json
+import hashlib
+from src.utilities.util_functions import join_paths
+
+
+def content_hash(content: str) -> str:
+    """Return stable hash of text content."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class IndexManifest:
+    """
+    Persistent record of what is already described and uploaded to the vector storage.
+    Stored in .clean_coder/index_manifest.json as {filename: {"hash": <file hash>, "chunks": [<chunk hashes>]}}.
+    Files being described, but not uploaded yet, are kept in "pending" section together with descriptions
+    already written for them.
+    """
+
+    def __init__(self, work_dir):
+        self.work_dir = work_dir
+        self.path = join_paths(work_dir, ".clean_coder", "index_manifest.json")
+        self.files = {}
+        self.pending = {}
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.files = manifest.get("files", {})
+        self.pending = manifest.get("pending", {})
+
+    def save(self):
+        """Write manifest atomically, so interrupted save never leaves corrupted file."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.files, "pending": self.pending}, f)
+        os.replace(tmp_path, self.path)
+
+    def file_hash(self, filename):
+        entry = self.files.get(filename)
+        return entry["hash"] if entry else None
+
+    def chunk_hashes(self, filename):
+        entry = self.files.get(filename)
+        return entry["chunks"] if entry else []
+
+    def update(self, filename, file_hash, chunk_hashes):
+        """Mark file as described and uploaded to vector storage."""
+        self.files[filename] = {"hash": file_hash, "chunks": chunk_hashes}
+        self.pending.pop(filename, None)
+
+    def remove(self, filename):
+        self.files.pop(filename, None)
+        self.pending.pop(filename, None)
+
+    def start_file(self, filename, file_hash):
+        """Begin or resume describing the file. Returns its checkpoint entry."""
+        entry = self.pending.setdefault(filename, {"hash": file_hash, "described": False, "chunks": {}})
+        if entry["hash"] != file_hash:
+            # file changed since interruption, so its whole-file description is outdated
+            entry["hash"] = file_hash
+            entry["described"] = False
+        return entry
+
+    def checkpoint_description(self, filename, chunk_nr=None, chunk_hash=None):
+        """Record that description of the whole file or of its chunk been written."""
+        entry = self.pending[filename]
+        if chunk_nr is None:
+            entry["described"] = True
+        else:
+            entry["chunks"][str(chunk_nr)] = chunk_hash
+
+    def described_chunks(self, filename):
+        """
+        Returns dict of chunk numbers and hashes of chunks which descriptions are in descriptions folder:
+        indexed ones, overwritten with ones written by interrupted indexing.
+        """
+        chunks = dict(enumerate(self.chunk_hashes(filename)))
+        pending_chunks = self.pending.get(filename, {}).get("chunks", {})
+        chunks.update({int(nr): chunk_hash for nr, chunk_hash in pending_chunks.items()})
+        return chunks
+
+    def find_changes(self, files, full_scan=False):
+        """
+        Compare provided files with manifest.
+        Returns (changed, deleted): list of new or modified CodeFile objects and list of indexed filenames
+        that do not exist on disk anymore. With full_scan, provided files are treated as the complete list of
+        files to index, so every indexed file not provided counts as deleted as well.
+        """
+        changed = []
+        deleted = []
+        for file in files:
+            try:
+                with open(join_paths(self.work_dir, file.filename), "r", encoding="utf-8") as f:
+                    current_hash = content_hash(f.read())
+            except FileNotFoundError:
+                if file.filename in self.files:
+                    deleted.append(file.filename)
+                continue
+            except UnicodeDecodeError:
+                continue
+            if self.file_hash(file.filename) != current_hash:
+                changed.append(file)
+        if full_scan:
+            provided = {file.filename for file in files}
+            deleted += [filename for filename in self.files if filename not in provided]
+        return changed, deleted
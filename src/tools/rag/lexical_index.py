@@ -0,0 +1,171 @@
+"""
+Local lexical index of project files, complementing semantic search over file descriptions.
+
+BM25 inverted index over file contents, their paths and identifiers, stored in .clean_coder/lexical_index.json.
+Full identifiers (like get_collection or RERANK_STRATEGY) are indexed next to their parts, and symbols defined
+in the file get additional weight, so exact symbol queries hit the defining file first.
+"""
+
+import os
+import re
+import json
+import math
+import threading
+from collections import Counter
+from src.utilities.util_functions import join_paths
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# additional term frequency of symbols defined in the file
+DEFINITION_WEIGHT = 3
+# reciprocal rank fusion constant, dampening impact of top positions
+RRF_K = 60
+
+definition_pattern = re.compile(
+    r"\b(?:def|class|function|const|let|var|interface|type|enum|struct|fn|func)\s+([A-Za-z_$][\w$]*)"
+)
+identifier_pattern = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def split_to_terms(text: str) -> list:
+    """Splits text to lowercase terms, dividing also camelCase and snake_case identifiers."""
+    words = re.findall(r"[A-Za-z0-9]+", text)
+    terms = []
+    for word in words:
+        terms += re.findall(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+", word)
+    return [term.lower() for term in terms if len(term) > 1]
+
+
+def extract_terms(text: str) -> list:
+    """Terms of text: parts of words and, for compound identifiers, also whole identifiers."""
+    terms = split_to_terms(text)
+    for identifier in identifier_pattern.findall(text):
+        if len(split_to_terms(identifier)) > 1:
+            terms.append(identifier.lower())
+    return terms
+
+
+def reciprocal_rank_fusion(rankings: list, k: int = RRF_K) -> list:
+    """Fuses lists of ids ordered by relevance into a single list, ordered by sum of 1 / (k + rank)."""
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda doc_id: scores[doc_id], reverse=True)
+
+
+class LexicalIndex:
+    """
+    BM25 index of files. Stores per file term frequencies together with content hash of indexed version,
+    posting lists are built in memory on load.
+    """
+
+    def __init__(self, work_dir):
+        self.path = join_paths(work_dir, ".clean_coder", "lexical_index.json")
+        self.lock = threading.Lock()
+        self.documents = {}
+        self.postings = {}
+        self.total_length = 0
+        self.loaded_mtime = None
+        self.load()
+
+    def load(self):
+        self.documents = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.documents = json.load(f)["documents"]
+                self.loaded_mtime = os.path.getmtime(self.path)
+            except (json.JSONDecodeError, OSError, KeyError):
+                # index is rebuilt on the next indexing
+                self.documents = {}
+        self.postings = {}
+        self.total_length = 0
+        for filename, document in self.documents.items():
+            self._add_postings(filename, document)
+
+    def reload_if_modified(self):
+        """Reloads index written by another process (or other instance) since it was loaded."""
+        with self.lock:
+            if os.path.exists(self.path) and os.path.getmtime(self.path) != self.loaded_mtime:
+                self.load()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"documents": self.documents}, f)
+        os.replace(tmp_path, self.path)
+        self.loaded_mtime = os.path.getmtime(self.path)
+
+    def file_hash(self, filename):
+        document = self.documents.get(filename)
+        return document["hash"] if document else None
+
+    def filenames(self):
+        return list(self.documents)
+
+    def index_file(self, filename, content, content_hash):
+        """Indexes (or re-indexes) file content under its path."""
+        with self.lock:
+            self._remove(filename)
+            terms = Counter(extract_terms(content) + extract_terms(filename))
+            for symbol in definition_pattern.findall(content):
+                for term in {symbol.lower(), *split_to_terms(symbol)}:
+                    terms[term] += DEFINITION_WEIGHT
+            document = {"hash": content_hash, "length": sum(terms.values()), "terms": dict(terms)}
+            self.documents[filename] = document
+            self._add_postings(filename, document)
+
+    def remove(self, filename):
+        with self.lock:
+            self._remove(filename)
+
+    def _add_postings(self, filename, document):
+        for term, frequency in document["terms"].items():
+            self.postings.setdefault(term, {})[filename] = frequency
+        self.total_length += document["length"]
+
+    def _remove(self, filename):
+        document = self.documents.pop(filename, None)
+        if document is None:
+            return
+        for term in document["terms"]:
+            posting = self.postings.get(term, {})
+            posting.pop(filename, None)
+            if not posting:
+                self.postings.pop(term, None)
+        self.total_length -= document["length"]
+
+    def search(self, query: str, n_results: int = 8) -> list:
+        """Returns up to n_results (filename, score) pairs, best matching first."""
+        with self.lock:
+            if not self.documents:
+                return []
+            documents_count = len(self.documents)
+            average_length = self.total_length / documents_count
+            scores = {}
+            for term in set(extract_terms(query)):
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (documents_count - len(posting) + 0.5) / (len(posting) + 0.5))
+                for filename, frequency in posting.items():
+                    length_norm = 1 - BM25_B + BM25_B * self.documents[filename]["length"] / average_length
+                    term_score = idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * length_norm)
+                    scores[filename] = scores.get(filename, 0.0) + term_score
+        ranking = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranking[:n_results]
+
+
+_lexical_index = None
+
+
+def get_lexical_index():
+    """Returns process-wide lexical index of current work directory, up to date with its file on disk."""
+    global _lexical_index
+    if _lexical_index is None:
+        _lexical_index = LexicalIndex(os.getenv("WORK_DIR"))
+    else:
+        _lexical_index.reload_if_modified()
+    return _lexical_index
@@ -1,24 +1,49 @@
-from src.tools.rag.index_file_descriptions import (
-    write_file_descriptions,
-    write_file_chunks_descriptions,
-    upsert_file_list,
-)
+from pathlib import Path
+from src.tools.rag.index_file_descriptions import reindex_files, is_code_file, collect_files_to_describe
+from src.tools.rag.index_manifest import IndexManifest
 from src.utilities.objects import CodeFile
 from src.utilities.print_formatters import print_formatted
+from src.utilities.workspace_watcher import get_workspace_watcher
+
+# workspace generation up to which changes reported by workspace watcher were re-indexed
+indexed_generation = 0
 
 
 def update_descriptions(file_list: [CodeFile]):
     """
     Updates descriptions of provided files and rewrites them in vector storage.
+    Only files and chunks which content changed since last indexing are described again. Descriptions of chunks
+    which do not exist anymore are removed. With workspace watcher running, code files changed outside of agents
+    since the last update (e.g. by developer) are updated as well.
     """
+    file_list = file_list + files_changed_outside(file_list)
     if not file_list:
         print_formatted("No modified files to update descriptions for.", color="magenta")
         return
-        
-    # TODO: remove old descriptions
+
     print_formatted("Updating descriptions...", color="magenta")
-    write_file_descriptions(file_list)
-    write_file_chunks_descriptions(file_list)
+    reindex_files(file_list)
+
 
-    # uploade file list descriptins to vdb
-    upsert_file_list(file_list)
+def files_changed_outside(file_list: [CodeFile]):
+    """
+    Code files reported by workspace watcher since the last update, not provided in file_list. If watcher does not
+    remember changes that old anymore, files changed or deleted since indexing are found by comparing work dir with
+    the index manifest, if project is indexed.
+    """
+    global indexed_generation
+    watcher = get_workspace_watcher()
+    if watcher is None:
+        return []
+    generation = watcher.generation
+    changed = watcher.changes_since(indexed_generation)
+    if changed is None:
+        manifest = IndexManifest(watcher.work_dir)
+        changed = []
+        if manifest.files:
+            all_files = collect_files_to_describe(watcher.work_dir)
+            changed_files, deleted = manifest.find_changes(all_files, full_scan=True)
+            changed = [file.filename for file in changed_files] + deleted
+    indexed_generation = generation
+    provided = {file.filename for file in file_list}
+    return [CodeFile(path, is_modified=True) for path in changed if path not in provided and is_code_file(Path(path))]
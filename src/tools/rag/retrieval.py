@@ -1,8 +1,11 @@
 import os
-import chromadb
+import threading
 from pathlib import Path
+from typing import List
 from dotenv import load_dotenv, find_dotenv
 from src.utilities.llms import init_llms_mini
+from src.tools.rag.retrieval_cache import get_retrieval_cache
+from src.tools.rag.lexical_index import get_lexical_index, reciprocal_rank_fusion, split_to_terms
 from langchain.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 
@@ -11,6 +14,8 @@ from pydantic import BaseModel, Field
 load_dotenv(find_dotenv())
 work_dir = os.getenv("WORK_DIR")
 collection_name = f"clean_coder_{Path(work_dir).name}_file_descriptions"
+# "binary" (LLM call per document), "listwise" (single LLM call for all documents) or "local" (no LLM calls)
+rerank_strategy = os.getenv("RERANK_STRATEGY", "binary")
 
 class BinaryRankingResult(BaseModel):
     """Structured output for binary document ranking. First analyze and provide reasoning, then make decision."""
@@ -22,6 +27,17 @@ class BinaryRankingResult(BaseModel):
     )
 
 
+class ListwiseRankingResult(BaseModel):
+    """Structured output for listwise document ranking. First analyze and provide reasoning, then make decision."""
+
+    reasoning: str = Field(
+        description="First, analyze documents and write 1-2 sentences per document explaining if it matches the query"
+    )
+    relevant_documents: List[str] = Field(
+        description="Filenames of relevant documents only, ordered from the most relevant one"
+    )
+
+
 class BinaryRankingResult(BaseModel):
     """Structured output for binary document ranking. First analyze and provide reasoning, then make decision."""
 
@@ -33,17 +49,62 @@ class BinaryRankingResult(BaseModel):
     )
 
 
-def get_collection():
-    chroma_client = chromadb.PersistentClient(path=os.getenv("WORK_DIR") + "/.clean_coder/chroma_base")
-    from chromadb.utils import embedding_functions
+class ChromaRegistry:
+    """
+    Process-wide registry of Chroma client and collection handles. Opening persistent storage is slow, so it is
+    done once, on first use. Thread-safe, as retrieval is used also by background researcher thread.
+    """
 
+    lock = threading.Lock()
+    clients = {}
+    collections = {}
+
+    @staticmethod
+    def get_client(path):
+        with ChromaRegistry.lock:
+            if path not in ChromaRegistry.clients:
+                import chromadb
+
+                ChromaRegistry.clients[path] = chromadb.PersistentClient(path=path)
+            return ChromaRegistry.clients[path]
+
+    @staticmethod
+    def get_collection(path, name, create=False):
+        """Returns collection handle, or None if collection does not exist and create is False."""
+        from chromadb.errors import NotFoundError
+
+        key = (path, name)
+        with ChromaRegistry.lock:
+            collection = ChromaRegistry.collections.get(key)
+        if collection is not None:
+            return collection
+        client = ChromaRegistry.get_client(path)
+        try:
+            if create:
+                collection = client.get_or_create_collection(name=name)  # , embedding_function=embedding_function)
+            else:
+                collection = client.get_collection(name=name)  # , embedding_function=embedding_function)
+        except (ValueError, NotFoundError):
+            return None
+        with ChromaRegistry.lock:
+            return ChromaRegistry.collections.setdefault(key, collection)
+
+    @staticmethod
+    def invalidate():
+        """Forget all handles, so next call reopens storage. Use after collection been removed or recreated."""
+        with ChromaRegistry.lock:
+            ChromaRegistry.collections.clear()
+            ChromaRegistry.clients.clear()
+
+
+def get_collection(create=False):
     # embedding_function = embedding_functions.OpenAIEmbeddingFunction(
     #     api_key=os.getenv("OPENAI_API_KEY"), model_name="text-embedding-3-small"
     # )
-    try:
-        return chroma_client.get_collection(name=collection_name)  # , embedding_function=embedding_function)
-    except ValueError:
-        return False
+    collection = ChromaRegistry.get_collection(
+        os.getenv("WORK_DIR") + "/.clean_coder/chroma_base", collection_name, create=create
+    )
+    return collection if collection is not None else False
 
 
 def vdb_available():
@@ -60,30 +121,74 @@ def retrieve(question: str) -> str:
     Returns:
     str: A formatted response with file descriptions of found files.
     """
+    # repeated queries are answered from cache until index changes
+    cache = get_retrieval_cache()
+    cached_response = cache.get_response(question, rerank_strategy)
+    if cached_response is not None:
+        return cached_response
+
     collection = get_collection()
-    retrieval = collection.query(query_texts=[question], n_results=8)
+    retrieval = collection.query(query_texts=[question], n_results=8, include=["documents", "metadatas"])
+    retrieval = fuse_with_lexical_results(question, retrieval, collection)
 
-    # Use BinaryRanker to filter relevant documents
-    binary_ranker = BinaryRanker()
-    ranking_results = binary_ranker.rank(question, retrieval)
+    # Use configured ranker to filter relevant documents
+    ranking_results = get_ranker().rank(question, retrieval)
 
     # Filter documents that are marked as relevant (True)
     response = ""
-    for filename, is_relevant in ranking_results:
+    for doc_id, is_relevant in ranking_results:
         if is_relevant:
             # Find the corresponding document in the retrieval results
-            idx = retrieval["ids"][0].index(filename)
+            idx = retrieval["ids"][0].index(doc_id)
             description = retrieval["documents"][0][idx]
-            response += f"{filename}:\n\n{description}\n\n###\n\n"
+            response += f"{describe_location(doc_id, retrieval['metadatas'][0][idx])}:\n\n{description}\n\n###\n\n"
 
     # If no relevant documents found, return a message
     if not response:
-        return "No relevant documents found for your query."
-
-    response += "\n\nRemember to see files before adding to final response!"
+        response = "No relevant documents found for your query."
+    else:
+        response += (
+            "\n\nRemember to see files before adding to final response! "
+            "Pass line ranges to see_file to see only relevant fragments."
+        )
+    cache.set_response(question, rerank_strategy, response)
     return response
 
 
+def fuse_with_lexical_results(question: str, retrieval: dict, collection, n_results: int = 8) -> dict:
+    """
+    Merges semantic search results with lexical index hits by reciprocal rank fusion, so files containing exact
+    identifiers from the question are ranked too. Returns top n_results in format of vector storage query results.
+    """
+    lexical_hits = [filename for filename, _ in get_lexical_index().search(question, n_results=n_results)]
+    if not lexical_hits:
+        return retrieval
+    documents = dict(zip(retrieval["ids"][0], retrieval["documents"][0]))
+    metadatas = dict(zip(retrieval["ids"][0], retrieval["metadatas"][0]))
+    missing_ids = [filename for filename in lexical_hits if filename not in documents]
+    if missing_ids:
+        found = collection.get(ids=missing_ids, include=["documents", "metadatas"])
+        documents.update(zip(found["ids"], found["documents"]))
+        metadatas.update(zip(found["ids"], found["metadatas"]))
+    # files not described yet have nothing to show to the ranker
+    fused_ids = [
+        doc_id for doc_id in reciprocal_rank_fusion([retrieval["ids"][0], lexical_hits]) if doc_id in documents
+    ][:n_results]
+    return {
+        "ids": [fused_ids],
+        "documents": [[documents[doc_id] for doc_id in fused_ids]],
+        "metadatas": [[metadatas[doc_id] for doc_id in fused_ids]],
+    }
+
+
+def describe_location(doc_id: str, metadata: dict) -> str:
+    """File path and lines range of a file or its chunk, if stored with its description."""
+    metadata = metadata or {}
+    if "start_line" not in metadata:
+        return doc_id
+    return f"{metadata['filename']} (lines {metadata['start_line']}-{metadata['end_line']})"
+
+
 # New class added for binary ranking with lazy loading.
 class BinaryRanker:
     """
@@ -141,28 +246,138 @@ class BinaryRanker:
         Returns:
         list: A list of tuples containing document IDs and their binary relevance scores ('0' or '1').
         """
-        # Ensure the chain is initialized (lazy loading)
-        self.initialize_chain()
-
         # Extract list of documents and their ids from the retrieval result.
         documents_list = retrieval["documents"][0]
         filenames_list = retrieval["ids"][0]
 
+        # Verdicts for documents not changed since they were ranked for the same query are cached.
+        cache = get_retrieval_cache()
+        cached_verdicts = {filename: cache.get_verdict(question, filename) for filename in filenames_list}
+
         # Build input for batch processing: list of dicts containing question, filename, and document.
         batch_inputs = []
         for idx, doc in enumerate(documents_list):
-            batch_inputs.append({"question": question, "filename": filenames_list[idx], "document": doc})
+            if cached_verdicts[filenames_list[idx]] is None:
+                batch_inputs.append({"question": question, "filename": filenames_list[idx], "document": doc})
 
         # Use the chain batch function to get structured outputs.
-        results = self.chain.batch(batch_inputs)
-
+        results = []
+        if batch_inputs:
+            # Ensure the chain is initialized (lazy loading)
+            self.initialize_chain()
+            results = self.chain.batch(batch_inputs)
+        new_verdicts = [(inputs["filename"], result.is_relevant) for inputs, result in zip(batch_inputs, results)]
+        if new_verdicts:
+            cache.set_verdicts(question, new_verdicts)
+        cached_verdicts.update(dict(new_verdicts))
 
         # Pair each document id with its binary ranking result.
-        ranking = []
-        for idx, result in enumerate(results):
-            ranking.append((filenames_list[idx], result.is_relevant))
+        return [(filename, cached_verdicts[filename]) for filename in filenames_list]
+
+
+class ListwiseRanker:
+    """
+    Ranks all retrieved documents with a single LLM call, instead of a call per document.
+    Returns relevant documents first, in order proposed by LLM.
+    """
+
+    def __init__(self):
+        self.chain = None
+
+    def initialize_chain(self):
+        if self.chain is None:
+            grandparent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+            with open(f"{grandparent_dir}/prompts/listwise_ranker.prompt", "r") as file_handle:
+                template_text = file_handle.read()
+            prompt = ChatPromptTemplate.from_template(template_text)
+            llms = init_llms_mini(tools=[], run_name="ListwiseRanker")
+            llm = llms[0].with_fallbacks(llms[1:])
+            self.chain = prompt | llm.with_structured_output(ListwiseRankingResult)
+
+    def rank(self, question: str, retrieval: dict) -> list:
+        self.initialize_chain()
+        documents_list = retrieval["documents"][0]
+        filenames_list = retrieval["ids"][0]
+        documents = "\n\n".join(
+            f"Filename: \"\"\"{filename}\"\"\"\nDocument: \"\"\"{doc}\"\"\""
+            for filename, doc in zip(filenames_list, documents_list)
+        )
+        result = self.chain.invoke({"question": question, "documents": documents})
+        relevant = [filename for filename in result.relevant_documents if filename in filenames_list]
+        not_relevant = [filename for filename in filenames_list if filename not in relevant]
+        return [(filename, True) for filename in relevant] + [(filename, False) for filename in not_relevant]
+
+
+class LocalRanker:
+    """
+    Ranks documents locally, without LLM calls. Uses cross-encoder model if sentence-transformers package is
+    installed, otherwise scores documents by share of query terms found in document and its filename.
+    Documents with score of at least RERANK_THRESHOLD are relevant.
+    """
 
-        return ranking
+    cross_encoder = None
+    default_cross_encoder_threshold = 0.0
+    default_lexical_threshold = 0.3
+
+    def __init__(self):
+        self.threshold = os.getenv("RERANK_THRESHOLD")
+
+    @classmethod
+    def load_cross_encoder(cls):
+        """Loads cross-encoder model once per process. Returns None if sentence-transformers is not installed."""
+        if cls.cross_encoder is None:
+            try:
+                from sentence_transformers import CrossEncoder
+            except ImportError:
+                cls.cross_encoder = False
+                return None
+            cls.cross_encoder = CrossEncoder(os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2"))
+        return cls.cross_encoder or None
+
+    def rank(self, question: str, retrieval: dict) -> list:
+        documents_list = retrieval["documents"][0]
+        filenames_list = retrieval["ids"][0]
+        cross_encoder = self.load_cross_encoder()
+        if cross_encoder:
+            pairs = [(question, f"{filename}\n{doc}") for filename, doc in zip(filenames_list, documents_list)]
+            scores = list(cross_encoder.predict(pairs))
+            default_threshold = self.default_cross_encoder_threshold
+        else:
+            scores = [
+                lexical_score(question, f"{filename} {doc}") for filename, doc in zip(filenames_list, documents_list)
+            ]
+            default_threshold = self.default_lexical_threshold
+        threshold = float(self.threshold) if self.threshold else default_threshold
+        ranking = sorted(zip(filenames_list, scores), key=lambda item: item[1], reverse=True)
+        return [(filename, score >= threshold) for filename, score in ranking]
+
+
+def lexical_score(question: str, document: str) -> float:
+    """Share of query terms present in the document."""
+    query_terms = set(split_to_terms(question))
+    if not query_terms:
+        return 0.0
+    document_terms = set(split_to_terms(document))
+    return len(query_terms & document_terms) / len(query_terms)
+
+
+# ranker of configured strategy, created on first retrieval; its chain or model is built once per process
+ranker = None
+ranker_lock = threading.Lock()
+
+
+def get_ranker():
+    """Returns ranker for configured RERANK_STRATEGY. Per document binary ranking is the fallback."""
+    global ranker
+    with ranker_lock:
+        if ranker is None:
+            if rerank_strategy == "listwise":
+                ranker = ListwiseRanker()
+            elif rerank_strategy == "local":
+                ranker = LocalRanker()
+            else:
+                ranker = BinaryRanker()
+        return ranker
 
 
 if __name__ == "__main__":
@@ -0,0 +1,152 @@
+"""
+Persistent cache of semantic retrieval results and of binary ranker verdicts.
+
+Entries are keyed by normalized query (and document id for verdicts) and tagged with index generation counter.
+Every upsert or removal of descriptions in vector storage increments the counter, which invalidates all cached
+retrieval results and verdicts of affected documents only.
+
+New entries are saved in batches and at exit, so retrieval does not rewrite the cache file on every query;
+invalidations are saved at once.
+"""
+
+import os
+import re
+import json
+import atexit
+import threading
+from collections import OrderedDict
+from src.utilities.util_functions import join_paths
+
+# new entries are written to disk after that many cache updates, or at exit
+SAVE_EVERY_UPDATES = 20
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase query, remove punctuation and redundant whitespace, so nearly identical queries match."""
+    query = re.sub(r"[^\w\s/.-]", " ", query.lower())
+    return " ".join(query.split()).strip(".")
+
+
+class RetrievalCache:
+    """
+    LRU cache stored in .clean_coder/retrieval_cache.json.
+    Sizes are limited with RETRIEVAL_CACHE_SIZE (retrieval results) and RETRIEVAL_CACHE_VERDICTS_SIZE env variables.
+    """
+
+    def __init__(self, work_dir):
+        self.path = join_paths(work_dir, ".clean_coder", "retrieval_cache.json")
+        self.max_results = int(os.getenv("RETRIEVAL_CACHE_SIZE", 300))
+        self.max_verdicts = int(os.getenv("RETRIEVAL_CACHE_VERDICTS_SIZE", 5000))
+        self.lock = threading.Lock()
+        self.generation = 0
+        # generations of invalidated documents having cached verdicts
+        self.doc_generations = {}
+        self.results = OrderedDict()
+        self.verdicts = OrderedDict()
+        self.unsaved_updates = 0
+        self.load()
+        atexit.register(self.flush)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            # broken cache is not worth failing for
+            return
+        self.generation = cache["generation"]
+        self.doc_generations = cache["doc_generations"]
+        self.results = OrderedDict(cache["results"])
+        self.verdicts = OrderedDict(cache["verdicts"])
+
+    def save(self):
+        # generations of documents without verdicts are not needed: their new verdicts get the current one
+        verdict_docs = {key.partition("\n")[2] for key in self.verdicts}
+        self.doc_generations = {
+            doc_id: generation for doc_id, generation in self.doc_generations.items() if doc_id in verdict_docs
+        }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "generation": self.generation,
+                    "doc_generations": self.doc_generations,
+                    "results": self.results,
+                    "verdicts": self.verdicts,
+                },
+                f,
+            )
+        os.replace(tmp_path, self.path)
+        self.unsaved_updates = 0
+
+    def updated(self):
+        self.unsaved_updates += 1
+        if self.unsaved_updates >= SAVE_EVERY_UPDATES:
+            self.save()
+
+    def flush(self):
+        """Saves entries added since the last save."""
+        with self.lock:
+            if self.unsaved_updates:
+                self.save()
+
+    def get_response(self, query, strategy):
+        with self.lock:
+            key = f"{strategy}\n{normalize_query(query)}"
+            entry = self.results.get(key)
+            if entry is None or entry["generation"] != self.generation:
+                return None
+            self.results.move_to_end(key)
+            return entry["response"]
+
+    def set_response(self, query, strategy, response):
+        with self.lock:
+            key = f"{strategy}\n{normalize_query(query)}"
+            self.results[key] = {"generation": self.generation, "response": response}
+            self.results.move_to_end(key)
+            while len(self.results) > self.max_results:
+                self.results.popitem(last=False)
+            self.updated()
+
+    def get_verdict(self, query, doc_id):
+        """Returns cached relevance of the document to the query, or None if not cached or outdated."""
+        with self.lock:
+            key = f"{normalize_query(query)}\n{doc_id}"
+            entry = self.verdicts.get(key)
+            if entry is None or entry["generation"] != self.doc_generations.get(doc_id, 0):
+                return None
+            self.verdicts.move_to_end(key)
+            return entry["is_relevant"]
+
+    def set_verdicts(self, query, verdicts):
+        """Caches list of (doc_id, is_relevant) verdicts for the query."""
+        with self.lock:
+            for doc_id, is_relevant in verdicts:
+                key = f"{normalize_query(query)}\n{doc_id}"
+                self.verdicts[key] = {"generation": self.doc_generations.get(doc_id, 0), "is_relevant": is_relevant}
+                self.verdicts.move_to_end(key)
+            while len(self.verdicts) > self.max_verdicts:
+                self.verdicts.popitem(last=False)
+            self.updated()
+
+    def invalidate(self, doc_ids):
+        """Call on every upsert or removal of documents in vector storage."""
+        with self.lock:
+            self.generation += 1
+            for doc_id in doc_ids:
+                self.doc_generations[doc_id] = self.generation
+            self.save()
+
+
+_retrieval_cache = None
+
+
+def get_retrieval_cache():
+    """Returns process-wide retrieval cache of current work directory."""
+    global _retrieval_cache
+    if _retrieval_cache is None:
+        _retrieval_cache = RetrievalCache(os.getenv("WORK_DIR"))
+    return _retrieval_cache
@@ -1,15 +1,20 @@
 from langchain_core.tools import tool
+from typing import Optional
 from typing_extensions import Annotated
 import os
 from dotenv import load_dotenv, find_dotenv
-from src.linters.syntax_checker_functions import check_syntax
 from src.utilities.start_work_functions import file_folder_ignored
-from src.utilities.util_functions import join_paths, WRONG_TOOL_CALL_WORD, TOOL_NOT_EXECUTED_WORD
+from src.utilities.util_functions import join_paths, TOOL_NOT_EXECUTED_WORD
 from src.utilities.user_input import user_input
+from src.utilities.file_view import formatted_lines, file_outline, symbol_range
+from src.utilities.directory_tree import get_tree_snapshot
+from src.utilities.edit_transaction import LineEdit, apply_line_edits
 from src.tools.rag.retrieval import retrieve
 
 
 load_dotenv(find_dotenv())
+# files longer than that are shown by see_file page by page
+SEE_FILE_PAGE_LINES = int(os.getenv("SEE_FILE_PAGE_LINES", 1000))
 
 syntax_error_insert_code = """
 Changes can cause next error: {error_response}. Probably you:
@@ -25,7 +30,14 @@ Think step by step which function/code block you want to change before proposing
 """
 
 
+def read_only(tool):
+    """Marks tool as not changing anything, so its calls can be executed concurrently with other read-only calls."""
+    tool.metadata = {**(tool.metadata or {}), "read_only": True}
+    return tool
+
+
 def prepare_list_dir_tool(work_dir):
+    @read_only
     @tool
     def list_dir(
         directory: Annotated[str, "Directory to list files in."],
@@ -46,26 +58,77 @@ def prepare_list_dir_tool(work_dir):
 
 
 def prepare_see_file_tool(work_dir):
+    @read_only
     @tool
-    def see_file(filename: Annotated[str, "Name and path of file to check."]):
+    def see_file(
+        filename: Annotated[str, "Name and path of file to check."],
+        start_line: Annotated[Optional[int], "First line to show. Skip to show file from beginning."] = None,
+        end_line: Annotated[Optional[int], "Last line to show (inclusive). Skip to show file till the end."] = None,
+        symbol: Annotated[
+            Optional[str], "Name of function or class to show instead of line range, as 'name' or 'Class.method'."
+        ] = None,
+    ):
         """
-        Check contents of code file.
+        Check contents of code file. Long files are shown by pages; pass start_line and end_line (or symbol)
+        to see only the fragment you need.
         """
         try:
             if file_folder_ignored(filename):
                 return f"You are not allowed to work with {filename}."
-            with open(join_paths(work_dir, filename), "r", encoding="utf-8") as file:
-                lines = file.readlines()
-            formatted_lines = [f"{i+1}|{line[:-1]}|{i+1}\n" for i, line in enumerate(lines)]
-            file_content = "".join(formatted_lines)
-            file_content = filename + ":\n\n" + file_content
-
+            path = join_paths(work_dir, filename)
+            lines = formatted_lines(path)
+            if symbol:
+                symbol_lines = symbol_range(path, symbol)
+                if symbol_lines is None:
+                    return f"Symbol {symbol} not found in {filename}. Use see_file_outline to list definitions."
+                start_line, end_line = symbol_lines
+            start_line = max(start_line or 1, 1)
+            if lines and start_line > len(lines):
+                return f"{filename} has only {len(lines)} lines."
+            if end_line is not None and end_line < start_line:
+                return f"end_line {end_line} is before start_line {start_line}."
+            paginated = end_line is None
+            if paginated:
+                end_line = start_line + SEE_FILE_PAGE_LINES - 1
+            end_line = min(end_line, len(lines))
+            if start_line == 1 and end_line == len(lines):
+                return filename + ":\n\n" + "".join(lines)
+            file_content = f"{filename} (lines {start_line}-{end_line} of {len(lines)}):\n\n"
+            file_content += "".join(lines[start_line - 1 : end_line])
+            if paginated and end_line < len(lines):
+                file_content += f"\n(To see more, call see_file with start_line={end_line + 1}.)"
             return file_content
         except Exception as e:
             return f"{type(e).__name__}: {e}"
 
     return see_file
 
+
+def prepare_see_file_outline_tool(work_dir):
+    @read_only
+    @tool
+    def see_file_outline(filename: Annotated[str, "Name and path of file to check."]):
+        """
+        Check outline of code file: classes and functions defined in it, with their line numbers.
+        Use it for long files to find fragment worth seeing with see_file.
+        """
+        try:
+            if file_folder_ignored(filename):
+                return f"You are not allowed to work with {filename}."
+            path = join_paths(work_dir, filename)
+            outline = file_outline(path)
+            lines_count = len(formatted_lines(path))
+            if not outline:
+                return f"No definitions found in {filename} ({lines_count} lines). Use see_file to check it."
+            entries = [f"{nr}|{'    ' * level}{signature}" for nr, level, _, signature in outline]
+            return f"Outline of {filename} ({lines_count} lines):\n\n" + "\n".join(entries)
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+
+    return see_file_outline
+
+
+@read_only
 @tool
 def see_image(filename: Annotated[str, "Name and path of image file to check."]):
     """
@@ -77,6 +140,7 @@ def see_image(filename: Annotated[str, "Name and path of image file to check."])
 
 
 
+@read_only
 @tool
 def retrieve_files_by_semantic_query(
     query: Annotated[
@@ -94,7 +158,31 @@ def retrieve_files_by_semantic_query(
     return retrieve(query)
 
 
+def line_edit(work_dir, to_edit):
+    """
+    Marks tool as editing lines of a file. Calls of such tools editing the same file in one model turn are applied
+    together as a single transaction; to_edit(**args) builds LineEdit from call arguments other than filename.
+    """
+
+    def mark(tool):
+        tool.metadata = {**(tool.metadata or {}), "line_edit": to_edit, "work_dir": work_dir}
+        return tool
+
+    return mark
+
+
+def code_insertion(start_line, code):
+    return LineEdit(start_line, code, done_message="Code inserted.", syntax_error_message=syntax_error_insert_code)
+
+
+def code_replacement(start_line, code, end_line):
+    return LineEdit(
+        start_line, code, end_line, done_message="Code modified.", syntax_error_message=syntax_error_modify_code
+    )
+
+
 def prepare_insert_code_tool(work_dir):
+    @line_edit(work_dir, code_insertion)
     @tool
     def insert_code(
         filename: Annotated[str, "Name and path of file to change."],
@@ -108,30 +196,13 @@ def prepare_insert_code_tool(work_dir):
         Insert new piece of code into provided file. Use when new code need to be added without replacing old one.
         Proper indentation is important.
         """
-        try:
-            with open(join_paths(work_dir, filename), "r+", encoding="utf-8") as file:
-                file_contents = file.readlines()
-                file_contents.insert(start_line, code + "\n")
-                file_contents = "".join(file_contents)
-                check_syntax_response = check_syntax(file_contents, filename)
-                if check_syntax_response != "Valid syntax":
-                    print("Wrong syntax provided, asking to correct.")
-                    return WRONG_TOOL_CALL_WORD + syntax_error_insert_code.format(error_response=check_syntax_response)
-                message = "Never accept changes you don't understand. Type (o)k if you accept or provide commentary. "
-                human_message = user_input(message)
-                if human_message not in ["o", "ok"]:
-                    return TOOL_NOT_EXECUTED_WORD + f"Human: '{human_message}'"
-                file.seek(0)
-                file.truncate()
-                file.write(file_contents)
-            return "Code inserted."
-        except Exception as e:
-            return f"{type(e).__name__}: {e}"
+        return apply_line_edits(work_dir, filename, [code_insertion(start_line, code)])[0]
 
     return insert_code
 
 
 def prepare_replace_code_tool(work_dir):
+    @line_edit(work_dir, code_replacement)
     @tool
     def replace_code(
         filename: Annotated[str, "Name and path of file to change."],
@@ -146,25 +217,7 @@ def prepare_replace_code_tool(work_dir):
         Replace old piece of code between start_line and end_line with new one. Proper indentation is important.
         Exchange entire functions or code blocks at once. Avoid changing functions partially.
         """
-        try:
-            with open(join_paths(work_dir, filename), "r+", encoding="utf-8") as file:
-                file_contents = file.readlines()
-                file_contents[start_line - 1 : end_line] = [code + "\n"]
-                file_contents = "".join(file_contents)
-                check_syntax_response = check_syntax(file_contents, filename)
-                if check_syntax_response != "Valid syntax":
-                    print(check_syntax_response)
-                    return WRONG_TOOL_CALL_WORD + syntax_error_modify_code.format(error_response=check_syntax_response)
-                message = "Never accept changes you don't understand. Type (o)k if you accept or provide commentary. "
-                human_message = user_input(message)
-                if human_message not in ["o", "ok"]:
-                    return TOOL_NOT_EXECUTED_WORD + f"Human: '{human_message}'"
-                file.seek(0)
-                file.truncate()
-                file.write(file_contents)
-            return "Code modified."
-        except Exception as e:
-            return f"{type(e).__name__}: {e}"
+        return apply_line_edits(work_dir, filename, [code_replacement(start_line, code, end_line)])[0]
 
     return replace_code
 
@@ -196,6 +249,7 @@ def prepare_create_file_tool(work_dir):
 
             with open(full_path, "w", encoding="utf-8") as file:
                 file.write(code)
+            get_tree_snapshot(work_dir).mark_changed(filename)
             return "File been created successfully."
         except Exception as e:
             return f"{type(e).__name__}: {e}"
@@ -0,0 +1,233 @@
+"""
+Token-budget-aware compaction of agent conversations.
+
+When conversation exceeds its token ceiling, the oldest turns are evicted and summarized by mini LLM into a rolling
+digest, kept right after the system message. Turns start with an AI message and contain tool results and other
+messages following it, so tool calls are never separated from their results.
+
+Coding agents (Executor and Debugger) work on files kept up to date in their context, so instead of summarizing
+they drop content made obsolete by later steps.
+"""
+
+import os
+from langchain_core.messages import HumanMessage
+from src.utilities.llms import init_llms_mini
+from src.utilities.util_functions import load_prompt, WRONG_TOOL_CALL_WORD
+from src.utilities.print_formatters import print_formatted
+
+# images are billed by their size, that is a typical cost of a screenshot
+IMAGE_TOKENS = 1500
+# messages recreated by agents on every turn; never summarized
+REFRESHED_MESSAGE_ATTRS = ("tasks_and_progress_message", "contains_file_contents", "contains_file_diffs")
+# max length of a single message shown to summarizing LLM
+MAX_SUMMARIZED_MESSAGE_CHARS = 3000
+DIGEST_HEADER = "Digest of earlier conversation:\n\n"
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def estimate_message_tokens(message) -> int:
+    tokens = 4
+    if isinstance(message.content, str):
+        tokens += estimate_tokens(message.content)
+    else:
+        for block in message.content:
+            if isinstance(block, str):
+                tokens += estimate_tokens(block)
+            elif block.get("type") in ("image", "image_url"):
+                tokens += IMAGE_TOKENS
+            else:
+                tokens += estimate_tokens(str(block.get("text", block)))
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        tokens += estimate_tokens(str(tool_call["args"]))
+    return tokens
+
+
+def split_to_turns(messages):
+    """Groups messages into turns, each starting with an AI message. Messages before the first one form a turn too."""
+    turns = []
+    for message in messages:
+        if message.type == "ai" or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def message_to_text(message) -> str:
+    if isinstance(message.content, str):
+        content = message.content
+    else:
+        content = " ".join(
+            block if isinstance(block, str) else block.get("text", "<image>") for block in message.content
+        )
+    if len(content) > MAX_SUMMARIZED_MESSAGE_CHARS:
+        content = content[:MAX_SUMMARIZED_MESSAGE_CHARS] + "... (cut)"
+    tool_calls = "".join(
+        f"\nTool call: {tool_call['name']}({tool_call['args']})" for tool_call in getattr(message, "tool_calls", [])
+    )
+    return f"{message.type}: {content}{tool_calls}"
+
+
+class ContextCompactor:
+    """
+    Keeps conversation under max_tokens. Once exceeded, conversation is cut down to target_share of the ceiling,
+    so it grows again for a number of turns before the next compaction, keeping conversation prefix stable.
+    """
+
+    def __init__(self, max_tokens, run_name="Context Compactor", target_share=0.6):
+        self.max_tokens = max_tokens
+        self.target_tokens = int(max_tokens * target_share)
+        self.run_name = run_name
+        self.llm = None
+
+    def compact(self, messages):
+        if sum(estimate_message_tokens(msg) for msg in messages) <= self.max_tokens:
+            return messages
+        system_messages = [msg for msg in messages[:1] if msg.type == "system"]
+        digest_messages = [msg for msg in messages if hasattr(msg, "contains_context_digest")]
+        history = [msg for msg in messages[len(system_messages) :] if not hasattr(msg, "contains_context_digest")]
+        turns = split_to_turns(history)
+
+        budget = self.target_tokens - sum(estimate_message_tokens(msg) for msg in system_messages + digest_messages)
+        kept_turns = [turns.pop()]
+        budget -= sum(estimate_message_tokens(msg) for msg in kept_turns[0])
+        while turns:
+            turn_tokens = sum(estimate_message_tokens(msg) for msg in turns[-1])
+            if turn_tokens > budget:
+                break
+            kept_turns.insert(0, turns.pop())
+            budget -= turn_tokens
+        if not turns:
+            return messages
+
+        evicted = [
+            msg for turn in turns for msg in turn if not any(hasattr(msg, attr) for attr in REFRESHED_MESSAGE_ATTRS)
+        ]
+        previous_digest = digest_messages[-1].content.removeprefix(DIGEST_HEADER).strip() if digest_messages else ""
+        digest = self.summarize(previous_digest, evicted)
+        digest_message = HumanMessage(content=DIGEST_HEADER + digest, contains_context_digest=True)
+        return system_messages + [digest_message] + [msg for turn in kept_turns for msg in turn]
+
+    def summarize(self, previous_digest, evicted):
+        """Updates digest with evicted messages. If summarizing fails, notes that earlier messages were dropped."""
+        conversation = "\n\n".join(message_to_text(msg) for msg in evicted)
+        try:
+            if self.llm is None:
+                llms = init_llms_mini(run_name=self.run_name)
+                self.llm = llms[0].with_fallbacks(llms[1:])
+            prompt = load_prompt("context_digest").format(digest=previous_digest or "-", conversation=conversation)
+            summary = self.llm.invoke([HumanMessage(content=prompt)]).content
+        except Exception as e:
+            print_formatted(f"Could not summarize earlier conversation: {e}", color="yellow")
+            summary = f"{previous_digest}\n({len(evicted)} earlier messages were removed without summary.)"
+        return summary.strip()
+
+
+# Executor and Debugger conversations above that size are compacted
+CODING_AGENT_CONTEXT_TOKENS = int(os.getenv("CODING_AGENT_CONTEXT_TOKENS", 40000))
+EDIT_TOOLS = ("insert_code", "replace_code", "create_file_with_code")
+SUCCESSFUL_EDIT_OUTPUTS = ("Code inserted.", "Code modified.", "File been created successfully.")
+APPLIED_CODE_PLACEHOLDER = "<code applied to the file, see current file contents>"
+OUTDATED_SEE_FILE_OUTPUT = "<outdated file view removed: file changed or been seen again later>"
+OLD_TOOL_OUTPUT = "<old tool output removed to fit context>"
+# messages of which only the latest one is kept, with placeholders of removed ones
+LATEST_ONLY_ATTRS = {
+    "contains_screenshots": "<outdated screenshots removed, see the latest ones>",
+    "contains_logs": "<outdated logs removed, see the latest ones>",
+}
+
+
+def compact_coding_agent_context(messages, max_tokens, target_share=0.6):
+    """
+    Compaction stage of Executor and Debugger. Once conversation exceeds max_tokens, removes content made obsolete
+    by later steps: file views superseded by changes or by newer views of the same fragment, code of already
+    applied edits (it is in file contents), code of wrong edits resolved by a later change, older screenshots
+    and logs. If conversation is still above target_share of max_tokens, outputs of the oldest tool calls are
+    removed too, so it grows again for a number of turns before the next compaction, as in ContextCompactor.
+    Messages of the latest turn are never changed, tool calls and their results are kept in place.
+    """
+    if sum(estimate_message_tokens(msg) for msg in messages) <= max_tokens:
+        return messages
+    ai_indexes = [i for i, msg in enumerate(messages) if msg.type == "ai"]
+    if not ai_indexes:
+        return messages
+    tool_calls = {call["id"]: call for i in ai_indexes for call in messages[i].tool_calls}
+
+    def edited_file(i):
+        call = tool_calls.get(getattr(messages[i], "tool_call_id", None))
+        if call and call["name"] in EDIT_TOOLS and messages[i].content in SUCCESSFUL_EDIT_OUTPUTS:
+            return call["args"].get("filename")
+        return None
+
+    last_successful_edit = {}
+    for i in range(len(messages)):
+        if messages[i].type == "tool" and edited_file(i):
+            last_successful_edit[edited_file(i)] = i
+
+    content_updates = {}
+    args_updates = {}
+    seen_file_views = set()
+    latest_seen_attrs = set()
+    for i in range(ai_indexes[-1] - 1, -1, -1):
+        message = messages[i]
+        for attr, placeholder in LATEST_ONLY_ATTRS.items():
+            if hasattr(message, attr):
+                if attr in latest_seen_attrs:
+                    content_updates[i] = placeholder
+                latest_seen_attrs.add(attr)
+        call = tool_calls.get(getattr(message, "tool_call_id", None)) if message.type == "tool" else None
+        if call is None:
+            continue
+        filename = call["args"].get("filename")
+        changed_later = last_successful_edit.get(filename, -1) > i
+        if call["name"] == "see_file":
+            view = tuple(call["args"].get(arg) for arg in ("filename", "start_line", "end_line", "symbol"))
+            if view in seen_file_views or changed_later:
+                content_updates[i] = OUTDATED_SEE_FILE_OUTPUT
+            seen_file_views.add(view)
+        elif call["name"] in EDIT_TOOLS and "code" in call["args"]:
+            if message.content in SUCCESSFUL_EDIT_OUTPUTS:
+                args_updates[call["id"]] = {**call["args"], "code": APPLIED_CODE_PLACEHOLDER}
+            elif str(message.content).startswith(WRONG_TOOL_CALL_WORD) and changed_later:
+                content_updates[i] = WRONG_TOOL_CALL_WORD + "Error resolved by a later change."
+                args_updates[call["id"]] = {**call["args"], "code": APPLIED_CODE_PLACEHOLDER}
+
+    compacted = []
+    for i, message in enumerate(messages):
+        if i in content_updates and message.content != content_updates[i]:
+            message = message.model_copy(update={"content": content_updates[i]})
+        elif message.type == "ai" and any(
+            call["id"] in args_updates and call["args"] != args_updates[call["id"]] for call in message.tool_calls
+        ):
+            message = with_tool_call_args(message, args_updates)
+        compacted.append(message)
+
+    tokens = sum(estimate_message_tokens(msg) for msg in compacted)
+    target_tokens = int(max_tokens * target_share)
+    for i in range(ai_indexes[-1]):
+        if tokens <= target_tokens:
+            break
+        if compacted[i].type != "tool" or i in content_updates:
+            continue
+        removed = compacted[i].model_copy(update={"content": OLD_TOOL_OUTPUT})
+        saved_tokens = estimate_message_tokens(compacted[i]) - estimate_message_tokens(removed)
+        if saved_tokens > 0:
+            compacted[i] = removed
+            tokens -= saved_tokens
+    return compacted
+
+
+def with_tool_call_args(message, args_updates):
+    """Copy of AI message with arguments of tool calls replaced, also in tool use blocks of its content."""
+    tool_calls = [{**call, "args": args_updates.get(call["id"], call["args"])} for call in message.tool_calls]
+    content = message.content
+    if isinstance(content, list):
+        content = [
+            {**block, "input": args_updates[block["id"]]}
+            if isinstance(block, dict) and block.get("type") == "tool_use" and block.get("id") in args_updates
+            else block
+            for block in content
+        ]
+    return message.model_copy(update={"tool_calls": tool_calls, "content": content})
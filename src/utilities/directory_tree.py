@@ -0,0 +1,173 @@
+"""
+Snapshots of project directory tree shown to agents.
+
+Listing of every directory is kept together with directory modification time, which changes when entries are added,
+removed or renamed in it. Rendering the tree again only stats listed directories and rescans changed ones. Ignored
+directories are pruned by their path relative to work dir, so they are never walked into. Symlinked directories are
+shown without contents, so links pointing outside work dir or making cycles are not followed. When workspace watcher
+is running, snapshot follows its change events instead and does not stat unchanged directories at all.
+"""
+
+import os
+import threading
+from src.utilities.start_work_functions import CoderIgnore, directory_ignored, file_folder_ignored
+
+# directories with more items are shown without contents
+MAX_DIRECTORY_ITEMS = 30
+
+
+class DirectoryListing:
+    def __init__(self, mtime_ns, dirs, files, linked_dirs=()):
+        self.mtime_ns = mtime_ns
+        self.dirs = dirs
+        self.files = files
+        # symlinked directories among dirs; shown, but not followed
+        self.linked_dirs = set(linked_dirs)
+
+    def collapsed(self):
+        """Contents of too big and empty directories are not shown."""
+        return not 0 < len(self.dirs) + len(self.files) <= MAX_DIRECTORY_ITEMS
+
+
+class DirectoryTreeSnapshot:
+    def __init__(self, work_dir):
+        self.work_dir = work_dir
+        self.lock = threading.Lock()
+        # listings by directory path relative to work dir, "" for work dir itself
+        self.listings = {}
+        # directories to rescan regardless of their modification time
+        self.changed_dirs = set()
+        self.matcher = None
+        self.rendered = None
+        self.watcher = None
+
+    def mark_changed(self, path):
+        """
+        Marks directories containing path (relative to work dir) to be rescanned, e.g. after agent created file in it.
+        Needed as modification times of some file systems have low resolution.
+        """
+        path = path.replace(os.sep, "/").strip("/")
+        with self.lock:
+            while path:
+                path = os.path.dirname(path)
+                self.changed_dirs.add(path)
+
+    def follow(self, watcher):
+        """Subscribes to workspace watcher; from now on only directories it reported changes in are rescanned."""
+        watcher.subscribe(self.on_workspace_changes)
+        with self.lock:
+            self.watcher = watcher
+
+    def on_workspace_changes(self, changes):
+        for change in changes:
+            # modified files do not change the tree
+            if change.kind != "modified":
+                self.mark_changed(change.path)
+
+    def render(self):
+        with self.lock:
+            matcher = CoderIgnore.get_matcher()
+            if matcher is not self.matcher:
+                # .coderignore changed
+                self.listings.clear()
+                self.matcher = matcher
+            elif self.watcher is not None and self.rendered is not None and not self.changed_dirs:
+                return self.rendered
+            visited = set()
+            changed = self.refresh("", visited)
+            for rel_dir in set(self.listings) - visited:
+                del self.listings[rel_dir]
+            # changes in directories not shown; they have no listings, so are scanned once shown
+            self.changed_dirs.clear()
+            if changed or self.rendered is None:
+                tree = []
+                self.render_directory("", tree)
+                self.rendered = "Content of directory tree:\n" + "\n".join(tree)
+            return self.rendered
+
+    def refresh(self, rel_dir, visited):
+        """Rescans directory if changed, and its shown subdirectories. Returns True if anything changed."""
+        visited.add(rel_dir)
+        listing = self.listings.get(rel_dir)
+        if self.watcher is not None and listing is not None and rel_dir not in self.changed_dirs:
+            changed = False
+        else:
+            changed = self.rescan_if_modified(rel_dir, listing)
+            if rel_dir not in self.listings:
+                return True
+            listing = self.listings[rel_dir]
+        if not listing.collapsed():
+            for name in listing.dirs:
+                if name in listing.linked_dirs:
+                    continue
+                changed |= self.refresh(f"{rel_dir}/{name}" if rel_dir else name, visited)
+        return changed
+
+    def rescan_if_modified(self, rel_dir, listing):
+        try:
+            mtime_ns = os.stat(os.path.join(self.work_dir, rel_dir)).st_mtime_ns
+        except OSError:
+            # removed meanwhile, parent directory is changed too
+            self.listings.pop(rel_dir, None)
+            self.changed_dirs.discard(rel_dir)
+            return True
+        changed = listing is None or listing.mtime_ns != mtime_ns or rel_dir in self.changed_dirs
+        if changed:
+            self.listings[rel_dir] = self.scan(rel_dir, mtime_ns)
+            self.changed_dirs.discard(rel_dir)
+        return changed
+
+    def scan(self, rel_dir, mtime_ns):
+        prefix = f"{rel_dir}/" if rel_dir else ""
+        dirs = []
+        files = []
+        linked_dirs = []
+        with os.scandir(os.path.join(self.work_dir, rel_dir)) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if not directory_ignored(prefix + entry.name):
+                        dirs.append(entry.name)
+                        if entry.is_symlink():
+                            linked_dirs.append(entry.name)
+                elif not file_folder_ignored(prefix + entry.name):
+                    files.append(entry.name)
+        return DirectoryListing(mtime_ns, sorted(dirs), sorted(files), linked_dirs)
+
+    def render_directory(self, rel_dir, tree):
+        listing = self.listings.get(rel_dir)
+        if listing is None:
+            return
+        depth = rel_dir.count("/")
+        indent = "│ " * depth
+        file_indent = "│ " * (depth + 1)
+        tree.append(f"{indent}{'└──' if depth > 0 else ''}📁 {os.path.basename(rel_dir)}")
+
+        total_items = len(listing.dirs) + len(listing.files)
+        if total_items > MAX_DIRECTORY_ITEMS:
+            tree.append(f"{file_indent}Too many files/folders to display ({total_items} items)")
+            return
+        elif total_items == 0:
+            tree.append(f"{file_indent}<Directory is empty>")
+            return
+
+        for i, file in enumerate(listing.files):
+            connector = "└── " if i == len(listing.files) - 1 else "├── "
+            tree.append(f"{file_indent}{connector}{file}")
+        for name in listing.dirs:
+            if name in listing.linked_dirs:
+                tree.append(f"{file_indent}└──📁 {name} (symlink, not expanded)")
+                continue
+            self.render_directory(f"{rel_dir}/{name}" if rel_dir else name, tree)
+
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_tree_snapshot(work_dir):
+    """Returns process-wide snapshot of directory tree of work_dir."""
+    key = os.path.abspath(work_dir)
+    with _snapshots_lock:
+        if key not in _snapshots:
+            _snapshots[key] = DirectoryTreeSnapshot(key)
+        return _snapshots[key]
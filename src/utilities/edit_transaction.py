@@ -0,0 +1,83 @@
+"""
+Transactions of line edits of a file.
+
+Edits (code insertions and replacements) are applied to an in-memory copy of file lines, from the greatest start line
+down, so they do not shift each other. Syntax of the result is checked once and the file is written atomically, by
+renaming a temporary file over it: either all edits of the transaction are applied or none.
+"""
+
+import os
+import shutil
+import tempfile
+from src.linters.syntax_validation import validate_syntax
+from src.utilities.util_functions import join_paths, WRONG_TOOL_CALL_WORD, TOOL_NOT_EXECUTED_WORD
+from src.utilities.user_input import user_input
+
+
+class LineEdit:
+    def __init__(self, start_line, code, end_line=None, done_message="Code modified.", syntax_error_message=""):
+        # code is inserted after start_line if end_line is None, replaces lines start_line to end_line otherwise
+        self.start_line = start_line
+        self.end_line = end_line
+        self.code = code
+        # tool outputs when edit is applied and when it breaks syntax ({error_response} is filled in)
+        self.done_message = done_message
+        self.syntax_error_message = syntax_error_message
+
+    def apply(self, lines):
+        if self.end_line is None:
+            lines.insert(self.start_line, self.code + "\n")
+        else:
+            lines[self.start_line - 1 : self.end_line] = [self.code + "\n"]
+
+
+def apply_edits(lines, edits):
+    """Returns lines with edits applied, each edit referring to line numbers of original lines."""
+    lines = list(lines)
+    # sort is stable, so edits at the same line are applied in their order
+    for edit in sorted(edits, key=lambda edit: edit.start_line, reverse=True):
+        edit.apply(lines)
+    return lines
+
+
+def write_atomically(path, contents):
+    """Writes contents to temporary file next to path and renames it over path, keeping file permissions."""
+    directory, name = os.path.split(path)
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            file.write(contents)
+        shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def apply_line_edits(work_dir, filename, edits):
+    """
+    Applies edits to file as a single transaction, after syntax check and human approval. Returns tool output for
+    every edit, in order of edits.
+    """
+    try:
+        path = join_paths(work_dir, filename)
+        with open(path, "r", encoding="utf-8") as file:
+            contents = "".join(apply_edits(file.readlines(), edits))
+        check_syntax_response = validate_syntax(contents, filename)
+        if check_syntax_response != "Valid syntax":
+            print(check_syntax_response)
+            rolled_back = f"\nNone of {len(edits)} changes of {filename} been applied." if len(edits) > 1 else ""
+            return [
+                WRONG_TOOL_CALL_WORD
+                + edit.syntax_error_message.format(error_response=check_syntax_response)
+                + rolled_back
+                for edit in edits
+            ]
+        message = "Never accept changes you don't understand. Type (o)k if you accept or provide commentary. "
+        human_message = user_input(message)
+        if human_message not in ["o", "ok"]:
+            return [TOOL_NOT_EXECUTED_WORD + f"Human: '{human_message}'"] * len(edits)
+        write_atomically(path, contents)
+        return [edit.done_message for edit in edits]
+    except Exception as e:
+        return [f"{type(e).__name__}: {e}"] * len(edits)
@@ -0,0 +1,160 @@
+"""
+Views of code files for agents: line-numbered file fragments, outlines of definitions and symbol lookup.
+Contents of files and their line-numbered versions are cached per file version (path, inode, modification time and size).
+"""
+
+import os
+import re
+import ast
+import threading
+from collections import OrderedDict
+
+# number of files which formatted content is kept in memory
+FORMAT_CACHE_SIZE = 64
+
+# definitions in JS/TS, Vue scripts and other C-like languages
+definition_line_pattern = re.compile(
+    r"^\s*(?:export\s+)?(?:default\s+)?(?:public\s+|private\s+|protected\s+|static\s+|abstract\s+)*(?:async\s+)?"
+    r"(?:function\s*\*?\s*(?P<function>[\w$]+)|class\s+(?P<class>[\w$]+)|interface\s+(?P<interface>[\w$]+)"
+    r"|(?:const|let|var)\s+(?P<variable>[\w$]+)\s*(?::[^=]+)?=\s*(?:async\s*)?(?:\([^)]*\)|[\w$]+)\s*(?::[^=]+)?=>"
+    r"|(?P<method>(?!if\b|for\b|while\b|switch\b|catch\b|return\b)[\w$]+)\s*\([^;]*\)\s*(?::[^{;]+)?\{\s*$)"
+)
+
+_format_cache = OrderedDict()
+_format_cache_lock = threading.Lock()
+
+
+def file_lines(path):
+    """Returns lines of file, cached per file version."""
+    return _cached_file(path)[1]
+
+
+def formatted_lines(path):
+    """Returns lines of file formatted with line numbers on both sides, as '12|code|12'."""
+    cached = _cached_file(path)
+    if cached[2] is None:
+        cached[2] = [f"{i+1}|{line.rstrip(chr(10))}|{i+1}\n" for i, line in enumerate(cached[1])]
+    return cached[2]
+
+
+def _cached_file(path):
+    """Returns [version, lines, formatted lines or None] cache entry of current version of file."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    # edits replace files atomically, so inode tells apart versions written within timestamp resolution
+    version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    with _format_cache_lock:
+        cached = _format_cache.get(path)
+        if cached and cached[0] == version:
+            _format_cache.move_to_end(path)
+            return cached
+    with open(path, "r", encoding="utf-8") as file:
+        lines = file.readlines()
+    cached = [version, lines, None]
+    with _format_cache_lock:
+        _format_cache[path] = cached
+        _format_cache.move_to_end(path)
+        while len(_format_cache) > FORMAT_CACHE_SIZE:
+            _format_cache.popitem(last=False)
+    return cached
+
+
+def forget_files(paths):
+    """Drops cached versions of files, e.g. when workspace watcher reported them changed."""
+    with _format_cache_lock:
+        for path in paths:
+            _format_cache.pop(os.path.abspath(path), None)
+
+
+def file_outline(path):
+    """
+    Returns list of definitions in the file as (line number, nesting level, name, signature) tuples.
+    Python files are parsed with ast, other languages are scanned for lines looking like definitions.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        code = file.read()
+    lines = code.splitlines()
+    if path.endswith(".py"):
+        try:
+            tree = ast.parse(code)
+        except (SyntaxError, ValueError):
+            pass
+        else:
+            outline = []
+            for node, level, _ in python_definitions(tree):
+                signature = lines[node.lineno - 1].strip()
+                if not signature.endswith(":"):
+                    signature += " ..."
+                outline.append((node.lineno, level, node.name, signature))
+            return outline
+
+    outline = []
+    for nr, line in enumerate(lines, start=1):
+        match = definition_line_pattern.match(line)
+        if match:
+            name = next(value for value in match.groupdict().values() if value)
+            level = (len(line) - len(line.lstrip())) // 2
+            outline.append((nr, level, name, line.strip().rstrip("{").strip()))
+    return outline
+
+
+def python_definitions(tree, level=0, prefix=""):
+    """Yields (node, nesting level, qualified name) of classes and functions, in order of appearance."""
+    for node in ast.iter_child_nodes(tree):
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            qualified_name = prefix + node.name
+            yield node, level, qualified_name
+            yield from python_definitions(node, level + 1, qualified_name + ".")
+
+
+def symbol_range(path, symbol):
+    """
+    Returns (start_line, end_line) of definition of class or function named symbol, as 'name' or 'Class.method'.
+    None if not found.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        code = file.read()
+    if path.endswith(".py"):
+        try:
+            tree = ast.parse(code)
+        except (SyntaxError, ValueError):
+            pass
+        else:
+            definitions = list(python_definitions(tree))
+            for node, _, qualified_name in definitions:
+                if qualified_name == symbol:
+                    return python_node_range(node)
+            for node, _, _ in definitions:
+                if node.name == symbol.split(".")[-1]:
+                    return python_node_range(node)
+            return None
+
+    lines = code.splitlines()
+    name = symbol.split(".")[-1]
+    for nr, _, definition_name, _ in file_outline(path):
+        if definition_name == name:
+            return nr, block_end(lines, nr)
+    return None
+
+
+def python_node_range(node):
+    start_line = min([decorator.lineno for decorator in node.decorator_list] + [node.lineno])
+    return start_line, node.end_lineno
+
+
+def block_end(lines, start_line):
+    """
+    Finds end of block starting at start_line by indentation: block ends before the first next line indented
+    no deeper than its first line. Closing bracket at the same indentation belongs to the block.
+    """
+    first_line = lines[start_line - 1]
+    indent = len(first_line) - len(first_line.lstrip())
+    last_line = start_line
+    for nr in range(start_line + 1, len(lines) + 1):
+        line = lines[nr - 1]
+        if not line.strip():
+            continue
+        if len(line) - len(line.lstrip()) <= indent:
+            return nr if line.lstrip()[0] in "})]" else last_line
+        last_line = nr
+    return last_line
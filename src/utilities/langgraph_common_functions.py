@@ -1,4 +1,4 @@
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import HumanMessage, ToolMessage
 from src.utilities.print_formatters import (
     print_formatted,
     print_formatted_content,
@@ -7,7 +7,12 @@ from src.utilities.util_functions import invoke_tool_native, TOOL_NOT_EXECUTED_W
 from src.utilities.user_input import user_input
 from langgraph.graph import END
 from src.utilities.graphics import LoadingAnimation
+from src.utilities.prompt_caching import add_cache_breakpoints, prompt_cache_stats
+from src.utilities.llm_streaming import llm_streaming_enabled, stream_response
+from src.utilities.llm_router import llm_router, provider_name, AllLLMsFailed
+from src.utilities.edit_transaction import apply_line_edits
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 
 multiple_tools_msg = (
@@ -27,36 +32,90 @@ finish_too_early_msg = (
 
 
 animation = LoadingAnimation()
+# read-only tool calls (file views, semantic search) of a single model response are executed concurrently
+read_only_tools_executor = ThreadPoolExecutor(max_workers=8)
+# futures of read-only tool calls dispatched while model was still streaming its response, by tool call id
+prefetched_tool_results = {}
 
 
 # nodes
-def _get_llm_response(llms, messages, printing):
-    for llm in llms:
-        try:
-            return llm.invoke(messages)
-        except Exception as e:
-            if printing:
-                print_formatted(
-                    f"\nException happened: {e} with llm: {llm.bound.__class__.__name__}. "
-                    "Switching to next LLM if available...",
-                    color="yellow",
-                )
-    if printing:
-        print_formatted("Can not receive response from any llm", color="red")
-    sys.exit()
+def _get_llm_response(llms, messages, printing, tools=None):
+    def request(llm):
+        if llm_streaming_enabled:
+            return _stream_llm_response(llm, messages, printing, tools)
+        return llm.invoke(add_cache_breakpoints(messages, llm))
+
+    def on_failure(llm, exception):
+        if printing:
+            print_formatted(
+                f"\nException happened: {exception} with llm: {provider_name(llm)}. "
+                "Switching to next LLM if available...",
+                color="yellow",
+            )
+
+    try:
+        # streamed responses are printed as they arrive, so they are never duplicated by hedged requests
+        return llm_router.invoke(llms, request, hedge=not llm_streaming_enabled, on_failure=on_failure)
+    except AllLLMsFailed:
+        if printing:
+            print_formatted("Can not receive response from any llm", color="red")
+        sys.exit()
 
 
-def call_model(state, llms, printing=True):
+def _stream_llm_response(llm, messages, printing, tools):
+    """
+    Streams response, dispatching read-only tool calls as soon as they are complete. Dispatching stops at the first
+    call of a tool changing anything, as next calls have to see its effects.
+    """
+    read_only_tool_names = {tool.name for tool in tools or [] if _is_read_only(tool)}
+    dispatched_ids = []
+    mutating_call_seen = False
+
+    def dispatch(tool_call):
+        nonlocal mutating_call_seen
+        if tool_call["name"] not in read_only_tool_names:
+            mutating_call_seen = True
+        if mutating_call_seen:
+            return
+        prefetched_tool_results[tool_call["id"]] = read_only_tools_executor.submit(invoke_tool_native, tool_call, tools)
+        dispatched_ids.append(tool_call["id"])
+
+    response = None
+    try:
+        response = stream_response(
+            llm,
+            add_cache_breakpoints(messages, llm),
+            printing=printing,
+            on_first_chunk=animation.stop if printing else None,
+            on_tool_call=dispatch if read_only_tool_names else None,
+        )
+        return response
+    finally:
+        # results of a failed attempt (router falls back to the next LLM) or of calls missing in the final response
+        # would never be collected by call_tool
+        final_ids = {call["id"] for call in response.tool_calls} if response is not None else set()
+        for call_id in dispatched_ids:
+            if call_id not in final_ids:
+                prefetched_tool_results.pop(call_id).cancel()
+
+
+def call_model(state, llms, printing=True, tools=None):
+    """
+    Calls LLM and appends its response to messages. With streaming enabled, tools are needed to execute read-only
+    tool calls before response is complete.
+    """
     messages = state["messages"]
 
     if printing:
         animation.start()
-    response = _get_llm_response(llms, messages, printing)
+    response = _get_llm_response(llms, messages, printing, tools)
     if printing:
         animation.stop()
+    prompt_cache_stats.record(response)
 
     if printing:
-        print_formatted_content(response)
+        # streamed text is already printed
+        print_formatted_content(response, print_text=not llm_streaming_enabled)
     state["messages"].append(response)
 
     return state
@@ -65,21 +124,108 @@ def call_model(state, llms, printing=True):
 def call_tool(state, tools):
     """
     Execute tool calls in a safe order:
-    1. Line-based modifications (`start_line` provided) are executed from the
-       greatest line number to the smallest, preventing index shifts.
-    2. All other calls are executed afterwards, preserving the model’s order.
+    1. Line-based modifications (`start_line` provided) refer to line numbers of files before the model's turn, so
+       all of them are executed in one pass, from the greatest line number to the smallest, preventing index
+       shifts. Edits of the same file made by tools marked with `line_edit` metadata are applied together, as one
+       transaction. The pass is executed in place of the first line-based call.
+    2. Other calls are executed in the model's order, so they see effects of changes made before them.
+       Consecutive read-only calls (tools marked with `read_only` metadata) are executed concurrently. Results of
+       read-only calls dispatched during streaming are reused, unless an earlier call changed anything.
+    Tool messages are returned in the order of the model's tool calls.
     """
     last_message = state["messages"][-1]
+    tools_by_name = {tool.name: tool for tool in tools}
+    line_based_calls = [
+        call
+        for call in last_message.tool_calls
+        if not _is_read_only(tools_by_name.get(call["name"])) and "start_line" in call.get("args", {})
+    ]
+    # (read_only, calls) steps in order of execution
+    steps = []
+    for call in last_message.tool_calls:
+        if _is_read_only(tools_by_name.get(call["name"])):
+            if steps and steps[-1][0]:
+                steps[-1][1].append(call)
+            else:
+                steps.append((True, [call]))
+        elif call not in line_based_calls:
+            steps.append((False, [call]))
+        elif call is line_based_calls[0]:
+            steps.append((False, _sort_tool_calls(line_based_calls)))
 
-    ordered_calls = _sort_tool_calls(last_message.tool_calls)
+    tool_response_messages = {}
+    mutating_call_done = False
+    for read_only, calls in steps:
+        if read_only:
+            prefetched = {call["id"]: prefetched_tool_results.pop(call["id"], None) for call in calls}
+            if mutating_call_done:
+                # prefetched results could be outdated by changes
+                prefetched = {}
+            tool_response_messages.update(_invoke_read_only_calls(calls, tools, prefetched))
+            continue
+        tool_response_messages.update(_apply_line_edit_calls(calls, tools_by_name))
+        for tool_call in calls:
+            if tool_call["id"] not in tool_response_messages:
+                tool_response_messages[tool_call["id"]] = invoke_tool_native(tool_call, tools)
+        mutating_call_done = True
 
-    tool_response_messages = [
-        invoke_tool_native(tool_call, tools) for tool_call in ordered_calls
-    ]
-    state["messages"].extend(tool_response_messages)
+    state["messages"].extend(tool_response_messages[call["id"]] for call in last_message.tool_calls)
     return state
 
 
+def _invoke_read_only_calls(tool_calls, tools, prefetched):
+    """Executes read-only calls concurrently, reusing prefetched results. Returns tool messages by tool call id."""
+    tool_response_messages = {}
+    futures = {}
+    for tool_call in tool_calls:
+        if prefetched.get(tool_call["id"]):
+            futures[tool_call["id"]] = prefetched[tool_call["id"]]
+        elif len(tool_calls) == 1:
+            tool_response_messages[tool_call["id"]] = invoke_tool_native(tool_call, tools)
+        else:
+            futures[tool_call["id"]] = read_only_tools_executor.submit(invoke_tool_native, tool_call, tools)
+    for call_id, future in futures.items():
+        tool_response_messages[call_id] = future.result()
+    return tool_response_messages
+
+
+def _is_read_only(tool):
+    return bool(tool and (tool.metadata or {}).get("read_only"))
+
+
+def _apply_line_edit_calls(tool_calls, tools_by_name):
+    """
+    Applies calls of line edit tools as one transaction per file, for files edited by more than one call. Given all
+    line-based calls of the model's turn, so edits of a file separated by other calls are committed or rolled back
+    together. Returns tool messages by tool call id; other calls are left to be executed one by one.
+    """
+    calls_by_file = {}
+    for call in tool_calls:
+        tool = tools_by_name.get(call["name"])
+        if tool and (tool.metadata or {}).get("line_edit") and "filename" in call["args"]:
+            calls_by_file.setdefault(call["args"]["filename"], []).append(call)
+    tool_response_messages = {}
+    for filename, calls in calls_by_file.items():
+        if len(calls) < 2:
+            continue
+        try:
+            edits = [_line_edit_of_call(call, tools_by_name[call["name"]]) for call in calls]
+        except Exception:
+            # wrong arguments are reported by tools themselves
+            continue
+        work_dir = tools_by_name[calls[0]["name"]].metadata["work_dir"]
+        outputs = apply_line_edits(work_dir, filename, edits)
+        for call, output in zip(calls, outputs):
+            tool_response_messages[call["id"]] = ToolMessage(output, tool_call_id=call["id"])
+    return tool_response_messages
+
+
+def _line_edit_of_call(tool_call, tool):
+    args = dict(tool.args_schema.model_validate(tool_call["args"]))
+    del args["filename"]
+    return tool.metadata["line_edit"](**args)
+
+
 def _sort_tool_calls(tool_calls):
     """
     Return list of tool calls where calls containing `start_line`
@@ -0,0 +1,30 @@
+"""
+Deferred initialization of API clients, LLMs and other heavy objects, so CLI starts without creating them.
+Heavy libraries (chromadb, LLM providers SDKs, parsers of linters, audio) are imported in functions using them.
+"""
+
+import threading
+
+
+class LazyObject:
+    """
+    Proxy creating object with factory on first attribute access, e.g. API client needing env variables set up
+    after import. get() returns the object itself, for places needing it unwrapped (like composing chains).
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._object = None
+        self._created = False
+
+    def get(self):
+        if not self._created:
+            with self._lock:
+                if not self._created:
+                    self._object = self._factory()
+                    self._created = True
+        return self._object
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
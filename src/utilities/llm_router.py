@@ -0,0 +1,171 @@
+"""
+Routing of agent requests over LLMs of different providers.
+
+Router keeps rolling latency and error statistics of every provider (shared by all agents of the process). Providers
+failing repeatedly are moved to the end of the fallback order for a cool-down period. Optionally, when the preferred
+provider does not answer within given percentile of its usual latency, a hedged duplicate request is sent to the
+next healthy provider and whichever answer comes first is used.
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from src.utilities.prompt_caching import unwrap_model
+
+# seconds unhealthy provider is skipped for
+LLM_COOLDOWN_SECONDS = float(os.getenv("LLM_COOLDOWN_SECONDS", 120))
+# latency percentile of provider after which hedged request is sent to the next one; hedging disabled if not set
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE")) if os.getenv("LLM_HEDGE_PERCENTILE") else None
+# number of recent requests of provider statistics are computed from
+HEALTH_WINDOW = 20
+# provider is cooled down after that many failures in a row, or when error rate of its window exceeds MAX_ERROR_RATE
+FAILURES_TO_COOL_DOWN = 2
+MAX_ERROR_RATE = 0.5
+# minimal number of answers needed to estimate latency percentiles and error rate
+MIN_SAMPLES = 5
+
+hedged_requests_executor = ThreadPoolExecutor(max_workers=4)
+
+
+class AllLLMsFailed(Exception):
+    pass
+
+
+def provider_name(llm):
+    model = unwrap_model(llm)
+    model_name = getattr(model, "model", None) or getattr(model, "model_name", None)
+    return f"{model.__class__.__name__}({model_name})" if model_name else model.__class__.__name__
+
+
+class ProviderHealth:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        # (latency in seconds, succeeded) of recent requests
+        self.results = deque(maxlen=HEALTH_WINDOW)
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    def record(self, latency, succeeded, cooldown_seconds):
+        self.results.append((latency, succeeded))
+        if succeeded:
+            self.consecutive_failures = 0
+            return
+        self.consecutive_failures += 1
+        error_rate = self.error_rate()
+        if self.consecutive_failures >= FAILURES_TO_COOL_DOWN or (error_rate is not None and error_rate > MAX_ERROR_RATE):
+            self.cooldown_until = self.clock() + cooldown_seconds
+
+    def error_rate(self):
+        if len(self.results) < MIN_SAMPLES:
+            return None
+        return sum(1 for _, succeeded in self.results if not succeeded) / len(self.results)
+
+    def latency_percentile(self, percentile):
+        latencies = sorted(latency for latency, succeeded in self.results if succeeded)
+        if len(latencies) < MIN_SAMPLES:
+            return None
+        return latencies[min(int(len(latencies) * percentile / 100), len(latencies) - 1)]
+
+    def is_healthy(self):
+        return self.clock() >= self.cooldown_until
+
+
+class LLMRouter:
+    def __init__(self, cooldown_seconds=LLM_COOLDOWN_SECONDS, hedge_percentile=LLM_HEDGE_PERCENTILE, clock=time.monotonic):
+        self.cooldown_seconds = cooldown_seconds
+        self.hedge_percentile = hedge_percentile
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.health = {}
+
+    def health_of(self, llm):
+        name = provider_name(llm)
+        with self.lock:
+            if name not in self.health:
+                self.health[name] = ProviderHealth(self.clock)
+            return self.health[name]
+
+    def ordered(self, llms):
+        """Healthy LLMs in order of preference, followed by cooling down ones, soonest available first."""
+        healthy = [llm for llm in llms if self.health_of(llm).is_healthy()]
+        cooling_down = sorted(
+            (llm for llm in llms if not self.health_of(llm).is_healthy()),
+            key=lambda llm: self.health_of(llm).cooldown_until,
+        )
+        return healthy + cooling_down
+
+    def invoke(self, llms, request, hedge=True, on_failure=None):
+        """
+        Returns request(llm) of the first LLM answering, trying LLMs in order of their health.
+        on_failure(llm, exception) is called for every failed request. Raises AllLLMsFailed if none answered.
+        """
+        ordered = self.ordered(llms)
+        tried = set()
+        for position, llm in enumerate(ordered):
+            if id(llm) in tried:
+                continue
+            candidates = [llm]
+            hedge_delay = self.hedge_delay(llm) if hedge else None
+            backup = next(
+                (other for other in ordered[position + 1 :] if self.health_of(other).is_healthy()), None
+            )
+            if hedge_delay is not None and backup is not None:
+                candidates.append(backup)
+            succeeded, response = self.request_first_answer(candidates, request, hedge_delay, on_failure, tried)
+            if succeeded:
+                return response
+        raise AllLLMsFailed("Can not receive response from any llm")
+
+    def hedge_delay(self, llm):
+        if self.hedge_percentile is None:
+            return None
+        return self.health_of(llm).latency_percentile(self.hedge_percentile)
+
+    def request_first_answer(self, candidates, request, hedge_delay, on_failure, tried):
+        """
+        Requests the first candidate; the second one (if given) is requested only when the first did not answer
+        within hedge_delay. Returns (succeeded, response) with the first successful answer.
+        """
+        if len(candidates) == 1:
+            tried.add(id(candidates[0]))
+            try:
+                return True, self.timed_request(candidates[0], request)
+            except Exception as e:
+                if on_failure:
+                    on_failure(candidates[0], e)
+                return False, None
+
+        primary, backup = candidates
+        tried.add(id(primary))
+        futures = {hedged_requests_executor.submit(self.timed_request, primary, request): primary}
+        done, _ = wait(futures, timeout=hedge_delay)
+        if not done:
+            tried.add(id(backup))
+            futures[hedged_requests_executor.submit(self.timed_request, backup, request)] = backup
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return True, future.result()
+                if on_failure:
+                    on_failure(futures[future], future.exception())
+        return False, None
+
+    def timed_request(self, llm, request):
+        health = self.health_of(llm)
+        start = self.clock()
+        try:
+            response = request(llm)
+        except Exception:
+            with self.lock:
+                health.record(self.clock() - start, False, self.cooldown_seconds)
+            raise
+        with self.lock:
+            health.record(self.clock() - start, True, self.cooldown_seconds)
+        return response
+
+
+llm_router = LLMRouter()
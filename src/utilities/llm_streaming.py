@@ -0,0 +1,94 @@
+"""
+Streaming of LLM responses, enabled with LLM_STREAMING env variable.
+
+Text of response is printed as it arrives. Tool calls are assembled from their chunks and reported as soon as
+their arguments are complete - that is when model starts the next content block - so read-only tools can be
+executed while the model still generates the rest of its response.
+"""
+
+import os
+import sys
+import json
+from langchain_core.messages import message_chunk_to_message
+from src.utilities.print_formatters import print_formatted
+
+llm_streaming_enabled = os.getenv("LLM_STREAMING", "false").lower() in ("true", "1", "yes")
+
+
+def chunk_text(chunk):
+    if isinstance(chunk.content, str):
+        return chunk.content
+    return "".join(
+        block.get("text", "") for block in chunk.content if isinstance(block, dict) and block.get("type") == "text"
+    )
+
+
+def stream_response(llm, messages, printing=True, on_first_chunk=None, on_tool_call=None):
+    """
+    Streams response of llm and returns it assembled into AIMessage. on_tool_call(tool_call) is called with every
+    tool call completed before the end of the stream, in order of generation.
+    """
+    response = None
+    reported_indexes = set()
+    current_index = None
+    text_printed = False
+    for chunk in llm.stream(messages):
+        if response is None:
+            if on_first_chunk:
+                on_first_chunk()
+            response = chunk
+        else:
+            response = response + chunk
+        text = chunk_text(chunk)
+        if printing and text:
+            print_formatted(text, color="dark_grey", end="")
+            sys.stdout.flush()
+            text_printed = True
+        for tool_call_chunk in chunk.tool_call_chunks:
+            index = tool_call_chunk.get("index")
+            if index is None or index == current_index:
+                continue
+            current_index = index
+            if on_tool_call:
+                for tool_call in completed_tool_calls(response, reported_indexes, current_index):
+                    on_tool_call(tool_call)
+    if text_printed:
+        print()
+    if response is None:
+        raise ValueError("LLM returned empty stream.")
+    return finalized_message(response)
+
+
+def completed_tool_calls(response, reported_indexes, current_index):
+    """Tool calls of response generated before the one of current_index, not reported yet."""
+    completed = []
+    for tool_call_chunk in response.tool_call_chunks:
+        index = tool_call_chunk.get("index")
+        if index == current_index or index in reported_indexes:
+            continue
+        reported_indexes.add(index)
+        try:
+            args = json.loads(tool_call_chunk["args"] or "{}")
+        except json.JSONDecodeError:
+            continue
+        if tool_call_chunk.get("id") and tool_call_chunk.get("name") and isinstance(args, dict):
+            completed.append(
+                {"name": tool_call_chunk["name"], "args": args, "id": tool_call_chunk["id"], "type": "tool_call"}
+            )
+    return completed
+
+
+def finalized_message(response):
+    """
+    Converts assembled chunks into AIMessage. Stream bookkeeping (block indexes, partial tool inputs) is removed
+    from content blocks; tool calls are kept in tool_calls, from which providers rebuild tool use blocks.
+    """
+    message = message_chunk_to_message(response)
+    if isinstance(message.content, list):
+        content = [
+            {key: value for key, value in block.items() if key != "index"} if isinstance(block, dict) else block
+            for block in message.content
+            if not (isinstance(block, dict) and block.get("type") == "tool_use")
+        ]
+        message = message.model_copy(update={"content": content})
+    return message
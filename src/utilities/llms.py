@@ -1,50 +1,112 @@
-from langchain_openai.chat_models import ChatOpenAI as ChatOpenRouter
-from langchain_openai.chat_models import ChatOpenAI as ChatLocalModel
 from os import getenv
 import os
+import threading
 from dotenv import load_dotenv
-from langchain_openai.chat_models import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain_ollama import ChatOllama
+# providers SDKs are imported on first model creation, as they take long to import
 # from langchain_google_genai import ChatGoogleGenerativeAI
 
 load_dotenv()
 
+OPENAI_API_BASE = "https://api.openai.com/v1"
+OPENROUTER_API_BASE = "https://openrouter.ai/api/v1"
+
+# chat models shared by all agents of the process, by model class and params
+_models = {}
+# keep-alive connection pools of OpenAI-compatible clients, by api base url
+_http_clients = {}
+_registry_lock = threading.Lock()
+
+
+def shared_model(model_class, **params):
+    """
+    Returns chat model instance shared by all agents, created on the first request for model class with given params.
+    Agents bind their tools and run names on top of it, reusing its API client and connections.
+    """
+    key = (model_class, tuple(sorted((name, repr(value)) for name, value in params.items())))
+    with _registry_lock:
+        if key not in _models:
+            _models[key] = model_class(**params)
+        return _models[key]
+
+
+def shared_http_client(api_base):
+    """Connection pool shared by clients of all models served from api_base."""
+    from openai import DefaultHttpxClient
+
+    with _registry_lock:
+        if api_base not in _http_clients:
+            _http_clients[api_base] = DefaultHttpxClient()
+        return _http_clients[api_base]
+
+
+def llm_anthropic(model, **params):
+    from langchain_anthropic import ChatAnthropic
+
+    return shared_model(ChatAnthropic, model=model, timeout=90, **params)
+
+
+def llm_openai(model, **params):
+    from langchain_openai.chat_models import ChatOpenAI
+
+    return shared_model(
+        ChatOpenAI, model=model, timeout=90, http_client=shared_http_client(OPENAI_API_BASE), **params
+    )
+
 
 def llm_open_router(model):
-    return ChatOpenRouter(
+    from langchain_openai.chat_models import ChatOpenAI as ChatOpenRouter
+
+    return shared_model(
+        ChatOpenRouter,
         openai_api_key=getenv("OPENROUTER_API_KEY"),
-        openai_api_base="https://openrouter.ai/api/v1",
+        openai_api_base=OPENROUTER_API_BASE,
         model_name=model,
         default_headers={
             "HTTP-Referer": "https://github.com/Grigorij-Dudnik/Clean-Coder-AI",
             "X-Title": "Clean Coder",
         },
         timeout=90,
+        http_client=shared_http_client(OPENROUTER_API_BASE),
     )
 
 
 def llm_open_local_hosted(model):
-    return ChatLocalModel(
+    from langchain_openai.chat_models import ChatOpenAI as ChatLocalModel
+
+    return shared_model(
+        ChatLocalModel,
         openai_api_key="n/a",
         openai_api_base=getenv("LOCAL_MODEL_API_BASE"),
         model_name=model,
         timeout=90,
+        http_client=shared_http_client(getenv("LOCAL_MODEL_API_BASE")),
     )
 
 
+def llm_ollama(model):
+    from langchain_ollama import ChatOllama
+
+    return shared_model(ChatOllama, model=model)
+
+
+def init_llm_with_fallbacks(init_llms, run_name):
+    """Single runnable of models initialized by init_llms, falling back to next ones on errors."""
+    llms = init_llms(run_name=run_name)
+    return llms[0].with_fallbacks(llms[1:])
+
+
 def init_llms_medium_intelligence(tools=None, run_name="Clean Coder", temp=0):
     llms = []
     if getenv("ANTHROPIC_API_KEY"):
-        llms.append(ChatAnthropic(model="claude-sonnet-4-20250514", temperature=temp, timeout=90))
+        llms.append(llm_anthropic("claude-sonnet-4-20250514", temperature=temp))
 
     if getenv("OPENROUTER_API_KEY"):
         llms.append(llm_open_router("anthropic/claude-4-sonnet"))
     if getenv("OPENAI_API_KEY"):
-        llms.append(ChatOpenAI(model="gpt-4.1", temperature=temp, timeout=90))
+        llms.append(llm_openai("gpt-4.1", temperature=temp))
 
     if getenv("OLLAMA_MODEL"):
-        llms.append(ChatOllama(model=os.getenv("OLLAMA_MODEL")))
+        llms.append(llm_ollama(os.getenv("OLLAMA_MODEL")))
     if getenv("LOCAL_MODEL_API_BASE"):
         llms.append(llm_open_local_hosted(getenv("LOCAL_MODEL_NAME")))
     for i, llm in enumerate(llms):
@@ -57,15 +119,15 @@ def init_llms_medium_intelligence(tools=None, run_name="Clean Coder", temp=0):
 def init_llms_mini(tools=None, run_name="Clean Coder", temp=0):
     llms = []
     if os.getenv("ANTHROPIC_API_KEY"):
-        llms.append(ChatAnthropic(model="claude-3-5-haiku-20241022", temperature=temp, timeout=90))
+        llms.append(llm_anthropic("claude-3-5-haiku-20241022", temperature=temp))
     if os.getenv("OPENROUTER_API_KEY"):
         llms.append(llm_open_router("anthropic/claude-3.5-haiku"))
     if os.getenv("OPENAI_API_KEY"):
-        llms.append(ChatOpenAI(model="gpt-4.1-mini", temperature=temp, timeout=90))
+        llms.append(llm_openai("gpt-4.1-mini", temperature=temp))
     # if os.getenv("GOOGLE_API_KEY"):
     #     llms.append(ChatGoogleGenerativeAI(model="gemini-2.0-flash-exp", temperature=temp, timeout=60))
     if os.getenv("OLLAMA_MODEL"):
-        llms.append(ChatOllama(model=os.getenv("OLLAMA_MODEL")))
+        llms.append(llm_ollama(os.getenv("OLLAMA_MODEL")))
     if getenv("LOCAL_MODEL_API_BASE"):
         llms.append(llm_open_local_hosted(getenv("LOCAL_MODEL_NAME")))
     for i, llm in enumerate(llms):
@@ -78,16 +140,16 @@ def init_llms_mini(tools=None, run_name="Clean Coder", temp=0):
 def init_llms_high_intelligence(tools=None, run_name="Clean Coder", temp=0.2):
     llms = []
     if os.getenv("ANTHROPIC_API_KEY"):
-        llms.append(ChatAnthropic(model="claude-opus-4-20250514", temperature=temp, timeout=90))
+        llms.append(llm_anthropic("claude-opus-4-20250514", temperature=temp))
     if getenv("OPENROUTER_API_KEY"):
         llms.append(llm_open_router("anthropic/claude-4-opus"))
     if os.getenv("OPENAI_API_KEY"):
-        llms.append(ChatOpenAI(model="o3", temperature=1, timeout=90, reasoning_effort="high"))
+        llms.append(llm_openai("o3", temperature=1, reasoning_effort="high"))
     if os.getenv("OPENAI_API_KEY"):
-        llms.append(ChatOpenAI(model="o1", temperature=1, timeout=90))
+        llms.append(llm_openai("o1", temperature=1))
 
     if os.getenv("OLLAMA_MODEL"):
-        llms.append(ChatOllama(model=os.getenv("OLLAMA_MODEL")))
+        llms.append(llm_ollama(os.getenv("OLLAMA_MODEL")))
     if getenv("LOCAL_MODEL_API_BASE"):
         llms.append(llm_open_local_hosted(getenv("LOCAL_MODEL_NAME")))
     for i, llm in enumerate(llms):
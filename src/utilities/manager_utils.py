@@ -3,13 +3,13 @@ In manager_utils.py we are placing all functions used by manager agent only, whi
 """
 # imports
 from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage, AIMessage
-from src.utilities.llms import init_llms_medium_intelligence
-from src.utilities.util_functions import join_paths, read_coderrules, list_directory_tree, load_prompt
+from src.utilities.llms import init_llms_medium_intelligence, init_llm_with_fallbacks
+from src.utilities.util_functions import join_paths, read_coderrules, list_directory_tree, load_prompt, todoist_api
+from src.utilities.lazy_loading import LazyObject
 from src.utilities.start_project_functions import create_project_plan_file
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
 from langchain_core.load import loads
-from todoist_api_python.api import TodoistAPI
 import questionary
 import concurrent.futures
 from dotenv import load_dotenv, find_dotenv
@@ -26,7 +26,6 @@ load_dotenv(find_dotenv())
 work_dir = os.getenv("WORK_DIR")
 load_dotenv(join_paths(work_dir, ".clean_coder/.env"))
 todoist_api_key = os.getenv("TODOIST_API_KEY")
-todoist_api = TodoistAPI(os.getenv("TODOIST_API_KEY"))
 
 QUESTIONARY_STYLE = questionary.Style(
     [
@@ -46,8 +45,7 @@ QUESTIONARY_STYLE = questionary.Style(
 actualize_progress_description_prompt_template = load_prompt("actualize_progress_description")
 tasks_progress_template = load_prompt("manager_progress")
 
-llms = init_llms_medium_intelligence(run_name="Progress description")
-llm = llms[0].with_fallbacks(llms[1:])
+llm = LazyObject(lambda: init_llm_with_fallbacks(init_llms_medium_intelligence, run_name="Progress description"))
 
 
 def read_project_plan():
@@ -149,7 +147,7 @@ def cleanup_research_histories() -> None:
 def actualize_progress_description_file(task_name_description):
     progress_description = read_progress_description()
     actualize_description_prompt = PromptTemplate.from_template(actualize_progress_description_prompt_template)
-    chain = actualize_description_prompt | llm | StrOutputParser()
+    chain = actualize_description_prompt | llm.get() | StrOutputParser()
     progress_description = chain.invoke(
         {
             "progress_description": progress_description,
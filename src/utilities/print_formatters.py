@@ -30,22 +30,18 @@ def print_formatted_content_planner(content):
         print_formatted(content=outside_text, color="dark_grey")
 
 
-def print_formatted_content(response):
-    if isinstance(response.content, str):
-        print_formatted(content=response.content, color="dark_grey")
-        ordered_calls = _order_tool_calls(response.tool_calls, "args")
-        for call in ordered_calls:
-            print_tool_message(tool_name=call["name"], tool_input=call["args"])
-    else:
-        tool_calls = []
-        for response_part in response.content:
-            if response_part["type"] == "text":
-                print_formatted(content=response_part["text"], color="dark_grey")
-            elif response_part["type"] == "tool_use":
-                tool_calls.append(response_part)
-        ordered_calls = _order_tool_calls(tool_calls, "input")
-        for call in ordered_calls:
-            print_tool_message(tool_name=call["name"], tool_input=call["input"])
+def print_formatted_content(response, print_text=True):
+    if print_text:
+        if isinstance(response.content, str):
+            print_formatted(content=response.content, color="dark_grey")
+        else:
+            for response_part in response.content:
+                if response_part["type"] == "text":
+                    print_formatted(content=response_part["text"], color="dark_grey")
+    # parsed tool calls, as tool use blocks of streamed responses do not keep their inputs
+    ordered_calls = _order_tool_calls(response.tool_calls, "args")
+    for call in ordered_calls:
+        print_tool_message(tool_name=call["name"], tool_input=call["args"])
 
 
 def _order_tool_calls(tool_calls, args_key):
@@ -138,6 +134,10 @@ def print_tool_message(tool_name, tool_input=None):
         message = "Looking at the file content..."
         print_formatted(content=message, color="blue", bold=True)
         print_formatted(content=tool_input, color="cyan", bold=True)
+    elif tool_name == "see_file_outline":
+        message = "Looking at the file outline..."
+        print_formatted(content=message, color="blue", bold=True)
+        print_formatted(content=tool_input, color="cyan", bold=True)
     elif tool_name == "list_dir":
         message = "Listing files in a directory..."
         print_formatted(content=message, color="blue", bold=True)
@@ -0,0 +1,104 @@
+"""
+Prompt caching for agent conversations.
+
+Agents send the same system prompt, plan and file contents on every call. For providers supporting explicit cache
+breakpoints (Anthropic), messages are marked so the provider caches the conversation prefix: system message,
+message with file contents and the last message of the conversation. Next call of the same agent reads whole
+previous conversation from the cache. Messages stored in agent state are never modified, marked copies are sent.
+"""
+
+import os
+import sys
+import threading
+from src.utilities.print_formatters import print_formatted
+
+prompt_caching_enabled = os.getenv("PROMPT_CACHING", "true").lower() not in ("false", "0", "no")
+show_prompt_cache_stats = bool(os.getenv("SHOW_PROMPT_CACHE_STATS"))
+
+
+def unwrap_model(llm):
+    """Returns chat model hidden under bind_tools and with_config wrappers."""
+    while hasattr(llm, "bound"):
+        llm = llm.bound
+    return llm
+
+
+def supports_cache_breakpoints(llm):
+    # langchain_anthropic is imported on first Anthropic model creation; not imported means no such model
+    langchain_anthropic = sys.modules.get("langchain_anthropic")
+    return langchain_anthropic is not None and isinstance(unwrap_model(llm), langchain_anthropic.ChatAnthropic)
+
+
+def add_cache_breakpoints(messages, llm):
+    """Returns messages with cache breakpoints for the model, if it supports them."""
+    if not prompt_caching_enabled or not supports_cache_breakpoints(llm):
+        return messages
+    breakpoint_indexes = set()
+    if messages and messages[0].type == "system":
+        breakpoint_indexes.add(0)
+    # file contents stay unchanged for many calls, when refreshed with diffs
+    file_contents_indexes = [i for i, msg in enumerate(messages) if hasattr(msg, "contains_file_contents")]
+    if file_contents_indexes:
+        breakpoint_indexes.add(file_contents_indexes[-1])
+    last_indexes = [i for i, msg in enumerate(messages) if msg.type in ("human", "tool") and msg.content]
+    if last_indexes:
+        breakpoint_indexes.add(last_indexes[-1])
+    return [mark_cached(msg) if i in breakpoint_indexes else msg for i, msg in enumerate(messages)]
+
+
+def mark_cached(message):
+    """Copy of message with cache breakpoint on its last content block."""
+    content = message.content
+    if isinstance(content, str):
+        blocks = [{"type": "text", "text": content}]
+    else:
+        blocks = [block if isinstance(block, dict) else {"type": "text", "text": block} for block in content]
+    if not blocks:
+        return message
+    blocks[-1] = {**blocks[-1], "cache_control": {"type": "ephemeral"}}
+    return message.model_copy(update={"content": blocks})
+
+
+class PromptCacheStats:
+    """Counts input tokens read from and written to the provider cache, reported in responses usage metadata."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.input_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_creation_tokens = 0
+
+    def record(self, response):
+        usage = getattr(response, "usage_metadata", None)
+        if not usage:
+            return
+        details = usage.get("input_token_details") or {}
+        with self.lock:
+            self.input_tokens += usage.get("input_tokens", 0)
+            self.cache_read_tokens += details.get("cache_read", 0) or 0
+            self.cache_creation_tokens += details.get("cache_creation", 0) or 0
+        if show_prompt_cache_stats:
+            print_formatted(self.describe_response(usage, details), color="dark_grey")
+
+    @staticmethod
+    def describe_response(usage, details):
+        input_tokens = usage.get("input_tokens", 0)
+        cache_read = details.get("cache_read", 0) or 0
+        hit_rate = cache_read / input_tokens if input_tokens else 0.0
+        return (
+            f"Prompt cache: {cache_read}/{input_tokens} input tokens read from cache ({hit_rate:.0%}), "
+            f"{details.get('cache_creation', 0) or 0} written."
+        )
+
+    def hit_rate(self):
+        with self.lock:
+            return self.cache_read_tokens / self.input_tokens if self.input_tokens else 0.0
+
+    def summary(self):
+        return (
+            f"Prompt cache hit rate: {self.hit_rate():.0%} of {self.input_tokens} input tokens, "
+            f"{self.cache_creation_tokens} tokens written to cache."
+        )
+
+
+prompt_cache_stats = PromptCacheStats()
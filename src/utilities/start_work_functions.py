@@ -3,7 +3,10 @@ Place here functions that should be called when clean coder is started.
 """
 
 import os
+import re
 import fnmatch
+import functools
+import threading
 from termcolor import colored
 from pathspec import PathSpec
 from pathspec.patterns import GitWildMatchPattern
@@ -17,30 +20,93 @@ def read_frontend_feedback_story():
         return file.read()
 
 
+# number of paths which ignore check results are kept in memory for
+IGNORE_CACHE_SIZE = 8192
+
+
 def file_folder_ignored(path):
     """
     Determines if a file or folder should be ignored based on patterns in .coderignore.
     Uses both PathSpec matching and fnmatch pattern matching for backwards compatibility.
     """
-    path = path.rstrip("/")  # Remove trailing slash if present
-    spec = PathSpec.from_lines(GitWildMatchPattern, CoderIgnore.get_forbidden())
-    if spec.match_file(path):
-        return True
-    # old way of checking, to remove in future. For now still needed for checking exact folder matches
-    for pattern in CoderIgnore.get_forbidden():
-        pattern = pattern.rstrip("/")  # Remove trailing slash from pattern if present
-        if fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(f"{path}/", f"{pattern}/"):
+    return CoderIgnore.get_matcher().is_ignored(path.rstrip("/"))
+
+
+def directory_ignored(path):
+    """Determines if directory (path relative to work dir) is ignored with all its contents."""
+    return CoderIgnore.get_matcher().is_dir_ignored(path.rstrip("/"))
+
+
+def walk_not_ignored(work_dir):
+    """
+    os.walk over work_dir, never descending into ignored directories. Yields (root, dirs, files) with ignored
+    directories and files removed; dirs can be further pruned in place by caller.
+    """
+    for root, dirs, files in os.walk(work_dir):
+        rel_root = os.path.relpath(root, work_dir)
+        prefix = "" if rel_root == "." else rel_root.replace(os.sep, "/") + "/"
+        dirs[:] = [d for d in dirs if not directory_ignored(prefix + d)]
+        files = [f for f in files if not file_folder_ignored(prefix + f)]
+        yield root, dirs, files
+
+
+class IgnoreMatcher:
+    """
+    .coderignore patterns compiled once: gitwildmatch patterns and their fnmatch versions are joined into single
+    regexes. Results are cached per path.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = patterns
+        wildmatch_patterns = [GitWildMatchPattern(pattern) for pattern in patterns]
+        wildmatch_patterns = [pattern for pattern in wildmatch_patterns if pattern.include is not None]
+        # with negated patterns the last matching one decides, which single regex can not express
+        self.spec = PathSpec(wildmatch_patterns) if any(not pattern.include for pattern in wildmatch_patterns) else None
+        self.wildmatch_regex = join_regexes(
+            # named group of pathspec regexes can not repeat in joined regex
+            pattern.regex.pattern.replace("(?P<ps_d>", "(?:")
+            for pattern in wildmatch_patterns
+        )
+        # old way of matching, to remove in future. For now still needed for checking exact folder matches
+        self.fnmatch_regex = join_regexes(fnmatch.translate(os.path.normcase(pattern.rstrip("/"))) for pattern in patterns)
+        self.is_ignored = functools.lru_cache(maxsize=IGNORE_CACHE_SIZE)(self._is_ignored)
+        self.is_dir_ignored = functools.lru_cache(maxsize=IGNORE_CACHE_SIZE)(self._is_dir_ignored)
+
+    def _is_ignored(self, path):
+        path = path.replace(os.sep, "/").removeprefix("./")
+        if self.wildmatch(path):
             return True
+        return bool(self.fnmatch_regex and self.fnmatch_regex.match(os.path.normcase(path)))
+
+    def _is_dir_ignored(self, path):
+        # patterns of directories, like "node_modules/", match their contents only
+        return self._is_ignored(path) or self.wildmatch(path.replace(os.sep, "/").removeprefix("./") + "/")
 
-    return False
+    def wildmatch(self, path):
+        if self.spec is not None:
+            return self.spec.match_file(path)
+        return bool(self.wildmatch_regex and self.wildmatch_regex.match(path))
+
+
+def join_regexes(regexes):
+    regexes = [f"(?:{regex})" for regex in regexes]
+    return re.compile("|".join(regexes)) if regexes else None
 
 
 class CoderIgnore:
     forbidden_files_and_folders = None
+    matcher = None
+    # modification time of .coderignore matcher was compiled from
+    matcher_mtime = None
+    lock = threading.Lock()
+
+    @staticmethod
+    def coderignore_path():
+        return os.path.join(Work.dir(), '.clean_coder', '.coderignore')
 
     @staticmethod
     def read_coderignore():
-        coderignore_path = os.path.join(Work.dir(), '.clean_coder', '.coderignore')
+        coderignore_path = CoderIgnore.coderignore_path()
         try:
             with open(coderignore_path, 'r') as file:
                 return [line.strip() for line in file if line.strip() and not line.startswith('#')]
@@ -50,9 +116,21 @@ class CoderIgnore:
 
     @staticmethod
     def get_forbidden():
-        if CoderIgnore.forbidden_files_and_folders is None:
-            CoderIgnore.forbidden_files_and_folders = CoderIgnore.read_coderignore()
-        return CoderIgnore.forbidden_files_and_folders
+        return CoderIgnore.get_matcher().patterns
+
+    @staticmethod
+    def get_matcher():
+        """Returns matcher of current .coderignore patterns, recompiled only when the file changes."""
+        try:
+            mtime = os.stat(CoderIgnore.coderignore_path()).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        with CoderIgnore.lock:
+            if CoderIgnore.matcher is None or mtime != CoderIgnore.matcher_mtime:
+                CoderIgnore.forbidden_files_and_folders = CoderIgnore.read_coderignore()
+                CoderIgnore.matcher = IgnoreMatcher(CoderIgnore.forbidden_files_and_folders)
+                CoderIgnore.matcher_mtime = mtime
+            return CoderIgnore.matcher
 
 
 class Work:
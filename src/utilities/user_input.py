@@ -1,11 +1,12 @@
 import os
 from src.utilities.print_formatters import print_formatted
 from src.utilities.voice_utils import VoiceRecorder
+from src.utilities.lazy_loading import LazyObject
 import keyboard
 import readline
 
 
-recorder = VoiceRecorder()
+recorder = LazyObject(VoiceRecorder)
 
 
 def user_input(prompt=""):
@@ -1,10 +1,13 @@
 import os
 import base64
+import difflib
 import requests
 from src.utilities.start_work_functions import file_folder_ignored, Work
+from src.utilities.directory_tree import get_tree_snapshot
+from src.utilities.file_view import file_lines
 from src.utilities.print_formatters import print_formatted
 from dotenv import load_dotenv, find_dotenv
-from todoist_api_python.api import TodoistAPI
+from src.utilities.lazy_loading import LazyObject
 from langchain_core.messages import HumanMessage, ToolMessage
 from langchain_core.load import dumps, loads
 import json
@@ -14,10 +17,25 @@ import click
 load_dotenv(find_dotenv())
 work_dir = os.getenv("WORK_DIR")
 log_file_path = os.getenv("LOG_FILE")
-todoist_api = TodoistAPI(os.getenv("TODOIST_API_KEY"))
 PROJECT_ID = os.getenv("TODOIST_PROJECT_ID")
 
 
+def create_todoist_api():
+    from todoist_api_python.api import TodoistAPI
+
+    return TodoistAPI(os.getenv("TODOIST_API_KEY"))
+
+
+# created on first use, after project's .clean_coder/.env is loaded
+todoist_api = LazyObject(create_todoist_api)
+
+
+# "full" (re-send full contents of files after every agent turn) or "diff" (send changed fragments only)
+file_context_mode = os.getenv("FILE_CONTEXT_MODE", "full")
+# full contents of files are re-sent when more fragment messages or their total size exceeds share of full contents
+MAX_FILE_DIFF_MSGS = 10
+MAX_FILE_DIFFS_SHARE = 0.3
+
 TOOL_NOT_EXECUTED_WORD = "Tool haven't been executed. "
 WRONG_TOOL_CALL_WORD = "Wrong tool call. "
 
@@ -64,8 +82,7 @@ def watch_file(filename, work_dir, line_numbers=True):
     if file_folder_ignored(filename):
         return "You are not allowed to work with this file."
     try:
-        with open(join_paths(work_dir, filename), "r", encoding="utf-8") as file:
-            lines = file.readlines()
+        lines = file_lines(join_paths(work_dir, filename))
     except FileNotFoundError:
         return "File not exists."
     if line_numbers:
@@ -147,42 +164,9 @@ def list_directory_tree(work_dir):
     """
     Generate a visual tree representation of the directory structure.
     Filters out ignored files and folders, and handles large directories gracefully.
+    Tree is cached and rescanned only in directories changed since the last call.
     """
-    tree = []
-    # Normalize path to ensure it always ends with a slash in one line
-    work_dir = work_dir + os.sep if not work_dir.endswith(os.sep) else work_dir
-    
-    for root, dirs, files in os.walk(work_dir):
-        # Filter out forbidden directories and files
-        dirs[:] = [d for d in dirs if not file_folder_ignored(d)]
-        files = [f for f in files if not file_folder_ignored(f)]
-        rel_path = os.path.relpath(root, work_dir)
-        depth = rel_path.count(os.sep)
-        indent = "│ " * depth
-
-        # Add current directory to the tree
-        tree.append(f"{indent}{'└──' if depth > 0 else ''}📁 {os.path.basename(root)}")
-
-        # Check if the total number of items exceeds the threshold
-        total_items = len(dirs) + len(files)
-        if total_items > 30:
-            file_indent = "│ " * (depth + 1)
-            tree.append(f"{file_indent}Too many files/folders to display ({total_items} items)")
-            dirs.clear()
-            continue
-        elif total_items == 0:
-            file_indent = "│ " * (depth + 1)
-            tree.append(f"{file_indent}<Directory is empty>")
-            dirs.clear()
-            continue
-
-        # Add files to the tree
-        file_indent = "│ " * (depth + 1)
-        for i, file in enumerate(files):
-            connector = "└── " if i == len(files) - 1 else "├── "
-            tree.append(f"{file_indent}{connector}{file}")
-
-    return "Content of directory tree:\n" + "\n".join(tree)
+    return get_tree_snapshot(work_dir).render()
 
 
 def invoke_tool_native(tool_call, tools):
@@ -197,16 +181,95 @@ def invoke_tool_native(tool_call, tools):
 
 
 def exchange_file_contents(state, files, work_dir):
+    """
+    Refreshes file contents in agent's context after its turn. By default, replaces the message with full contents
+    of all files. With FILE_CONTEXT_MODE=diff, full contents message stays untouched (so conversation prefix can
+    be cached by provider) and only fragments of files changed since the last refresh are appended. Full contents
+    are rebuilt when appended fragments grow too big.
+    """
+    if file_context_mode != "diff":
+        return rebuild_file_contents(state, files, work_dir)
+    file_context_msgs = [msg for msg in state["messages"] if hasattr(msg, "file_snapshots")]
+    if not file_context_msgs:
+        return rebuild_file_contents(state, files, work_dir)
+
+    previous_snapshots = file_context_msgs[-1].file_snapshots
+    snapshots = read_file_snapshots(files, work_dir)
+    changes = [
+        describe_file_changes(file, previous_snapshots.get(file.filename), snapshots[file.filename], work_dir)
+        for file in files
+        if file.filename not in previous_snapshots or previous_snapshots[file.filename] != snapshots[file.filename]
+    ]
+    if not changes:
+        return state
+    changes_msg_content = (
+        "Files changed since their contents shown before. Current versions of changed fragments:\n\n"
+        + "\n\n###\n\n".join(changes)
+    )
+    diffs_length = sum(len(msg.content) for msg in file_context_msgs[1:]) + len(changes_msg_content)
+    full_contents_length = len(file_context_msgs[0].content)
+    if len(file_context_msgs) > MAX_FILE_DIFF_MSGS or diffs_length > MAX_FILE_DIFFS_SHARE * full_contents_length:
+        return rebuild_file_contents(state, files, work_dir)
+    state["messages"].append(
+        HumanMessage(content=changes_msg_content, contains_file_diffs=True, file_snapshots=snapshots)
+    )
+    return state
+
+
+def rebuild_file_contents(state, files, work_dir):
+    # keep file contents on the same position, so messages before it stay cached by provider
+    position = next(
+        (i for i, msg in enumerate(state["messages"]) if hasattr(msg, "contains_file_contents")), 2
+    )
     # Remove old one
-    state["messages"] = [msg for msg in state["messages"] if not hasattr(msg, "contains_file_contents")]
+    state["messages"] = [
+        msg
+        for msg in state["messages"]
+        if not hasattr(msg, "contains_file_contents") and not hasattr(msg, "contains_file_diffs")
+    ]
     # Add new file contents
+    snapshots = read_file_snapshots(files, work_dir)
     file_contents = check_file_contents(files, work_dir)
     file_contents = f"Find most actual file contents here:\n\n{file_contents}\nTake a look at line numbers before introducing changes."
-    file_contents_msg = HumanMessage(content=file_contents, contains_file_contents=True)
-    state["messages"].insert(2, file_contents_msg)  # insert after the system and plan msgs
+    file_contents_msg = HumanMessage(content=file_contents, contains_file_contents=True, file_snapshots=snapshots)
+    state["messages"].insert(position, file_contents_msg)  # insert after the system and plan msgs
     return state
 
 
+def read_file_snapshots(files, work_dir):
+    """Returns dict of filenames and their current contents; None for files not existing or not allowed to see."""
+    snapshots = {}
+    for file in files:
+        try:
+            if file_folder_ignored(file.filename):
+                raise PermissionError
+            with open(join_paths(work_dir, file.filename), "r", encoding="utf-8") as f:
+                snapshots[file.filename] = f.read()
+        except (OSError, UnicodeDecodeError):
+            snapshots[file.filename] = None
+    return snapshots
+
+
+def describe_file_changes(file, old_content, new_content, work_dir):
+    """Shows changed fragments of the file with current line numbers, or the whole file if it is new."""
+    if new_content is None or old_content is None:
+        return watch_file(file.filename, work_dir)
+    old_lines = old_content.splitlines()
+    new_lines = new_content.splitlines()
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    fragments = []
+    for group in matcher.get_grouped_opcodes(2):
+        old_start, old_end = group[0][1], group[-1][2]
+        new_start, new_end = group[0][3], group[-1][4]
+        header = f"Lines {old_start + 1}-{old_end} before, now lines {new_start + 1}-{new_end}"
+        shift = (new_end - new_start) - (old_end - old_start)
+        if shift:
+            header += f"; lines below shifted by {shift:+d}"
+        numbered_lines = [f"{i + 1}|{new_lines[i]} |{i + 1}\n" for i in range(new_start, new_end)]
+        fragments.append(header + ":\n" + "".join(numbered_lines))
+    return f"{file.filename}:\n\n" + "\n".join(fragments)
+
+
 def bad_tool_call_looped(state):
     """
     Return True after three consecutive tool messages that start with
@@ -3,7 +3,6 @@ from threading import Thread
 import tempfile
 import queue
 import sys
-from openai import OpenAI
 from dotenv import load_dotenv, find_dotenv
 
 load_dotenv(find_dotenv())
@@ -28,6 +27,8 @@ class VoiceRecorder:
         self.recording_thread = None
         self.openai_client = None
         if os.getenv("OPENAI_API_KEY"):
+            from openai import OpenAI
+
             self.openai_client = OpenAI()
 
     def record(self):
@@ -0,0 +1,199 @@
+"""
+Watching work directory for changes, enabled with WORKSPACE_WATCHER env variable.
+
+Watcher notices changes of files made by agents as well as by developer (e.g. in IDE). It uses watchdog (inotify,
+FSEvents, ReadDirectoryChangesW) if installed, otherwise polls modification times of not ignored files. Every batch
+of changes increments workspace generation and is published to subscribers, so caches of directory tree, file
+contents and RAG index update only what changed instead of rescanning the whole work directory.
+"""
+
+import os
+import threading
+from collections import deque
+from src.utilities.start_work_functions import file_folder_ignored, walk_not_ignored
+from src.utilities.print_formatters import print_formatted
+
+# "auto" (watchdog if installed, polling otherwise) or "polling"; watcher disabled if not set
+WORKSPACE_WATCHER = os.getenv("WORKSPACE_WATCHER", "").lower()
+# seconds between scans of work directory in polling mode
+WORKSPACE_POLL_SECONDS = float(os.getenv("WORKSPACE_POLL_SECONDS", 2))
+# number of recent change batches kept for changes_since
+CHANGES_HISTORY_SIZE = 1000
+
+
+class WorkspaceChange:
+    def __init__(self, path, kind, is_directory=False):
+        # path relative to work dir, with "/" separators
+        self.path = path
+        # "created", "modified" or "deleted"; moves are reported as deletion and creation
+        self.kind = kind
+        self.is_directory = is_directory
+
+    def __repr__(self):
+        return f"WorkspaceChange({self.path!r}, {self.kind!r}, is_directory={self.is_directory})"
+
+
+class WorkspaceWatcher:
+    def __init__(self, work_dir, poll_seconds=WORKSPACE_POLL_SECONDS):
+        self.work_dir = os.path.abspath(work_dir)
+        self.poll_seconds = poll_seconds
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.subscribers = []
+        # (generation, changes) of recent batches
+        self.history = deque(maxlen=CHANGES_HISTORY_SIZE)
+        self.stop_event = threading.Event()
+        self.observer = None
+        self.thread = None
+        # (mtime_ns, size) of files and None for directories by relative path, in polling mode
+        self.states = {}
+
+    def subscribe(self, callback):
+        """callback(changes) is called with every batch of changes, from watcher thread."""
+        with self.lock:
+            self.subscribers.append(callback)
+
+    def publish(self, changes):
+        changes = [change for change in changes if change.path and not file_folder_ignored(change.path)]
+        if not changes:
+            return
+        with self.lock:
+            self.generation += 1
+            self.history.append((self.generation, changes))
+            subscribers = list(self.subscribers)
+        for callback in subscribers:
+            try:
+                callback(changes)
+            except Exception as e:
+                print_formatted(f"Could not update cache after workspace change: {e}", color="yellow")
+
+    def changes_since(self, generation):
+        """
+        Paths changed after given generation, in order of changes. Returns None if changes that old are not
+        remembered anymore, so caller has to rescan.
+        """
+        with self.lock:
+            if generation < self.generation - len(self.history):
+                return None
+            changed = [
+                change.path
+                for batch_generation, changes in self.history
+                if batch_generation > generation
+                for change in changes
+            ]
+        return list(dict.fromkeys(changed))
+
+    def start(self, use_watchdog=True):
+        """Starts watching in background. Returns name of mode used."""
+        if use_watchdog:
+            try:
+                self.start_watchdog()
+                return "watchdog"
+            except ImportError:
+                pass
+        self.start_polling()
+        return "polling"
+
+    def stop(self):
+        self.stop_event.set()
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
+        if self.thread is not None:
+            self.thread.join()
+
+    def start_watchdog(self):
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+
+        watcher = self
+
+        class ChangesHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                watcher.publish(watcher.changes_of_event(event))
+
+        self.observer = Observer()
+        self.observer.schedule(ChangesHandler(), self.work_dir, recursive=True)
+        self.observer.start()
+
+    def changes_of_event(self, event):
+        if event.event_type == "moved":
+            return [
+                WorkspaceChange(self.relative(event.src_path), "deleted", event.is_directory),
+                WorkspaceChange(self.relative(event.dest_path), "created", event.is_directory),
+            ]
+        if event.event_type in ("created", "modified", "deleted"):
+            return [WorkspaceChange(self.relative(event.src_path), event.event_type, event.is_directory)]
+        # opened and closed files did not change
+        return []
+
+    def relative(self, path):
+        if isinstance(path, bytes):
+            path = os.fsdecode(path)
+        path = os.path.relpath(path, self.work_dir)
+        return "" if path == "." else path.replace(os.sep, "/")
+
+    def start_polling(self):
+        self.states = self.scan()
+        self.thread = threading.Thread(target=self.poll, daemon=True)
+        self.thread.start()
+
+    def poll(self):
+        while not self.stop_event.wait(self.poll_seconds):
+            self.poll_once()
+
+    def poll_once(self):
+        states = self.scan()
+        changes = [
+            WorkspaceChange(path, "deleted", self.states[path] is None) for path in self.states if path not in states
+        ]
+        for path, state in states.items():
+            if path not in self.states:
+                changes.append(WorkspaceChange(path, "created", state is None))
+            elif state != self.states[path]:
+                changes.append(WorkspaceChange(path, "modified", state is None))
+        self.states = states
+        self.publish(changes)
+
+    def scan(self):
+        states = {}
+        for root, dirs, files in walk_not_ignored(self.work_dir):
+            rel_root = self.relative(root)
+            prefix = f"{rel_root}/" if rel_root else ""
+            for name in dirs:
+                states[prefix + name] = None
+            for name in files:
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                states[prefix + name] = (stat.st_mtime_ns, stat.st_size)
+        return states
+
+
+workspace_watcher = None
+
+
+def get_workspace_watcher():
+    """Returns running watcher of work dir, or None if watching is disabled."""
+    return workspace_watcher
+
+
+def start_workspace_watcher(work_dir):
+    """
+    Starts watcher of work_dir if enabled with WORKSPACE_WATCHER and subscribes caches of directory tree and file
+    contents to it. Returns the watcher, or None if disabled.
+    """
+    global workspace_watcher
+    if not WORKSPACE_WATCHER or workspace_watcher is not None:
+        return workspace_watcher
+    from src.utilities.directory_tree import get_tree_snapshot
+    from src.utilities.file_view import forget_files
+
+    watcher = WorkspaceWatcher(work_dir)
+    watcher.subscribe(lambda changes: forget_files(os.path.join(watcher.work_dir, change.path) for change in changes))
+    get_tree_snapshot(work_dir).follow(watcher)
+    mode = watcher.start(use_watchdog=WORKSPACE_WATCHER != "polling")
+    print_formatted(f"Watching {work_dir} for changes ({mode}).", color="dark_grey")
+    workspace_watcher = watcher
+    return watcher